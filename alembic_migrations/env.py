@@ -30,10 +30,32 @@ target_metadata = [model_metadata]
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
+# Objects created by hand-written migrations (full-text search, expression
+# indexes) that are intentionally not described in the models.
+UNMANAGED_OBJECTS = {
+    'search_vector',
+    'ix_tasks_search_vector',
+    'ix_tasks_title_trgm',
+    'ix_tasks_description_trgm',
+    'ix_tasks_user_id_title_lower',
+    'tasks_archive.search_vector',
+    'ix_tasks_archive_search_vector',
+    'ix_tasks_archive_title_trgm',
+    'ix_tasks_archive_description_trgm',
+}
+# SQLite FTS5 tables (and their shadow tables) for tasks and the archive
+UNMANAGED_TABLE_PREFIXES = ('tasks_fts', 'tasks_archive_fts')
+
+
 def include_object(obj, name, type_, reflected, compare_to):
     """
-    Exclude views from Alembic's consideration.
+    Exclude views and unmanaged search objects from Alembic's consideration.
     """
+    if reflected and compare_to is None:
+        if type_ == 'column' and f'{obj.table.name}.{name}' in UNMANAGED_OBJECTS:
+            return False
+        if name in UNMANAGED_OBJECTS or (type_ == 'table' and name.startswith(UNMANAGED_TABLE_PREFIXES)):
+            return False
     return not obj.info.get('is_view', False)
 
 
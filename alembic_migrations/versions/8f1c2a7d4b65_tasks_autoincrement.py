@@ -0,0 +1,59 @@
+"""tasks autoincrement
+
+Revision ID: 8f1c2a7d4b65
+Revises: 3c9d5e1f7a20
+Create Date: 2026-10-18 10:12:03.274511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1c2a7d4b65'
+down_revision: Union[str, None] = '3c9d5e1f7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_tasks(autoincrement: bool) -> None:
+    """
+    Пересоздать tasks в SQLite с AUTOINCREMENT или без него
+
+    Триггеры tasks_fts удаляются вместе с таблицей, поэтому их SQL
+    сохраняется до пересоздания и выполняется после. Индексы
+    переносит batch_alter_table.
+    """
+    bind = op.get_bind()
+    triggers = [row.sql for row in bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks'"
+    ))]
+    with op.batch_alter_table('tasks', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade() -> None:
+    # В PostgreSQL id задач выдает последовательность, она не повторяет id.
+    # SQLite без AUTOINCREMENT выдает max(id) + 1 и после удаления задачи с наибольшим
+    # id повторил бы id задачи из tasks_archive
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _recreate_tasks(autoincrement=True)
+    # Новые id - больше всех id в tasks и в архиве
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+    op.execute("""
+        INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', max(
+            coalesce((SELECT max(id) FROM tasks), 0),
+            coalesce((SELECT max(id) FROM tasks_archive), 0)
+        )
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _recreate_tasks(autoincrement=False)
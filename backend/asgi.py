@@ -0,0 +1,60 @@
+import asyncio
+import logging
+
+from a2wsgi import WSGIMiddleware
+from flask import Flask
+
+from backend.blueprints.wrapper import get_server_loop, set_server_loop
+from backend.load_env import env_config
+
+logger = logging.getLogger(__name__)
+
+# Количество потоков, в которых воркер одновременно обрабатывает запросы Flask.
+# Потоки только ждут корутины в общем цикле событий, поэтому их может быть
+# столько же, сколько соединений в пуле базы (pool_size в backend/database.py)
+ASGI_THREADS = env_config.get('ASGI_THREADS', default=50, cast=int)
+
+
+class PlannerASGI:
+    """
+    ASGI-приложение поверх Flask для запуска под uvicorn
+
+    Flask-обработчики выполняются в пуле потоков (a2wsgi), а их корутины
+    (async_route) - в одном цикле событий uvicorn. Поэтому воркер обрабатывает
+    много запросов одновременно, и все они используют один пул соединений
+    с базой, а не цикл событий и соединения на каждый поток.
+    """
+
+    def __init__(self, app: Flask, threads: int = ASGI_THREADS):
+        self.flask_app = app
+        self.wsgi = WSGIMiddleware(app, workers=threads)
+        self.threads = threads
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http':
+            # Без lifespan (uvicorn --lifespan off) цикл задается первым запросом
+            self._start()
+        await self.wsgi(scope, receive, send)
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if get_server_loop() is not loop:
+            set_server_loop(loop)
+            logger.info(f"ASGI: общий цикл событий, потоков обработчиков: {self.threads}")
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from backend.database import engine
+                # Соединения пула привязаны к этому циклу событий, закрываем их до его остановки
+                await engine.dispose()
+                set_server_loop(None)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
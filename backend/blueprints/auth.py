@@ -7,6 +7,7 @@ from flask_jwt_extended import create_access_token, create_refresh_token, get_jw
 
 from backend.blueprints.wrapper import async_route
 from backend.cache_config import cache
+from backend.compression import cache_compressed
 from backend.database import get_session
 from backend.locale_config import AVAILABLE_LANGUAGES
 from backend.services.auth_service import AuthService
@@ -233,9 +234,17 @@ async def update_user_timezone():
         
     return '', 201
 
+
+def _timezones_version() -> str:
+    """Версия базы часовых поясов pytz (токен кэша списка)"""
+    import pytz
+    return pytz.OLSON_VERSION
+
+
 @bp.route('/api/timezones', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
+@cache_compressed(version=_timezones_version)
 @async_route
 async def get_available_timezones():
     """Получение списка доступных часовых поясов."""
@@ -0,0 +1,35 @@
+import logging
+
+from flask import Blueprint, request, jsonify
+from flask_cors import cross_origin
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from backend.blueprints.conditional import conditional_get
+from backend.blueprints.wrapper import async_route
+from backend.database import get_session
+from backend.services.bootstrap import BootstrapService
+
+bp = Blueprint("bootstrap", __name__)
+logger = logging.getLogger(__name__)
+
+
+@bp.route('/api/bootstrap', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+@conditional_get('bootstrap', time_dependent=True)
+async def get_bootstrap():
+    """Данные для загрузки фронтенда: язык, часовой пояс, настройки, предпочтения и первая страница задач"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    user_id = get_jwt_identity()
+
+    page_size = min(max(int(request.args.get('page_size', 10)), 1), 100)
+
+    async with get_session() as session:
+        # Количество задач и первая страница читаются одновременно в отдельных сессиях
+        bootstrap = await BootstrapService(session, session_factory=get_session).get_bootstrap(user_id, page_size)
+
+    if bootstrap is None:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify(bootstrap)
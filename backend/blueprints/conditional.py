@@ -0,0 +1,75 @@
+import hashlib
+import logging
+from functools import wraps
+
+from flask import make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+from backend import metrics
+from backend.database import get_session
+from backend.services.data_version import default_settings_version, get_default_settings_version, get_version_token
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(scope: str, user_id: str, token: str) -> str:
+    """ETag ответа: адрес с параметрами запроса, пользователь и версия его данных"""
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    key = f'{scope}|{user_id}|{request.path}?{query}|{token}'
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def conditional_get(scope: str, time_dependent: bool = False, default_settings: bool = False):
+    """
+    Условный GET по версии данных пользователя (users.data_version)
+
+    Версия проверяется одним запросом по первичному ключу. Для ответов, зависящих
+    от времени, в нее входит и количество просроченных задач: оно берется из кэша
+    процесса (overdue_cache) и пересчитывается после изменения данных или при
+    наступлении ближайшего дедлайна. Версия users.data_version читается из базы
+    при каждом запросе: ее увеличивают записи в любом процессе (Flask, бот), и
+    только так 304 не отдается после изменения в другом процессе. Если ETag клиента
+    совпадает, ответ 304 отдается без выполнения обработчика. Успешный ответ
+    получает сильный ETag и Cache-Control: private, no-cache - браузер хранит его
+    и сам отправляет If-None-Match. Доля ответов 304 - метрика etag.hit_rate.
+
+    Args:
+        default_settings: Ответ - настройки по умолчанию, общие для всех пользователей.
+            Версия - хэш default_settings из памяти процесса (get_default_settings_version),
+            пока она не устарела, запрос к базе не выполняется.
+
+    Декоратор ставится под async_route, пользователь берется из JWT.
+    """
+    def decorator(f):
+        @wraps(f)
+        async def wrapped(*args, **kwargs):
+            if request.method != 'GET':
+                return await f(*args, **kwargs)
+            user_id = get_jwt_identity()
+
+            token = default_settings_version.get() if default_settings else None
+            if token is None:
+                async with get_session() as session:
+                    if default_settings:
+                        token = await get_default_settings_version(session)
+                    else:
+                        token = await get_version_token(session, user_id, time_dependent)
+            if token is None:
+                return await f(*args, **kwargs)
+
+            etag = make_etag(scope, user_id, token)
+            if request.if_none_match.contains_weak(etag):
+                metrics.increment('etag.hits')
+                response = make_response('', 304)
+            else:
+                metrics.increment('etag.misses')
+                response = make_response(await f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return wrapped
+
+    return decorator
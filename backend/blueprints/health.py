@@ -1,7 +1,11 @@
 import logging
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from backend import metrics
+from backend.create_bot import superusers
 
 bp = Blueprint("health", __name__)
 
@@ -13,4 +17,16 @@ logger = logging.getLogger(__name__)
 def health_check():
     """Эндпоинт для проверки работоспособности API в Docker healthcheck"""
     logger.debug("Health check requested")
-    return jsonify({"status": "ok", "message": "API is up and running"}), 200 
\ No newline at end of file
+    return jsonify({"status": "ok", "message": "API is up and running"}), 200 
+
+
+@bp.route('/api/metrics', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+def get_metrics():
+    """Счетчики процесса (попадания в кэш настроек и т.п.), у каждого воркера свои; только для SUPERUSERS"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    if int(get_jwt_identity()) not in superusers:
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(metrics.get_metrics()), 200
@@ -1,36 +1,46 @@
+import io
 import logging
 from datetime import datetime
 
 import pytz
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_cors import cross_origin
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from backend.blueprints.wrapper import async_route
+from backend.blueprints.conditional import conditional_get
+from backend.blueprints.wrapper import async_route, iterate_async
 from backend.database import get_session
-from backend.services.task_service import TaskService
+from backend.services.task_service import TaskService, MAX_BATCH_SIZE
+from backend.services.global_settings import MAX_TASKS_PER_USER, LimitExceededError
+from backend.services.task_cursor import InvalidCursorError
+from backend.services.task_export import EXPORT_FORMATS, export_chunks
+from backend.services.task_import import IMPORT_FORMATS, TaskImportService
+from backend.models.task_filter import InvalidFilterError, TaskFilter
 from backend.services.settings_service import SettingsService
 from backend.db.models import DurationSetting, User
 
 bp = Blueprint("planner", __name__)
 logger = logging.getLogger(__name__)
 
-def process_deadline_filter(deadline_str, is_from=True):
-    """Преобразуем строку даты в формат ISO для фильтрации задач по дедлайну"""
-    try:
-        # Преобразуем строку в дату, если она не в формате YYYY-MM-DD
-        if 'T' in deadline_str:
-            deadline_str = datetime.fromisoformat(deadline_str.replace('Z', '+00:00')).date().isoformat()
-        return deadline_str
-    except (ValueError, TypeError) as e:
-        logger.error(f"Error converting deadline_{'from' if is_from else 'to'}: {e}")
-        return deadline_str
+
+@bp.errorhandler(InvalidFilterError)
+def invalid_filter(error: InvalidFilterError):
+    """Некорректные параметры фильтра (TaskFilter.from_request_args) - 400"""
+    return jsonify({'error': str(error)}), 400
+
+
+def limit_error(error: LimitExceededError):
+    """Ответ на превышение ограничения: лимит задач - 409, лимит напоминаний - 400"""
+    status = 409 if error.key == MAX_TASKS_PER_USER else 400
+    return jsonify({'error': str(error), 'code': error.key, 'limit': error.limit}), status
+
 
 # Маршруты для работы с задачами
 @bp.route('/api/tasks/<int:task_id>', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('tasks', time_dependent=True)
 async def get_task(task_id):
     if request.method == 'OPTIONS':
         return '', 200
@@ -39,7 +49,7 @@ async def get_task(task_id):
 
     async with get_session() as session:
         task_service = TaskService(session)
-        tasks = await task_service.get_tasks(user_id, {'id': task_id})
+        tasks = await task_service.get_tasks(user_id, {'id': task_id, 'include_archived': True})
 
     if tasks and len(tasks) > 0:
         return jsonify(tasks[0])
@@ -51,6 +61,7 @@ async def get_task(task_id):
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('tasks', time_dependent=True)
 async def get_tasks():
     """Получить список задач пользователя"""
     if request.method == 'OPTIONS':
@@ -60,33 +71,30 @@ async def get_tasks():
     logger.info(f"Получен запрос на получение задач")
     logger.info(f"Заголовки запроса: {request.headers}")
     
+    # Получаем параметры фильтрации из запроса (ошибка разбора - 400, см. invalid_filter)
+    filters = TaskFilter.from_request_args(request.args)
+
     try:
         current_user = get_jwt_identity()
         logger.info(f"Идентификатор пользователя из токена: {current_user}")
 
-        # Получаем параметры фильтрации из запроса
-        filters = {}
-        if request.args.get('status_id'):
-            filters['status_id'] = int(request.args.get('status_id'))
-        if request.args.get('priority_id'):
-            filters['priority_id'] = int(request.args.get('priority_id'))
-        if request.args.get('duration_id'):
-            filters['duration_id'] = int(request.args.get('duration_id'))
-        if request.args.get('type_id'):
-            filters['type_id'] = int(request.args.get('type_id'))
-        if 'is_completed' in request.args:
-            # Преобразуем строковое значение 'true'/'false' в булево
-            is_completed_str = request.args.get('is_completed').lower()
-            filters['is_completed'] = is_completed_str == 'true'
-        
-        # Добавляем фильтрацию по дедлайну
-        if request.args.get('deadline_from'):
-            deadline_from = request.args.get('deadline_from')
-            filters['deadline_from'] = process_deadline_filter(deadline_from)
-        
-        if request.args.get('deadline_to'):
-            deadline_to = request.args.get('deadline_to')
-            filters['deadline_to'] = process_deadline_filter(deadline_to, False)
+        # Курсорная пагинация: ?cursor=...&limit=... (первая страница - без cursor)
+        if 'cursor' in request.args or 'limit' in request.args:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+            async with get_session() as session:
+                task_service = TaskService(session)
+                try:
+                    tasks, next_cursor = await task_service.get_tasks_by_cursor(
+                        current_user,
+                        request.args.get('cursor') or None,
+                        limit,
+                        filters,
+                        request.args.get('sort_by'),
+                        request.args.get('sort_order', 'asc')
+                    )
+                except InvalidCursorError as e:
+                    return jsonify({'error': str(e)}), 400
+                return jsonify({'tasks': tasks, 'next_cursor': next_cursor})
 
         async with get_session() as session:
             task_service = TaskService(session)
@@ -101,6 +109,7 @@ async def get_tasks():
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('tasks', time_dependent=True)
 async def get_tasks_paginated():
     if request.method == 'OPTIONS':
         return '', 200
@@ -115,32 +124,8 @@ async def get_tasks_paginated():
     sort_by = request.args.get('sort_by')
     sort_order = request.args.get('sort_order', 'asc')
 
-    # Получаем параметр поиска из запроса
-    search_query = request.args.get('search')
-
-    # Получаем параметры фильтрации из запроса
-    filters = {}
-    if request.args.get('status_id'):
-        filters['status_id'] = int(request.args.get('status_id'))
-    if request.args.get('priority_id'):
-        filters['priority_id'] = int(request.args.get('priority_id'))
-    if request.args.get('duration_id'):
-        filters['duration_id'] = int(request.args.get('duration_id'))
-    if request.args.get('type_id'):
-        filters['type_id'] = int(request.args.get('type_id'))
-    if 'is_completed' in request.args:
-        # Преобразуем строковое значение 'true'/'false' в булево
-        is_completed_str = request.args.get('is_completed').lower()
-        filters['is_completed'] = is_completed_str == 'true'
-    
-    # Добавляем фильтрацию по дедлайну
-    if request.args.get('deadline_from'):
-        deadline_from = request.args.get('deadline_from')
-        filters['deadline_from'] = process_deadline_filter(deadline_from)
-        
-    if request.args.get('deadline_to'):
-        deadline_to = request.args.get('deadline_to')
-        filters['deadline_to'] = process_deadline_filter(deadline_to, False)
+    # Получаем параметры фильтрации и поиска из запроса
+    filters = TaskFilter.from_request_args(request.args)
 
     async with get_session() as session:
         task_service = TaskService(session)
@@ -150,8 +135,7 @@ async def get_tasks_paginated():
             page_size,
             filters,
             sort_by,
-            sort_order,
-            search_query
+            sort_order
         )
 
         # Вычисляем общее количество страниц
@@ -173,42 +157,19 @@ async def get_tasks_paginated():
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('tasks', time_dependent=True)
 async def search_tasks():
     if request.method == 'OPTIONS':
         return '', 200
     """Поиск задач по названию и описанию"""
     user_id = get_jwt_identity()
 
-    # Получаем параметр поиска из запроса
-    search_query = request.args.get('q', '')
-
-    # Получаем параметры фильтрации из запроса
-    filters = {}
-    if request.args.get('status_id'):
-        filters['status_id'] = int(request.args.get('status_id'))
-    if request.args.get('priority_id'):
-        filters['priority_id'] = int(request.args.get('priority_id'))
-    if request.args.get('duration_id'):
-        filters['duration_id'] = int(request.args.get('duration_id'))
-    if request.args.get('type_id'):
-        filters['type_id'] = int(request.args.get('type_id'))
-    if 'is_completed' in request.args:
-        # Преобразуем строковое значение 'true'/'false' в булево
-        is_completed_str = request.args.get('is_completed').lower()
-        filters['is_completed'] = is_completed_str == 'true'
-    
-    # Добавляем фильтрацию по дедлайну
-    if request.args.get('deadline_from'):
-        deadline_from = request.args.get('deadline_from')
-        filters['deadline_from'] = process_deadline_filter(deadline_from)
-        
-    if request.args.get('deadline_to'):
-        deadline_to = request.args.get('deadline_to')
-        filters['deadline_to'] = process_deadline_filter(deadline_to, False)
+    # Получаем параметры фильтрации и поиска (параметр q) из запроса
+    filters = TaskFilter.from_request_args(request.args, search_arg='q')
 
     async with get_session() as session:
         task_service = TaskService(session)
-        tasks = await task_service.search_tasks(user_id, search_query, filters)
+        tasks = await task_service.search_tasks(user_id, filters.search or '', filters)
 
     return jsonify(tasks)
 
@@ -216,45 +177,122 @@ async def search_tasks():
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('tasks', time_dependent=True)
 async def get_task_count():
     if request.method == 'OPTIONS':
         return '', 200
     """Получить общее количество задач пользователя с учетом фильтров и поиска"""
     user_id = get_jwt_identity()
 
-    # Получаем параметр поиска из запроса
-    search_query = request.args.get('search')
-
-    # Получаем параметры фильтрации из запроса
-    filters = {}
-    if request.args.get('status_id'):
-        filters['status_id'] = int(request.args.get('status_id'))
-    if request.args.get('priority_id'):
-        filters['priority_id'] = int(request.args.get('priority_id'))
-    if request.args.get('duration_id'):
-        filters['duration_id'] = int(request.args.get('duration_id'))
-    if request.args.get('type_id'):
-        filters['type_id'] = int(request.args.get('type_id'))
-    if 'is_completed' in request.args:
-        # Преобразуем строковое значение 'true'/'false' в булево
-        is_completed_str = request.args.get('is_completed').lower()
-        filters['is_completed'] = is_completed_str == 'true'
-    
-    # Добавляем фильтрацию по дедлайну
-    if request.args.get('deadline_from'):
-        deadline_from = request.args.get('deadline_from')
-        filters['deadline_from'] = process_deadline_filter(deadline_from)
-        
-    if request.args.get('deadline_to'):
-        deadline_to = request.args.get('deadline_to')
-        filters['deadline_to'] = process_deadline_filter(deadline_to, False)
+    # Получаем параметры фильтрации и поиска из запроса
+    filters = TaskFilter.from_request_args(request.args)
+
+    # approximate=true: для больших выборок допускается оценка вместо точного COUNT
+    approximate = request.args.get('approximate', 'false').lower() == 'true'
 
     async with get_session() as session:
         task_service = TaskService(session)
-        count = await task_service.get_task_count(user_id, filters, search_query)
+        count = await task_service.get_task_count(user_id, filters, approximate=approximate)
 
     return jsonify({'count': count})
 
+@bp.route('/api/tasks/facets', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+@conditional_get('tasks', time_dependent=True)
+async def get_task_facets():
+    """Количество задач по статусам, приоритетам, типам, продолжительностям и завершенности для текущего фильтра"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    user_id = get_jwt_identity()
+
+    # Те же фильтры и поиск, что и для /api/tasks/count
+    filters = TaskFilter.from_request_args(request.args)
+
+    async with get_session() as session:
+        task_service = TaskService(session)
+        facets = await task_service.get_facets(user_id, filters)
+
+    if facets is None:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify(facets)
+
+@bp.route('/api/tasks/stats', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+@conditional_get('tasks', time_dependent=True)
+async def get_task_stats():
+    """Статистика задач пользователя: всего, открытые, завершенные, просроченные, по настройкам"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    user_id = get_jwt_identity()
+
+    async with get_session() as session:
+        task_service = TaskService(session)
+        stats = await task_service.get_task_stats(user_id)
+
+    if stats is None:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify(stats)
+
+@bp.route('/api/tasks/export', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+def export_tasks():
+    """Выгрузить задачи пользователя потоком в формате ndjson или csv"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    user_id = get_jwt_identity()
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported format: {export_format}'}), 400
+
+    # Те же фильтры, что и для /api/tasks/
+    filters = TaskFilter.from_request_args(request.args)
+
+    async def generate():
+        # Сессия открывается внутри генератора: ответ читается уже после выхода из обработчика
+        async with get_session() as session:
+            async for chunk in export_chunks(TaskService(session).stream_tasks(user_id, filters), export_format):
+                yield chunk
+
+    return Response(
+        iterate_async(generate()),
+        content_type=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=tasks.{export_format}'}
+    )
+
+@bp.route('/api/tasks/import', methods=['POST', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+async def import_tasks():
+    """Импортировать задачи из CSV или NDJSON (файл в поле file или тело запроса)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    user_id = get_jwt_identity()
+
+    upload = request.files.get('file')
+    # Формат из параметра или из расширения загруженного файла
+    import_format = request.args.get('format')
+    if not import_format and upload and upload.filename:
+        import_format = upload.filename.rsplit('.', 1)[-1].lower()
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': f'Unsupported format: {import_format}'}), 400
+
+    # Файл из формы читается потоково. Тело запроса async_route уже прочитал
+    # и закэшировал (request.stream после этого пуст), поэтому берется get_data()
+    stream = upload.stream if upload else io.BytesIO(request.get_data())
+
+    async with get_session() as session:
+        report = await TaskImportService(session).import_tasks(user_id, stream, import_format)
+        if report is None:
+            return jsonify({'error': 'User not found'}), 404
+        return jsonify(report)
+
 @bp.route('/api/tasks/', methods=['POST', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
@@ -269,7 +307,12 @@ async def create_task():
     
     async with get_session() as session:
         task_service = TaskService(session)
-        task = await task_service.create_task(current_user, task_data)
+        try:
+            task = await task_service.create_task(current_user, task_data)
+        except LimitExceededError as e:
+            return limit_error(e)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         if not task:
             return jsonify({'error': 'Failed to create task'}), 400
         return jsonify(task), 201
@@ -288,7 +331,12 @@ async def update_task(task_id):
     
     async with get_session() as session:
         task_service = TaskService(session)
-        task = await task_service.update_task(current_user, task_id, task_data)
+        try:
+            task = await task_service.update_task(current_user, task_id, task_data)
+        except LimitExceededError as e:
+            return limit_error(e)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         if not task:
             return jsonify({'error': 'Task not found'}), 404
         return jsonify(task)
@@ -311,11 +359,53 @@ async def delete_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
         return '', 204
 
+@bp.route('/api/tasks/<int:task_id>/restore', methods=['POST', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+async def restore_task(task_id):
+    """Вернуть задачу из архива"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    current_user = get_jwt_identity()
+
+    async with get_session() as session:
+        task_service = TaskService(session)
+        task = await task_service.restore_task(current_user, task_id)
+        if not task:
+            return jsonify({'error': 'Task not found in archive'}), 404
+        return jsonify(task)
+
+@bp.route('/api/tasks/batch', methods=['POST', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+@async_route
+async def batch_tasks():
+    """Создать, изменить и удалить несколько задач в одной транзакции"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    current_user = get_jwt_identity()
+    operations = (request.get_json(silent=True) or {}).get('operations')
+    if not isinstance(operations, list) or not all(isinstance(operation, dict) for operation in operations):
+        return jsonify({'error': 'operations must be a list of objects'}), 400
+    if len(operations) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Too many operations (max {MAX_BATCH_SIZE})'}), 400
+
+    async with get_session() as session:
+        task_service = TaskService(session)
+        results = await task_service.apply_batch(current_user, operations)
+        if results is None:
+            return jsonify({'error': 'User not found'}), 404
+        return jsonify({'results': results})
+
 # Маршруты для работы с настройками
 @bp.route('/api/settings/', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('default_settings', default_settings=True)
 async def get_settings():
     """Получить все настройки"""
     if request.method == 'OPTIONS':
@@ -396,6 +486,7 @@ async def delete_setting(setting_type, setting_id):
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('settings')
 async def get_task_types():
     """Получить список типов задач пользователя"""
     if request.method == 'OPTIONS':
@@ -509,6 +600,7 @@ async def calculate_deadline(duration_id):
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('settings')
 async def get_priorities():
     """Получить список приоритетов пользователя"""
     if request.method == 'OPTIONS':
@@ -528,6 +620,7 @@ async def get_priorities():
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('settings')
 async def get_statuses():
     """Получить список статусов пользователя"""
     if request.method == 'OPTIONS':
@@ -545,6 +638,7 @@ async def get_statuses():
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('settings')
 async def get_durations():
     """Получить список длительностей пользователя"""
     if request.method == 'OPTIONS':
@@ -4,6 +4,7 @@ from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+from backend.blueprints.conditional import conditional_get
 from backend.blueprints.wrapper import async_route
 from backend.database import get_session
 from backend.services.settings_service import SettingsService
@@ -16,6 +17,7 @@ logger = logging.getLogger(__name__)
 @cross_origin()
 @jwt_required()
 @async_route
+@conditional_get('preferences')
 async def get_user_preferences():
     """Получение настроек пользователя."""
     if request.method == 'OPTIONS':
@@ -1,34 +1,175 @@
+from concurrent.futures import Future
 from functools import wraps
 import asyncio
+import contextvars
 import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from flask import has_request_context, request
+
+T = TypeVar('T')
 
 # Глобальный словарь для хранения циклов событий по идентификаторам потоков
 _thread_local = threading.local()
 
+# Общий цикл событий процесса: цикл ASGI-сервера (uvicorn, см. backend/asgi.py)
+# или фоновый цикл потоковых WSGI-воркеров (start_background_loop).
+# Если он задан, обработчики из потоков WSGI выполняются в нем
+_server_loop: Optional[asyncio.AbstractEventLoop] = None
+# Поток фонового цикла, если цикл запущен start_background_loop
+_loop_thread: Optional[threading.Thread] = None
+
+
+def get_thread_loop() -> asyncio.AbstractEventLoop:
+    """Получить или создать цикл событий для текущего потока"""
+    if not hasattr(_thread_local, 'loop') or _thread_local.loop is None or _thread_local.loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _thread_local.loop = loop
+    return _thread_local.loop
+
+
+def set_server_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Задать общий цикл событий сервера (None - вернуться к циклам потоков)"""
+    global _server_loop
+    _server_loop = loop
+
+
+def get_server_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Общий цикл событий сервера или None"""
+    return _server_loop
+
+
+def start_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Запустить общий цикл событий процесса в отдельном потоке
+
+    Для WSGI-воркеров с несколькими потоками (gunicorn gthread, app.run):
+    обработчики всех потоков выполняются в этом цикле и используют один пул
+    соединений движка базы - соединения asyncpg привязаны к циклу, в котором
+    созданы. Запускается в каждом процессе воркера после fork.
+    """
+    global _loop_thread
+    if _loop_thread is not None and _server_loop is not None and _server_loop.is_running():
+        return _server_loop
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    _loop_thread = threading.Thread(target=run, name='async-loop', daemon=True)
+    _loop_thread.start()
+    ready.wait()
+    set_server_loop(loop)
+    return loop
+
+
+def stop_background_loop() -> None:
+    """Закрыть соединения пула и остановить фоновый цикл (при завершении воркера)"""
+    global _loop_thread
+    loop = _server_loop
+    if _loop_thread is None or loop is None or not loop.is_running():
+        return
+    from backend.database import engine
+
+    try:
+        run_async(engine.dispose())
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        _loop_thread.join(timeout=5)
+        _loop_thread = None
+        set_server_loop(None)
+
+
+def run_async(awaitable: Awaitable[T]) -> T:
+    """
+    Выполнить корутину из синхронного кода Flask и дождаться результата
+
+    Если задан общий цикл процесса (uvicorn или start_background_loop),
+    корутина выполняется в нем, как run_coroutine_threadsafe: запросы из разных
+    потоков выполняются одновременно и используют один пул соединений с базой.
+    В отличие от run_coroutine_threadsafe, корутине передается контекст потока
+    (request, g, JWT Flask). Без общего цикла (gunicorn sync, скрипты)
+    используется цикл событий текущего потока.
+    """
+    loop = _server_loop
+    if loop is None or loop.is_closed() or not loop.is_running():
+        return get_thread_loop().run_until_complete(awaitable)
+
+    context = contextvars.copy_context()
+    future: Future = Future()
+
+    def start() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            task = loop.create_task(awaitable, context=context)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        task.add_done_callback(lambda t: _copy_result(t, future))
+
+    loop.call_soon_threadsafe(start)
+    return future.result()
+
+
+def _read_request_body() -> None:
+    """
+    Прочитать тело запроса Flask в потоке обработчика
+
+    Под ASGI-сервером тело читается через цикл событий сервера, поэтому
+    из корутины в этом цикле (request.get_json() в обработчике) его прочитать
+    нельзя - цикл ждал бы сам себя. В фоновом цикле WSGI чтение из сокета
+    останавливало бы все запросы процесса. Прочитанное тело Flask кэширует.
+    """
+    if not has_request_context():
+        return
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        # Разбор формы читает и загруженные файлы
+        request.form
+    else:
+        request.get_data(cache=True)
+
+
+def _copy_result(task: asyncio.Task, future: Future) -> None:
+    """Перенести результат задачи цикла событий в Future ожидающего потока"""
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
 
 def async_route(f):
     @wraps(f)
     def wrapped(*args, **kwargs):
-        # Получаем ID текущего потока
-        thread_id = threading.get_ident()
-        
-        # Получаем или создаем цикл событий для текущего потока
-        if not hasattr(_thread_local, 'loop') or _thread_local.loop is None or _thread_local.loop.is_closed():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            _thread_local.loop = loop
-        
-        # Используем существующий цикл событий
-        loop = _thread_local.loop
-        
-        # Выполняем асинхронную функцию в этом цикле событий
-        try:
-            return loop.run_until_complete(f(*args, **kwargs))
-        except Exception as e:
-            # Не закрываем цикл событий при ошибке, но пробрасываем исключение дальше
-            raise e
-            
-        # Важно! Не закрываем цикл событий после выполнения
-        # Цикл будет переиспользован для следующих запросов в этом потоке
-    
+        # Цикл событий сервера или текущего потока переиспользуется
+        # для следующих запросов и не закрывается
+        if get_server_loop() is not None:
+            _read_request_body()
+        return run_async(f(*args, **kwargs))
+
     return wrapped
+
+
+def iterate_async(agen: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Синхронный итератор над асинхронным генератором для потоковых ответов Flask
+
+    Тело ответа читается сервером уже после выхода из обработчика, поэтому
+    каждый элемент вычисляется через run_async, как и сам обработчик.
+    При обрыве соединения генератор закрывается и освобождает ресурсы (сессию БД).
+    """
+    try:
+        while True:
+            try:
+                yield run_async(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose())
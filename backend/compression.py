@@ -0,0 +1,215 @@
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Hashable, Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, make_response, request
+
+from backend import metrics
+from backend.load_env import env_config
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость, без нее ответы сжимаются только gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Сжатие ответов API: включено ли, минимальный размер тела в байтах, уровни сжатия gzip (1-9) и brotli (0-11)
+COMPRESSION_ENABLED = env_config.get('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = env_config.get('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = env_config.get('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = env_config.get('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+# Сколько готовых ответов обработчиков с cache_compressed хранить в памяти процесса
+COMPRESSION_CACHE_SIZE = env_config.get('COMPRESSION_CACHE_SIZE', default=64, cast=int)
+
+# Сжимаемые типы ответов (выгрузка задач - ndjson и csv)
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+    'text/html',
+))
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Поддерживаемые кодировки в порядке предпочтения при одинаковом q"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Сжать тело ответа целиком"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Сжимать потоковый ответ по мере чтения
+
+    Сжатые данные отдаются, когда их накопит компрессор, поэтому в памяти
+    остается только его буфер, а не вся выгрузка. При обрыве соединения
+    закрывается исходный итератор (и его сессия БД).
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class ResponseCache:
+    """
+    Готовые (сжатые) ответы неизменных обработчиков в памяти процесса
+
+    Ключ - путь запроса с параметрами, выбранная кодировка и версия данных
+    обработчика, поэтому при попадании обработчик не выполняется вовсе.
+    Размер ограничен вытеснением давно не использованных (LRU).
+    """
+
+    def __init__(self, maxsize: int = COMPRESSION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Tuple[bytes, str, Optional[str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str, Optional[str]]]:
+        """Тело, mimetype и Content-Encoding ответа или None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                metrics.increment('compression_cache.hits')
+                return entry
+        metrics.increment('compression_cache.misses')
+        return None
+
+    def set(self, key: Hashable, entry: Tuple[bytes, str, Optional[str]]) -> None:
+        """Сохранить ответ"""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cache_compressed(version: Optional[Callable[[], Hashable]] = None):
+    """
+    Кэшировать готовый ответ GET-обработчика вместе со сжатием
+
+    Только для ответов, одинаковых для всех пользователей (список часовых поясов):
+    ключ кэша не содержит пользователя. Кэш проверяется до вызова обработчика,
+    version() - дешевый токен версии данных, при его изменении ответ строится заново.
+    Кэшируются только успешные непотоковые ответы.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            encoding = _choose_encoding() if COMPRESSION_ENABLED else None
+            key = (request.full_path, encoding, version() if version is not None else None)
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, mimetype, content_encoding = entry
+                response = Response(body, mimetype=mimetype)
+                if content_encoding:
+                    response.headers['Content-Encoding'] = content_encoding
+                if COMPRESSION_ENABLED:
+                    response.vary.add('Accept-Encoding')
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if COMPRESSION_ENABLED:
+                response = compress_response(response)
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, (
+                    response.get_data(), response.mimetype, response.headers.get('Content-Encoding'),
+                ))
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def _choose_encoding() -> Optional[str]:
+    """Кодировка из Accept-Encoding клиента или None, если сжимать нельзя"""
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None or request.accept_encodings[encoding] <= 0:
+        return None
+    return encoding
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Сжать ответ gzip или brotli по Accept-Encoding клиента (after_request)
+
+    Сжимаются успешные ответы сжимаемых типов не меньше COMPRESSION_MIN_SIZE байт.
+    Потоковые ответы (выгрузка задач) сжимаются по частям без ограничения размера.
+    Сильный ETag (conditional_get) становится слабым: тело в другой кодировке
+    отличается побайтно, а If-None-Match сравнивается без учета слабости.
+    """
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code in (204, 206)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers or response.direct_passthrough):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        metrics.increment('compression.streamed')
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        body = compress(data, encoding)
+        response.set_data(body)
+        metrics.increment('compression.bytes_in', len(data))
+        metrics.increment('compression.bytes_out', len(body))
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    metrics.increment(f'compression.{encoding}')
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Подключить сжатие ответов к приложению"""
+    if not COMPRESSION_ENABLED:
+        logger.info("Сжатие ответов отключено (COMPRESSION_ENABLED)")
+        return
+    app.after_request(compress_response)
+    logger.debug(f"Сжатие ответов: {', '.join(available_encodings())}, от {COMPRESSION_MIN_SIZE} байт")
@@ -79,6 +79,7 @@ def get_bot_commands(user_locale: FluentLocalization = None):
         #BotCommand(command='profile', description=user_locale.format_value("my_profile_menu")),
         BotCommand(command='tasks', description=user_locale.format_value("tasks-menu")),
         BotCommand(command='add_task', description=user_locale.format_value("add-task-menu")),
+        BotCommand(command='export', description=user_locale.format_value("export-menu")),
         BotCommand(command='settings', description=user_locale.format_value("settings_menu")),
         BotCommand(command='language', description=user_locale.format_value("settings_language")),
         BotCommand(command='timezone', description=user_locale.format_value("settings_timezone")),
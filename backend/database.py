@@ -1,11 +1,12 @@
 from contextlib import asynccontextmanager
-from sqlalchemy import select
+from sqlalchemy import select, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 import json
 import logging
 
 from backend.create_bot import db_string
 from backend.db.models import DurationType, DefaultSettings, GlobalSettings, StatusSetting, PrioritySetting, DurationSetting, TaskTypeSetting
+from backend.services.settings_cache import bump_settings_version
 
 
 # Создаем асинхронный движок SQLAlchemy с оптимизированными настройками
@@ -22,6 +23,25 @@ engine = create_async_engine(
 
 logger = logging.getLogger(__name__)
 
+
+def register_sqlite_functions(async_engine) -> None:
+    """Зарегистрировать Python-реализации SQL-функций для SQLite
+
+    Встроенная функция lower() в SQLite работает только с ASCII, поэтому поиск
+    и сортировка по кириллице вели бы себя иначе, чем в PostgreSQL.
+    """
+    if async_engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function(
+            "lower", 1, lambda value: value.lower() if isinstance(value, str) else value, deterministic=True
+        )
+
+
+register_sqlite_functions(engine)
+
 # Создаем фабрику асинхронных сессий
 async_session = async_sessionmaker(
     engine,
@@ -430,6 +450,8 @@ async def create_user_settings(user_id: int, session: AsyncSession):
         task_type_count += 1
     
     try:
+        # Пустые настройки пользователя могли попасть в кэш настроек
+        await bump_settings_version(session, user_id)
         await session.commit()
         logger.debug(f"Созданы настройки для пользователя {user_id}: "
                     f"{status_count} статусов, {priority_count} приоритетов, "
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, date
 
 import pytz
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, JSON, Text, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, JSON, Text, BigInteger, Index, text
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
 import enum
@@ -72,6 +72,12 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     settings = Column(JSON, default=dict)  # Пользовательские настройки в JSON
+    # Версия настроек задач (статусы, приоритеты, продолжительности, типы): увеличивается
+    # при каждом их изменении и проверяется кэшем настроек (settings_cache)
+    settings_version = Column(Integer, nullable=False, default=0, server_default='0')
+    # Версия данных пользователя (задачи, настройки, предпочтения): увеличивается при каждом
+    # их изменении, из нее API строит ETag для условных GET-запросов (data_version)
+    data_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     # Связи с другими таблицами
     tasks = relationship('Task', back_populates='user')
@@ -83,6 +89,11 @@ class User(Base):
 class StatusSetting(Base):
     """Настройки статусов задач для пользователя"""
     __tablename__ = 'status_settings'
+    __table_args__ = (
+        Index('ix_status_settings_user_id_order', 'user_id', 'order'),
+        Index('ix_status_settings_user_id_default', 'user_id',
+              postgresql_where=text('is_default = true'), sqlite_where=text('is_default = 1')),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
@@ -103,6 +114,11 @@ class StatusSetting(Base):
 class PrioritySetting(Base):
     """Настройки приоритетов для пользователя"""
     __tablename__ = 'priority_settings'
+    __table_args__ = (
+        Index('ix_priority_settings_user_id_order', 'user_id', 'order'),
+        Index('ix_priority_settings_user_id_default', 'user_id',
+              postgresql_where=text('is_default = true'), sqlite_where=text('is_default = 1')),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
@@ -121,6 +137,11 @@ class PrioritySetting(Base):
 class DurationSetting(Base):
     """Настройки продолжительности для пользователя"""
     __tablename__ = 'duration_settings'
+    __table_args__ = (
+        Index('ix_duration_settings_user_id_id', 'user_id', 'id'),
+        Index('ix_duration_settings_user_id_default', 'user_id',
+              postgresql_where=text('is_default = true'), sqlite_where=text('is_default = 1')),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
@@ -152,22 +173,45 @@ class DurationSetting(Base):
             if not duration:
                 return from_date
 
-            if duration.duration_type == DurationType.DAYS:
-                return from_date + timedelta(days=duration.value)
-            elif duration.duration_type == DurationType.WEEKS:
-                return from_date + timedelta(weeks=duration.value)
-            elif duration.duration_type == DurationType.MONTHS:
-                return from_date + relativedelta(months=duration.value)
-            elif duration.duration_type == DurationType.YEARS:
-                return from_date + relativedelta(years=duration.value)
-
-            return from_date
+            return duration.deadline_from(from_date)
         except Exception as e:
             logger.exception(f"Ошибка при расчете дедлайна: {e}")
 
+    def deadline_from(self, from_date: datetime) -> datetime:
+        """Дедлайн через эту продолжительность от from_date (без обращения к базе)"""
+        return deadline_after(from_date, self.duration_type, self.value)
+
+
+def deadline_after(from_date: datetime, duration_type: DurationType, value: int) -> datetime:
+    """Дедлайн через value единиц продолжительности duration_type от from_date"""
+    if duration_type == DurationType.DAYS:
+        return from_date + timedelta(days=value)
+    elif duration_type == DurationType.WEEKS:
+        return from_date + timedelta(weeks=value)
+    elif duration_type == DurationType.MONTHS:
+        return from_date + relativedelta(months=value)
+    elif duration_type == DurationType.YEARS:
+        return from_date + relativedelta(years=value)
+
+    return from_date
+
+
 class Task(Base):
     """Модель задачи"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index('ix_tasks_user_id_id', 'user_id', 'id'),
+        Index('ix_tasks_user_id_deadline', 'user_id', 'deadline', 'id'),
+        # Незавершенные задачи: основной список в боте и поиск просроченных
+        Index('ix_tasks_user_id_open_deadline', 'user_id', 'deadline', 'id',
+              postgresql_where=text('completed_at IS NULL'), sqlite_where=text('completed_at IS NULL')),
+        Index('ix_tasks_user_id_completed_at', 'user_id', 'completed_at'),
+        # Завершенные задачи для переноса в архив (TaskArchiveService.archive_completed)
+        Index('ix_tasks_completed_at', 'completed_at', 'id',
+              postgresql_where=text('completed_at IS NOT NULL'), sqlite_where=text('completed_at IS NOT NULL')),
+        # SQLite не выдает повторно id удаленных задач: они могут быть в tasks_archive
+        {'sqlite_autoincrement': True},
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
@@ -175,10 +219,10 @@ class Task(Base):
     description = Column(String(1000))
 
     # Связи с настройками
-    status_id = Column(Integer, ForeignKey('status_settings.id', ondelete='SET NULL'))
-    priority_id = Column(Integer, ForeignKey('priority_settings.id', ondelete='SET NULL'))
-    type_id = Column(Integer, ForeignKey("task_type_settings.id"), nullable=True)
-    duration_id = Column(Integer, ForeignKey('duration_settings.id', ondelete='SET NULL'))
+    status_id = Column(Integer, ForeignKey('status_settings.id', ondelete='SET NULL'), index=True)
+    priority_id = Column(Integer, ForeignKey('priority_settings.id', ondelete='SET NULL'), index=True)
+    type_id = Column(Integer, ForeignKey("task_type_settings.id"), nullable=True, index=True)
+    duration_id = Column(Integer, ForeignKey('duration_settings.id', ondelete='SET NULL'), index=True)
 
     # Даты
     created_at = Column(DateTime(timezone=True), default=func.now())
@@ -233,14 +277,62 @@ class Task(Base):
             self.completed_at = None
 
     def is_overdue(self) -> bool:
-        """Проверить, просрочена ли задача"""
+        """
+        Проверить, просрочена ли задача
+
+        Списки задач получают признак из запроса (overdue_predicate в task_filter),
+        здесь - проверка для отдельного объекта без обращения к пользователю.
+        """
         if not self.deadline or self.completed_at or (self.status and self.status.is_final):
             return False
-        return datetime.now(tz=pytz.timezone(self.user.timezone)).timestamp() > self.deadline.timestamp()
+        return datetime.now(tz=pytz.utc).timestamp() > self.deadline.timestamp()
+
+
+class TaskArchive(Base):
+    """
+    Архив задач, завершенных давно (TaskArchiveService)
+
+    Колонки совпадают с tasks, id задачи при переносе сохраняется. Списки задач
+    читают архив только для завершенных задач или по флагу include_archived.
+    """
+    __tablename__ = 'tasks_archive'
+    __table_args__ = (
+        Index('ix_tasks_archive_user_id_id', 'user_id', 'id'),
+        Index('ix_tasks_archive_user_id_deadline', 'user_id', 'deadline', 'id'),
+        Index('ix_tasks_archive_user_id_completed_at', 'user_id', 'completed_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
+    title = Column(String(200), nullable=False)
+    description = Column(String(1000))
+
+    status_id = Column(Integer, ForeignKey('status_settings.id', ondelete='SET NULL'), index=True)
+    priority_id = Column(Integer, ForeignKey('priority_settings.id', ondelete='SET NULL'), index=True)
+    type_id = Column(Integer, ForeignKey("task_type_settings.id"), nullable=True, index=True)
+    duration_id = Column(Integer, ForeignKey('duration_settings.id', ondelete='SET NULL'), index=True)
+
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    deadline = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+
+    reminders = Column(JSON)
+    last_reminder_sent = Column(DateTime(timezone=True))
+    tags = Column(JSON)
+    custom_fields = Column(JSON)
+
+    # Время переноса в архив
+    archived_at = Column(DateTime(timezone=True), default=func.now())
 
 
 class TaskTypeSetting(Base):
     __tablename__ = "task_type_settings"
+    __table_args__ = (
+        Index('ix_task_type_settings_user_id_order', 'user_id', 'order'),
+        Index('ix_task_type_settings_user_id_default', 'user_id',
+              postgresql_where=text('is_default = true'), sqlite_where=text('is_default = 1')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False, index=True)
@@ -257,6 +349,23 @@ class TaskTypeSetting(Base):
     user = relationship('User', back_populates='task_type_settings')
 
 
+class UserTaskStat(Base):
+    """
+    Счетчики задач пользователя (TaskStatsService)
+
+    Обновляются в той же транзакции, что и изменение задач. kind - вид счетчика
+    (total, open, completed, status, priority, type - по задачам в tasks;
+    archived - задачи в tasks_archive), key - ID настройки
+    для счетчиков по настройкам (0 - настройка не задана), иначе 0.
+    """
+    __tablename__ = 'user_task_stats'
+
+    user_id = Column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    key = Column(Integer, primary_key=True, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
+
+
 class AuthStates(Base):
     """Модель для хранения состояний авторизации пользователя"""
     __tablename__ = 'auth_states'
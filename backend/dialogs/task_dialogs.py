@@ -15,6 +15,7 @@ from aiogram_dialog.widgets.widget_event import SimpleEventProcessor
 from backend.custom_widgets import I18NFormat
 from backend.locale_config import i18n
 from backend.services.task_service import TaskService
+from backend.services.global_settings import LimitExceededError
 from backend.services.settings_service import SettingsService
 from backend.database import get_session
 from backend.utils import escape_html
@@ -383,6 +384,8 @@ async def main_process_result(start_data: Data, result: Any,
                     })
                 )
                 logger.debug("Task created message sent")
+    except LimitExceededError as e:
+        await dialog_manager.event.answer(i18n.format_value("task-limit-reached", {"limit": e.limit}))
     except Exception as e:
         logger.exception(f"Error creating task: {e}")
         await dialog_manager.event.answer(i18n.format_value("error"))
@@ -85,7 +85,7 @@ async def get_task_data(dialog_manager: DialogManager, **kwargs):
         # Получаем задачу по ID
         tasks = await task_service.get_tasks(
             str(user_id),
-            filters={"id": task_id}
+            filters={"id": task_id, "include_archived": True}
         )
         
         if not tasks or len(tasks) == 0:
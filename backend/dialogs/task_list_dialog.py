@@ -17,6 +17,7 @@ from typing import Any
 
 from backend.custom_widgets import I18NFormat
 from backend.db.models import User
+from backend.models.task_filter import TaskFilter
 from backend.locale_config import i18n
 from backend.services.task_service import TaskService
 from backend.services.settings_service import SettingsService
@@ -124,40 +125,60 @@ async def get_tasks_data(dialog_manager: DialogManager, **kwargs):
         task_service = TaskService(session)
         user = await session.get(User, user_id)
 
+        # Курсоры страниц действительны только для текущих фильтров и сортировки
+        list_key = json.dumps([filters, sort_by, sort_order], sort_keys=True, ensure_ascii=False, default=str)
+        task_cursors = dialog_manager.dialog_data.get("task_cursors")
+        if not task_cursors or task_cursors.get("key") != list_key:
+            task_cursors = {"key": list_key, "pages": {}}
+
         # Получаем задачи с пагинацией и общее количество
         logger.info(f"Page={page} page_size={page_size}")
         try:
-            tasks, total_tasks = await task_service.get_tasks_paginated(
-                str(user_id),
-                page=page,
-                page_size=page_size,
-                filters=filters,
-                sort_by=sort_by,
-                sort_order=sort_order,
-                search_query=safe_search_query
-            )
+            # Фильтр (вместе с поисковым запросом) разбирается один раз для всех запросов
+            task_filter = TaskFilter.from_dict(filters)
+            total_tasks = await task_service.get_task_count(str(user_id), task_filter)
+
+            # Вычисляем общее количество страниц
+            total_pages = (total_tasks + page_size - 1) // page_size if total_tasks > 0 else 1
+
+            # Если запрошенная страница больше общего количества страниц, показываем последнюю страницу
+            if page > total_pages > 0:
+                page = total_pages
+                dialog_manager.dialog_data["page"] = page
+
+            cursor = task_cursors["pages"].get(str(page))
+            # Поиск без сортировки OFFSET упорядочивает по релевантности, а курсор - по id.
+            # Чтобы переходы NumberedPager не давали пересекающихся страниц, такой список
+            # листается только через OFFSET
+            use_cursor = bool(sort_by) or not task_filter.search
+            if use_cursor and (page == 1 or cursor):
+                # Последовательное листание идет по курсорам, без OFFSET
+                tasks, next_cursor = await task_service.get_tasks_by_cursor(
+                    str(user_id),
+                    cursor=cursor,
+                    limit=page_size,
+                    filters=task_filter,
+                    sort_by=sort_by,
+                    sort_order=sort_order
+                )
+                if next_cursor:
+                    task_cursors["pages"][str(page + 1)] = next_cursor
+            else:
+                # Переход на произвольную страницу через NumberedPager
+                tasks, _ = await task_service.get_tasks_paginated(
+                    str(user_id),
+                    page=page,
+                    page_size=page_size,
+                    filters=task_filter,
+                    sort_by=sort_by,
+                    sort_order=sort_order
+                )
         except Exception as e:
             logger.error(f"Ошибка при получении задач: {e}")
             return {"tasks": [], "total_tasks": 0, "total_pages": 0, "page": 1, "error": str(e)}
-        
-        # Вычисляем общее количество страниц
-        total_pages = (total_tasks + page_size - 1) // page_size if total_tasks > 0 else 1
-        
-        # Если запрошенная страница больше общего количества страниц, показываем последнюю страницу
-        if page > total_pages > 0:
-            page = total_pages
-            dialog_manager.dialog_data["page"] = page
-            # Получаем задачи для последней страницы
-            tasks, _ = await task_service.get_tasks_paginated(
-                str(user_id),
-                page=page,
-                page_size=page_size,
-                filters=filters,
-                sort_by=sort_by,
-                sort_order=sort_order,
-                search_query=safe_search_query
-            )
-        
+
+        dialog_manager.dialog_data["task_cursors"] = task_cursors
+
         # Обновляем StubScroll с текущей страницей (0-based)
         try:
             await dialog_manager.find("tasks_scroll").set_page(page - 1)
@@ -181,7 +202,7 @@ async def get_tasks_data(dialog_manager: DialogManager, **kwargs):
             status = escape_html(task['status']['name'] if task['status'] else i18n.format_value("status-not-set"))
             priority = escape_html(task['priority']['name'] if task['priority'] else i18n.format_value("priority-not-set"))
             task_type = escape_html(task['type']['name'] if task['type'] else i18n.format_value("type-not-set"))
-            deadline = escape_html((task['deadline'].astimezone(pytz.timezone(user.timezone)).strftime("%d.%m.%Y %H:%M") if task['deadline'] else "") + ((" " + i18n.format_value("deadline-overdue")) if task['deadline'] and not task['completed_at'] and task['deadline'] < datetime.now(tz=pytz.timezone(user.timezone)) else "") if task['deadline'] else i18n.format_value("deadline-not-set"))
+            deadline = escape_html((task['deadline'].astimezone(pytz.timezone(user.timezone)).strftime("%d.%m.%Y %H:%M") if task['deadline'] else "") + ((" " + i18n.format_value("deadline-overdue")) if task['is_overdue'] else "") if task['deadline'] else i18n.format_value("deadline-not-set"))
             completed = "✅" if task['completed_at'] is not None else "❌"
             
             task_info = {
@@ -210,32 +231,35 @@ async def get_tasks_data(dialog_manager: DialogManager, **kwargs):
             "sort_description": sort_description
         }
 
-async def get_statuses(dialog_manager: DialogManager, **kwargs):
-    """Получает список статусов для фильтрации"""
+async def get_filter_options(dialog_manager: DialogManager, items_key: str, facet_key: str) -> dict:
+    """
+    Настройки для экрана фильтра с количеством задач для каждого значения
+
+    Количество считается с текущими фильтрами (кроме фильтра по этому полю)
+    одним запросом фасетов для всех полей.
+    """
     user_id = dialog_manager.event.from_user.id if hasattr(dialog_manager.event, 'from_user') else None
-    
+    filters = dialog_manager.dialog_data.get("filters", {})
+
     async with get_session() as session:
         settings_service = SettingsService(session)
         settings = await settings_service.get_settings(str(user_id) if user_id else None)
-        return {"statuses": settings["statuses"]}
+        facets = await TaskService(session).get_facets(str(user_id), filters) if user_id else None
+
+    counts = {item["id"]: item["count"] for item in facets[facet_key]} if facets else {}
+    return {items_key: [{**item, "count": counts.get(item["id"], 0)} for item in settings[items_key]]}
+
+async def get_statuses(dialog_manager: DialogManager, **kwargs):
+    """Получает список статусов для фильтрации"""
+    return await get_filter_options(dialog_manager, "statuses", "by_status")
 
 async def get_priorities(dialog_manager: DialogManager, **kwargs):
     """Получает список приоритетов для фильтрации"""
-    user_id = dialog_manager.event.from_user.id if hasattr(dialog_manager.event, 'from_user') else None
-    
-    async with get_session() as session:
-        settings_service = SettingsService(session)
-        settings = await settings_service.get_settings(str(user_id) if user_id else None)
-        return {"priorities": settings["priorities"]}
+    return await get_filter_options(dialog_manager, "priorities", "by_priority")
 
 async def get_task_types(dialog_manager: DialogManager, **kwargs):
     """Получает список типов задач для фильтрации"""
-    user_id = dialog_manager.event.from_user.id if hasattr(dialog_manager.event, 'from_user') else None
-    
-    async with get_session() as session:
-        settings_service = SettingsService(session)
-        settings = await settings_service.get_settings(str(user_id) if user_id else None)
-        return {"task_types": settings["task_types"]}
+    return await get_filter_options(dialog_manager, "task_types", "by_type")
 
 async def get_filter_description(filters: dict, user_id: str = None) -> str:
     """Формирует описание примененных фильтров для отображения пользователю"""
@@ -293,6 +317,9 @@ async def get_filter_description(filters: dict, user_id: str = None) -> str:
         deadline_to = escape_html(str(filters_copy['deadline_to']))
         filter_parts.append(i18n.format_value("deadline_to_filter", {'deadline_to': deadline_to}))
     
+    if filters_copy.get('is_overdue'):
+        filter_parts.append(i18n.format_value("task-list-filter-deadline-overdue"))
+
     if 'is_completed' in filters_copy:
         completed_status = i18n.format_value("task-list-filter-completed-all") if filters_copy['is_completed'] else i18n.format_value("task-list-filter-uncompleted-only")
         filter_parts.append(completed_status)
@@ -502,6 +529,7 @@ async def on_deadline_today(c: CallbackQuery, button: Button, manager: DialogMan
     filters = manager.dialog_data.get("filters", {})
     filters["deadline_from"] = today
     filters["deadline_to"] = today
+    filters.pop("is_overdue", None)
     manager.dialog_data["filters"] = filters
     
     # Сохраняем настройки пользователя
@@ -533,6 +561,7 @@ async def on_deadline_tomorrow(c: CallbackQuery, button: Button, manager: Dialog
     filters = manager.dialog_data.get("filters", {})
     filters["deadline_from"] = tomorrow
     filters["deadline_to"] = tomorrow
+    filters.pop("is_overdue", None)
     manager.dialog_data["filters"] = filters
     
     # Сохраняем настройки пользователя
@@ -566,6 +595,7 @@ async def on_deadline_week(c: CallbackQuery, button: Button, manager: DialogMana
     filters = manager.dialog_data.get("filters", {})
     filters["deadline_from"] = start_of_week
     filters["deadline_to"] = end_of_week
+    filters.pop("is_overdue", None)
     manager.dialog_data["filters"] = filters
     await manager.switch_to(TaskListStates.main)
 
@@ -595,27 +625,17 @@ async def on_deadline_month(c: CallbackQuery, button: Button, manager: DialogMan
     filters = manager.dialog_data.get("filters", {})
     filters["deadline_from"] = start_of_month
     filters["deadline_to"] = end_of_month
+    filters.pop("is_overdue", None)
     manager.dialog_data["filters"] = filters
     await manager.switch_to(TaskListStates.main)
 
 async def on_deadline_overdue(c: CallbackQuery, button: Button, manager: DialogManager):
     """Обработчик выбора фильтра по просроченным задачам"""
-    from datetime import datetime
-    user_id = manager.event.from_user.id if hasattr(manager.event, 'from_user') else None
-    timezone = "Europe/Moscow"
-    async with get_session() as session:
-        try:
-            user = await session.get(User, user_id)
-
-            timezone = user.timezone
-        except Exception as e:
-            logger.exception(f"Error on_deadline_overdue: {e}")
-    yesterday = (datetime.now(tz=pytz.timezone(timezone)).date() - timedelta(days=1)).strftime("%Y-%m-%d")
-    
     filters = manager.dialog_data.get("filters", {})
-    filters["deadline_to"] = yesterday
-    if "deadline_from" in filters:
-        filters.pop("deadline_from")
+    # Просрочка проверяется в запросе по текущему времени, а не по вчерашней дате
+    filters["is_overdue"] = True
+    filters.pop("deadline_from", None)
+    filters.pop("deadline_to", None)
     manager.dialog_data["filters"] = filters
     await manager.switch_to(TaskListStates.main)
 
@@ -667,6 +687,22 @@ async def on_sort_by_priority(c: CallbackQuery, button: Button, manager: DialogM
     
     await manager.switch_to(TaskListStates.sort_direction)
 
+async def on_sort_by_overdue(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Обработчик выбора сортировки по просрочке (по возрастанию - просроченные первыми)"""
+    manager.dialog_data["sort_by"] = "overdue"
+
+    # Сохраняем настройки пользователя
+    user_id = str(manager.event.from_user.id) if hasattr(manager.event, 'from_user') else None
+    if user_id:
+        await save_user_settings(
+            user_id,
+            manager.dialog_data.get("filters", {}),
+            "overdue",
+            manager.dialog_data.get("sort_order")
+        )
+
+    await manager.switch_to(TaskListStates.sort_direction)
+
 async def on_sort_by_created(c: CallbackQuery, button: Button, manager: DialogManager):
     """Обработчик выбора сортировки по дате создания"""
     manager.dialog_data["sort_by"] = "created_at"
@@ -986,7 +1022,7 @@ task_list_dialog = Dialog(
         I18NFormat("task-list-filter-status-title"),
         Group(
             Select(
-                Format("{item[name]}"),
+                Format("{item[name]} ({item[count]})"),
                 id="status",
                 item_id_getter=lambda x: x["id"],
                 items="statuses",
@@ -1006,7 +1042,7 @@ task_list_dialog = Dialog(
         I18NFormat("task-list-filter-priority-title"),
         Group(
             Select(
-                Format("{item[name]}"),
+                Format("{item[name]} ({item[count]})"),
                 id="priority",
                 item_id_getter=lambda x: x["id"],
                 items="priorities",
@@ -1026,7 +1062,7 @@ task_list_dialog = Dialog(
         I18NFormat("task-list-filter-type-title"),
         Group(
             Select(
-                Format("{item[name]}"),
+                Format("{item[name]} ({item[count]})"),
                 id="type",
                 item_id_getter=lambda x: x["id"],
                 items="task_types",
@@ -1090,6 +1126,9 @@ task_list_dialog = Dialog(
             Button(I18NFormat("task-list-sort-by-priority"), id="sort_priority", on_click=on_sort_by_priority),
             Button(I18NFormat("task-list-sort-by-created"), id="sort_created", on_click=on_sort_by_created),
         ),
+        Row(
+            Button(I18NFormat("task-list-sort-by-overdue"), id="sort_overdue", on_click=on_sort_by_overdue),
+        ),
         Row(
             SwitchTo(I18NFormat("task-list-back-button"), id="back_to_main", state=TaskListStates.main),
         ),
@@ -3,9 +3,15 @@ import multiprocessing
 
 # Основные настройки Gunicorn
 bind = "0.0.0.0:5000"
-worker_class = "sync"  # Используем sync worker для работы с нашим async_route декоратором
+# Режим сервера: asgi - воркеры uvicorn, запросы воркера выполняются в общем цикле событий
+# (backend.run:create_app_asgi()); wsgi - gthread воркеры, потоки воркера выполняют запросы
+# в общем фоновом цикле событий (backend.run:create_app_wsgi()).
+# Режим должен совпадать с приложением в entrypoint.sh
+SERVER_MODE = os.environ.get("SERVER_MODE", "asgi")
+worker_class = "uvicorn_worker.UvicornWorker" if SERVER_MODE == "asgi" else "gthread"
 workers = 2 #multiprocessing.cpu_count() * 2 + 1  # Рекомендуемое количество воркеров
-threads = 1  # Количество потоков на воркера
+# Количество потоков на воркера в режиме wsgi (в режиме asgi потоки обработчиков задает ASGI_THREADS)
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
 max_requests = 1000  # Максимальное количество запросов до перезапуска воркера
 max_requests_jitter = 50  # Добавляем случайность для предотвращения одновременного перезапуска всех воркеров
 timeout = 120  # Таймаут для воркеров, увеличен для длительных операций
@@ -28,6 +34,11 @@ def post_fork(server, worker):
     import time
     random.seed(int(time.time()) + worker_id)
 
+def worker_exit(server, worker):
+    """Закрыть соединения с базой фонового цикла событий воркера (режим wsgi)"""
+    from backend.blueprints.wrapper import stop_background_loop
+    stop_background_loop()
+
 # Обработчик инициализации воркера
 def worker_int(worker):
     """Обработчик сигнала SIGINT для воркера"""
@@ -1,16 +1,19 @@
 import logging
+import os
+import tempfile
 import jwt
 import uuid
 from datetime import datetime, timedelta, UTC
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, FSInputFile
 from aiogram_dialog import DialogManager, StartMode
 
 from backend.database import get_session, create_user_settings
 from backend.dialogs.task_list_dialog import TaskListStates
 from backend.locale_config import i18n, get_user_locale, AVAILABLE_LANGUAGES, set_user_locale, set_current_user_id
 from backend.services.task_service import TaskService
+from backend.services.task_export import EXPORT_FORMATS, export_chunks
 from backend.services.auth_service import AuthService
 from backend.services.settings_service import SettingsService
 from backend.dialogs.task_dialogs import TaskDialog
@@ -218,6 +221,7 @@ async def show_help(message: Message):
             i18n.format_value("help-tasks") + "\n" +
             i18n.format_value("help-add-task") + "\n" +
             i18n.format_value("help-delete-task") + "\n" +
+            i18n.format_value("help-export") + "\n" +
             "\n" +
             i18n.format_value("settings_command_help") + "\n" +
             i18n.format_value("settings_statuses_command_help") + "\n" +
@@ -251,20 +255,65 @@ async def start_add_task(message: Message, dialog_manager: DialogManager):
 
 @router.message(Command("delete_task"))
 async def delete_task(message: Message):
-    """Удалить задачу"""
+    """Удалить одну или несколько задач: /delete_task id [id ...]"""
     try:
-        task_id = int(message.text.split()[1])
+        task_ids = [int(task_id) for task_id in message.text.split()[1:]]
+        if not task_ids:
+            raise IndexError
         async with get_session() as session:
             task_service = TaskService(session)
-            success = await task_service.delete_task(str(message.from_user.id), task_id)
+            # Все задачи удаляются одним пакетом в одной транзакции
+            results = await task_service.bulk_delete_tasks(str(message.from_user.id), task_ids)
 
-            if success:
-                await message.answer(i18n.format_value("task-deleted", {"id": task_id}))
-            else:
-                await message.answer(i18n.format_value("task-delete-error", {"id": task_id}))
+        lines = [
+            i18n.format_value("task-deleted" if success else "task-delete-error", {"id": task_id})
+            for task_id, success in zip(task_ids, results)
+        ]
+        await message.answer("\n".join(lines))
     except (IndexError, ValueError):
         await message.answer(i18n.format_value("task-delete-usage"))
 
+@router.message(Command("export"))
+async def export_tasks(message: Message):
+    """Выгрузить задачи пользователя файлом: /export [csv|ndjson]"""
+    user_id = str(message.from_user.id)
+    set_current_user_id(user_id)
+
+    args = message.text.split()
+    export_format = args[1].lower() if len(args) > 1 else 'csv'
+    if export_format not in EXPORT_FORMATS:
+        await message.answer(i18n.format_value("export-usage"))
+        return
+
+    try:
+        # Файл пишется частями по мере чтения задач, в памяти не собирается
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f"tasks.{export_format}")
+            exported = 0
+
+            async with get_session() as session:
+                async def counted_chunks():
+                    nonlocal exported
+                    async for chunk in TaskService(session).stream_tasks(user_id):
+                        exported += len(chunk)
+                        yield chunk
+
+                with open(path, 'w', encoding='utf-8', newline='') as file:
+                    async for text in export_chunks(counted_chunks(), export_format):
+                        file.write(text)
+
+            if not exported:
+                await message.answer(i18n.format_value("export-empty"))
+                return
+
+            await message.answer_document(
+                FSInputFile(path),
+                caption=i18n.format_value("export-caption", {"format": export_format})
+            )
+    except Exception as e:
+        logger.exception(f"Ошибка при выгрузке задач: {e}")
+        await message.answer(i18n.format_value("export-error"))
+
 @router.message(Command("settings"))
 async def show_settings(message: Message):
     """Показать меню настроек пользователя"""
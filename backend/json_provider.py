@@ -0,0 +1,87 @@
+import dataclasses
+import decimal
+import json
+import logging
+import uuid
+from datetime import date
+from enum import Enum
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость, без нее используется модуль json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def json_default(o: Any) -> Any:
+    """
+    Значения, которые JSON-кодировщик не сериализует сам
+
+    Даты кодируются так же, как в провайдере Flask по умолчанию (http_date),
+    чтобы формат ответов API не изменился. Модели pydantic (backend/models)
+    отдаются словарем полей, перечисления (DurationType) - значением.
+    """
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, BaseModel):
+        return o.model_dump()
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class PlannerJSONProvider(DefaultJSONProvider):
+    """
+    JSON-провайдер Flask на orjson (без orjson - на модуле json)
+
+    Ответы по умолчанию компактные, в том числе в режиме отладки
+    (compact = False включает отступы). Ответ кодируется сразу в байты,
+    без промежуточной строки. Порядок ключей сортируется, как у провайдера
+    Flask по умолчанию (sort_keys).
+    """
+
+    default = staticmethod(json_default)
+    compact = True
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        # Даты передаются в json_default: orjson сам кодировал бы их в ISO 8601
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Дополнительные параметры модуля json (separators, indent и т.п.) orjson не поддерживает
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False
+        if orjson is None:
+            dump_args = {'indent': 2} if indent else {'separators': (',', ':')}
+            body = json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii,
+                              sort_keys=self.sort_keys, **dump_args).encode()
+        else:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
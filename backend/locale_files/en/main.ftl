@@ -117,6 +117,7 @@ task-list-sort-by-title = By title
 task-list-sort-by-deadline = By deadline
 task-list-sort-by-priority = By priority
 task-list-sort-by-created = By creation date
+task-list-sort-by-overdue = Overdue first
 task-list-sort-asc = Ascending
 task-list-sort-desc = Descending
 task-list-sort-direction-title = Select sorting direction:
@@ -128,6 +129,7 @@ sort-field-deadline = Deadline
 sort-field-priority = Priority
 sort-field-status = Status
 sort-field-type = Type
+sort-field-overdue = Overdue
 
 # Sort directions
 sort-direction-asc = ascending
@@ -139,6 +141,7 @@ task-list-search-cancel = ↩️ Cancel
 
 # Task creation
 task-created = ✅ Task successfully created!
+task-limit-reached = ❌ Task limit reached: {$limit}. Delete tasks you no longer need to create a new one
 task-created-details =
     📝 {$title}
     Description: {$description}
@@ -167,12 +170,20 @@ task-deleted = ✅ Task {$id} successfully deleted
 task-delete-error = ❌ Task {$id} not found or you don't have permission to delete it
 task-delete-usage = ❌ Please specify task ID: /delete_task id
 
+# Task export
+export-menu = Export tasks
+export-usage = ❌ Unknown format. Usage: /export csv or /export ndjson
+export-empty = 📭 No tasks to export
+export-caption = 📤 Your tasks ({$format})
+export-error = ❌ Failed to export tasks
+
 # Help
 help-header = 📋 Available commands:
 help-tasks = /tasks - Show task list
 add-task-menu = Create new task
 help-add-task = /add_task Create new task
-help-delete-task = /delete_task id - Delete task by ID
+help-delete-task = /delete_task id [id ...] - Delete tasks by ID
+help-export = /export [csv|ndjson] - Export tasks to a file
 help-menu = Show help
 help-help = /help Show this help
 
@@ -117,6 +117,7 @@ task-list-sort-by-title = По названию
 task-list-sort-by-deadline = По дедлайну
 task-list-sort-by-priority = По приоритету
 task-list-sort-by-created = По дате создания
+task-list-sort-by-overdue = Сначала просроченные
 task-list-sort-asc = По возрастанию
 task-list-sort-desc = По убыванию
 task-list-sort-direction-title = Выберите направление сортировки:
@@ -128,6 +129,7 @@ sort-field-deadline = Дедлайн
 sort-field-priority = Приоритет
 sort-field-status = Статус
 sort-field-type = Тип
+sort-field-overdue = Просрочка
 
 # Направления сортировки
 sort-direction-asc = по возрастанию
@@ -139,6 +141,7 @@ task-list-search-cancel = ↩️ Отмена
 
 # Создание задачи
 task-created = ✅ Задача успешно создана!
+task-limit-reached = ❌ Достигнуто максимальное количество задач: {$limit}. Удалите ненужные задачи, чтобы создать новую
 task-created-details =
     📝 {$title}
     Описание: {$description}
@@ -167,12 +170,20 @@ task-deleted = ✅ Задача {$id} успешно удалена
 task-delete-error = ❌ Задача {$id} не найдена или у вас нет прав на её удаление
 task-delete-usage = ❌ Пожалуйста, укажите ID задачи: /delete_task id
 
+# Выгрузка задач
+export-menu = Выгрузить задачи
+export-usage = ❌ Неизвестный формат. Использование: /export csv или /export ndjson
+export-empty = 📭 Нет задач для выгрузки
+export-caption = 📤 Ваши задачи ({$format})
+export-error = ❌ Не удалось выгрузить задачи
+
 # Справка
 help-header = 📋 Доступные команды:
 help-tasks = /tasks - Показать список задач
 add-task-menu = Создать новую задачу
 help-add-task = /add_task Создать новую задачу
-help-delete-task = /delete_task id - Удалить задачу по ID
+help-delete-task = /delete_task id [id ...] - Удалить задачи по ID
+help-export = /export [csv|ndjson] - Выгрузить задачи в файл
 help-menu = Показать справку
 help-help = /help Показать эту справку
 
@@ -0,0 +1,31 @@
+import threading
+from collections import Counter
+from typing import Dict, Union
+
+# Счетчики процесса: у Flask-воркеров и процесса бота они свои
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Увеличить счетчик name на value"""
+    with _lock:
+        _counters[name] += value
+
+
+def get_metrics() -> Dict[str, Union[int, float]]:
+    """
+    Снимок счетчиков процесса
+
+    Для каждой пары счетчиков <prefix>.hits / <prefix>.misses добавляется
+    доля попаданий <prefix>.hit_rate
+    """
+    with _lock:
+        metrics: Dict[str, Union[int, float]] = dict(_counters)
+
+    for name in list(metrics):
+        if name.endswith('.hits'):
+            prefix = name[:-len('.hits')]
+            total = metrics[name] + metrics.get(f'{prefix}.misses', 0)
+            metrics[f'{prefix}.hit_rate'] = round(metrics[name] / total, 4) if total else 0.0
+    return dict(sorted(metrics.items()))
@@ -1,6 +1,11 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 from enum import Enum
 
+from backend.db import models
+
+
 class DurationType(str, Enum):
     """Типы продолжительности"""
     DAYS = "days"
@@ -15,4 +20,8 @@ class Duration(BaseModel):
     type: DurationType
     value: int
     is_default: bool
-    is_active: bool 
\ No newline at end of file
+    is_active: bool
+
+    def deadline_from(self, from_date: datetime) -> datetime:
+        """Дедлайн через эту продолжительность от from_date"""
+        return models.deadline_after(from_date, models.DurationType(self.type.value), self.value)
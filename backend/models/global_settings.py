@@ -0,0 +1,41 @@
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalConfig(BaseModel):
+    """
+    Глобальные настройки приложения (таблица global_settings)
+
+    Значения хранятся строками по ключу, здесь они приведены к типам.
+    Если ключа нет или значение не разбирается, используется значение
+    по умолчанию (то же, что при создании настроек в create_initial_global_settings).
+    Ограничение 0 или меньше означает отсутствие ограничения.
+    """
+    reminder_check_interval: int = 300
+    max_tasks_per_user: int = 100
+    max_reminders_per_task: int = 5
+    default_language: str = 'ru'
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, Optional[str]]]) -> 'GlobalConfig':
+        """Собрать настройки из пар (key, value) таблицы global_settings"""
+        values: Dict[str, Any] = {}
+        for key, value in rows:
+            if key not in cls.model_fields or value is None:
+                continue
+            try:
+                cls.model_validate({key: value.strip()})
+            except ValidationError:
+                logger.warning(f"Некорректное значение глобальной настройки {key}: {value!r}, используется значение по умолчанию")
+                continue
+            values[key] = value.strip()
+        return cls.model_validate(values)
+
+    def limit(self, key: str) -> Optional[int]:
+        """Значение ограничения по ключу или None, если ограничения нет"""
+        value = getattr(self, key)
+        return value if value > 0 else None
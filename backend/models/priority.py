@@ -1,10 +1,11 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class Priority(BaseModel):
     """Модель приоритета задачи"""
     id: int
     name: str
-    color: str
+    color: Optional[str] = None
     order: int
     is_default: bool
     is_active: bool 
\ No newline at end of file
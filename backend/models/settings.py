@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic import BaseModel
 
 from backend.models.status import Status
@@ -11,4 +11,13 @@ class Settings(BaseModel):
     statuses: List[Status] = []
     priorities: List[Priority] = []
     durations: List[Duration] = []
-    task_types: List[TaskType] = [] 
\ No newline at end of file
+    task_types: List[TaskType] = []
+
+    def by_field(self) -> Dict[str, Dict[int, BaseModel]]:
+        """Настройки по полям задачи: {'status_id': {id: Status}, ...}"""
+        return {
+            'type_id': {task_type.id: task_type for task_type in self.task_types},
+            'status_id': {status.id: status for status in self.statuses},
+            'priority_id': {priority.id: priority for priority in self.priorities},
+            'duration_id': {duration.id: duration for duration in self.durations},
+        }
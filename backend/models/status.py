@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class Status(BaseModel):
@@ -5,7 +6,7 @@ class Status(BaseModel):
     id: int
     name: str
     code: str
-    color: str
+    color: Optional[str] = None
     order: int
     is_default: bool
     is_final: bool
@@ -0,0 +1,172 @@
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy import FromClause, and_, bindparam, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.db.models import Task
+
+# Фильтры по равенству колонки задачи
+EQUALITY_FIELDS = ('id', 'status_id', 'priority_id', 'duration_id', 'type_id')
+
+
+class InvalidFilterError(ValueError):
+    """Параметры фильтра в запросе не разбираются"""
+
+
+class TaskFilter(BaseModel):
+    """
+    Модель фильтра списка задач
+
+    Разбирается один раз из параметров запроса или из dialog_data бота
+    и компилируется в предикат SQLAlchemy для колонок таблицы задач.
+    Пустые значения (None, 0, "") означают отсутствие фильтра.
+    Архив задач (tasks_archive) читается только для завершенных задач
+    или при include_archived (см. includes_archive).
+    """
+    id: Optional[int] = None
+    status_id: Optional[int] = None
+    priority_id: Optional[int] = None
+    duration_id: Optional[int] = None
+    type_id: Optional[int] = None
+    is_completed: Optional[bool] = None
+    is_overdue: Optional[bool] = None
+    deadline_from: Optional[date] = None
+    deadline_to: Optional[date] = None
+    search: Optional[str] = None
+    include_archived: Optional[bool] = None
+
+    @field_validator(*EQUALITY_FIELDS, mode='before')
+    @classmethod
+    def empty_to_none(cls, value: Any) -> Any:
+        return value or None
+
+    @field_validator('deadline_from', 'deadline_to', mode='before')
+    @classmethod
+    def parse_deadline(cls, value: Any) -> Any:
+        """Дата в формате YYYY-MM-DD или ISO-строка с временем (берется дата)"""
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, str) and 'T' in value:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+        return value
+
+    @field_validator('search', mode='before')
+    @classmethod
+    def strip_search(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.strip()
+        return value or None
+
+    @classmethod
+    def from_request_args(cls, args: Mapping[str, str], search_arg: str = 'search') -> 'TaskFilter':
+        """
+        Разобрать фильтр из параметров HTTP-запроса
+
+        Raises:
+            InvalidFilterError: если значение параметра не разбирается (?type_id=abc)
+        """
+        data: Dict[str, Any] = {
+            field: args.get(field)
+            for field in (*EQUALITY_FIELDS, 'deadline_from', 'deadline_to')
+        }
+        for field in ('is_completed', 'is_overdue', 'include_archived'):
+            if field in args:
+                # Преобразуем строковое значение 'true'/'false' в булево
+                data[field] = args.get(field).lower() == 'true'
+        data['search'] = args.get(search_arg)
+        try:
+            return cls(**data)
+        except ValidationError as e:
+            fields = ', '.join(sorted({str(error['loc'][0]) for error in e.errors() if error['loc']}))
+            raise InvalidFilterError(f"Invalid filter: {fields}") from None
+
+    @classmethod
+    def from_dict(cls, filters: Union['TaskFilter', Mapping[str, Any], None]) -> 'TaskFilter':
+        """Получить фильтр из словаря (dialog_data бота, внутренние вызовы) или готового TaskFilter"""
+        if isinstance(filters, TaskFilter):
+            return filters
+        return cls(**{key: value for key, value in (filters or {}).items() if key in cls.model_fields})
+
+    def includes_archive(self) -> bool:
+        """Нужны ли задачи из архива: в нем только завершенные задачи"""
+        return bool(self.include_archived or self.is_completed)
+
+    def shape(self) -> Tuple[str, ...]:
+        """Набор примененных условий: одинаковый набор дает одинаковый SQL"""
+        shape = [field for field in EQUALITY_FIELDS if getattr(self, field) is not None]
+        if self.is_completed is not None:
+            shape.append('completed' if self.is_completed else 'open')
+        if self.is_overdue is not None:
+            shape.append('overdue' if self.is_overdue else 'not_overdue')
+        if self.deadline_from:
+            shape.append('deadline_from')
+        if self.deadline_to:
+            shape.append('deadline_to')
+        return tuple(shape)
+
+    def parameters(self, user_id: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Значения параметров предиката (now - текущее время для фильтра по просрочке)"""
+        parameters: Dict[str, Any] = {'user_id': user_id}
+        if self.is_overdue is not None:
+            parameters['now'] = now or datetime.now(tz=timezone.utc)
+        for field in EQUALITY_FIELDS:
+            if getattr(self, field) is not None:
+                parameters[field] = getattr(self, field)
+        if self.deadline_from:
+            # Начало дня (00:00:00)
+            parameters['deadline_from'] = datetime.combine(self.deadline_from, time.min)
+        if self.deadline_to:
+            # Конец дня (23:59:59.999999)
+            parameters['deadline_to'] = datetime.combine(self.deadline_to, time.max)
+        return parameters
+
+    def condition(self, user_id: int, table: FromClause = Task.__table__, now: Optional[datetime] = None) -> ColumnElement:
+        """
+        Предикат WHERE для задач пользователя (без поиска)
+
+        Args:
+            user_id: telegram_id пользователя
+            table: Таблица или подзапрос с колонками задач (см. task_archive.task_source)
+            now: Текущее время для фильтра по просрочке (одно на весь запрос)
+        """
+        return compile_predicate(table, self.shape()).params(self.parameters(user_id, now))
+
+
+def overdue_predicate(table: FromClause = Task.__table__) -> ColumnElement:
+    """
+    Задача просрочена: не завершена и дедлайн раньше параметра now
+
+    Для финальных статусов completed_at заполняется при смене статуса
+    (Task.change_status), поэтому статус отдельно не проверяется.
+    """
+    columns = table.c
+    return and_(columns.completed_at.is_(None), columns.deadline < bindparam('now'))
+
+
+@lru_cache(maxsize=256)
+def compile_predicate(table: FromClause, shape: Tuple[str, ...]) -> ColumnElement:
+    """Построить предикат с именованными параметрами для набора условий"""
+    columns = table.c
+    clauses = [columns.user_id == bindparam('user_id')]
+    for condition in shape:
+        if condition in EQUALITY_FIELDS:
+            clauses.append(columns[condition] == bindparam(condition))
+        elif condition == 'open':
+            clauses.append(columns.completed_at.is_(None))
+        elif condition == 'completed':
+            clauses.append(columns.completed_at.is_not(None))
+        elif condition == 'overdue':
+            clauses.append(overdue_predicate(table))
+        elif condition == 'not_overdue':
+            clauses.append(or_(columns.completed_at.is_not(None), columns.deadline.is_(None),
+                               columns.deadline >= bindparam('now')))
+        elif condition == 'deadline_from':
+            clauses.append(columns.deadline >= bindparam('deadline_from'))
+        elif condition == 'deadline_to':
+            clauses.append(columns.deadline <= bindparam('deadline_to'))
+    return and_(*clauses)
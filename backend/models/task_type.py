@@ -6,7 +6,7 @@ class TaskType(BaseModel):
     id: int
     name: str
     description: Optional[str] = None
-    color: str
+    color: Optional[str] = None
     order: int
     is_default: bool
     is_active: bool 
\ No newline at end of file
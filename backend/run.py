@@ -7,6 +7,7 @@ from multiprocessing import Process
 import threading
 
 from aiogram import Bot
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from aiogram.types import BotCommandScopeDefault, BotCommandScopeChat, BotCommandScopeAllPrivateChats
 from aiogram_dialog import setup_dialogs
 from alembic import command
@@ -18,16 +19,22 @@ from flask_cors import CORS
 from fluent.runtime import FluentLocalization
 from fluentogram import TranslatorHub
 
+from backend.blueprints.wrapper import start_background_loop
 from backend.cache_config import cache
+from backend.compression import init_compression
 from backend.create_bot import main_bot, dp, get_bot_commands, ENVIRONMENT
+from backend.database import get_session
 from backend.dialogs.task_dialogs import task_dialog
 from backend.dialogs.task_edit_dialog import task_edit_dialog
 from backend.dialogs.task_list_dialog import task_list_dialog
 from backend.handlers import task_handlers
 from backend.i18n_factory import create_translator_hub
+from backend.json_provider import PlannerJSONProvider
 from backend.load_env import env_config
 from backend.locale_config import set_user_locale_cache, get_locale, AVAILABLE_LANGUAGES
 from backend.middleware import TranslatorRunnerMiddleware
+from backend.services.task_archive import TaskArchiveService, TASK_ARCHIVE_AFTER_DAYS
+from backend.services.task_stats import TaskStatsService
 
 if os.getenv('RUN_BOT') == "0":
     alembic_cfg = Config("alembic.ini")
@@ -40,6 +47,13 @@ logging.getLogger('aiosqlite').propagate = False
 
 logger = logging.getLogger(__name__)
 
+# Периодический пересчет счетчиков задач (user_task_stats), часы
+TASK_STATS_RECONCILE_HOURS = env_config.get('TASK_STATS_RECONCILE_HOURS', default=6, cast=int)
+# Периодический перенос давно завершенных задач в архив (tasks_archive), часы
+TASK_ARCHIVE_INTERVAL_HOURS = env_config.get('TASK_ARCHIVE_INTERVAL_HOURS', default=24, cast=int)
+
+scheduler = AsyncIOScheduler()
+
 def start_process_aiogram():
     process = Process(target=on_startup, daemon=True)
     process.start()
@@ -57,9 +71,25 @@ def on_startup():
 # Функция, которая выполнится когда бот запустится
 async def start_bot(bot: Bot):
     await set_commands(bot)
+    scheduler.add_job(reconcile_task_stats, 'interval', hours=TASK_STATS_RECONCILE_HOURS)
+    if TASK_ARCHIVE_AFTER_DAYS > 0:
+        scheduler.add_job(archive_completed_tasks, 'interval', hours=TASK_ARCHIVE_INTERVAL_HOURS)
+    scheduler.start()
     logger.info('Бот стартован')
 
 
+async def reconcile_task_stats():
+    """Исправить расхождения счетчиков задач с задачами"""
+    async with get_session() as session:
+        await TaskStatsService(session).reconcile_all()
+
+
+async def archive_completed_tasks():
+    """Перенести давно завершенные задачи в архив"""
+    async with get_session() as session:
+        await TaskArchiveService(session).archive_completed()
+
+
 # Функция, которая настроит командное меню (дефолтное для всех пользователей)
 async def set_commands(bot: Bot):
     # Создаем область видимости команд по умолчанию
@@ -86,6 +116,8 @@ async def set_commands(bot: Bot):
 
 # Функция, которая выполнится когда бот завершит свою работу
 async def stop_bot(bot: Bot):
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
     logger.info('Бот остановлен')
 
 async def main():
@@ -131,7 +163,11 @@ async def main():
 def create_app():
     """Create and configure an instance of the Flask application."""
     app = Flask(__name__, instance_relative_config=True)
+    # JSON ответов и запросов - через orjson (см. backend/json_provider.py)
+    app.json = PlannerJSONProvider(app)
     cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+    # Сжатие ответов API gzip/brotli (см. backend/compression.py)
+    init_compression(app)
 
     # Настройка CORS
     #CORS(app, resources={r"/*": {"origins": "*"}})
@@ -160,11 +196,12 @@ def create_app():
         JWT_HEADER_TYPE="Bearer"
     )
     # apply the blueprints to the app
-    from backend.blueprints import auth_bp, planner_bp, settings_bp, health_bp
+    from backend.blueprints import auth_bp, planner_bp, settings_bp, health_bp, bootstrap_bp
     app.register_blueprint(auth_bp)
     app.register_blueprint(planner_bp)
     app.register_blueprint(settings_bp)
     app.register_blueprint(health_bp)
+    app.register_blueprint(bootstrap_bp)
 
     jwt = JWTManager(app)
     app.debug = True
@@ -172,6 +209,8 @@ def create_app():
 
 
 def run_flask(app):
+    # Сервер разработки обрабатывает запросы в потоках, как gthread воркер
+    start_background_loop()
     app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
 
 if __name__ == '__main__':
@@ -237,16 +276,9 @@ async def set_user_commands(bot: Bot, user_id: str, user_locale: FluentLocalizat
 
 def create_app_wsgi():
     """Создание Flask приложения для запуска через Gunicorn"""
-    # Создаем глобальную переменную для хранения цикла событий
-    global _asyncio_loop
-    
-    # Устанавливаем политику для работы с asyncio в многопоточной среде
-    asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
-    
-    # Создаем новый цикл событий для основного WSGI процесса
-    main_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(main_loop)
-    _asyncio_loop = main_loop
+    # Обработчики всех потоков воркера (gthread) выполняются в одном фоновом цикле событий
+    # и используют один пул соединений с базой
+    start_background_loop()
     
     # Настраиваем переменную окружения для идентификации воркера Gunicorn
     worker_id = os.environ.get('GUNICORN_WORKER_ID', '0')
@@ -264,3 +296,15 @@ def create_app_wsgi():
     app, _ = create_app()
     
     return app
+
+
+def create_app_asgi():
+    """
+    Создание ASGI-приложения для запуска через Gunicorn с воркерами uvicorn
+
+    Запросы воркера выполняются в общем цикле событий uvicorn (см. backend/asgi.py)
+    """
+    from backend.asgi import PlannerASGI
+
+    app, _ = create_app()
+    return PlannerASGI(app)
@@ -0,0 +1,39 @@
+"""
+Перенести давно завершенные задачи в архив (tasks_archive)
+
+Бот делает это периодически (TASK_ARCHIVE_INTERVAL_HOURS), скрипт нужен
+для первого переноса накопленных задач или переноса с другим сроком.
+
+Запуск:
+    python -m backend.scripts.archive_tasks [--days 90] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import logging
+
+from backend.database import get_session
+from backend.services.task_archive import TASK_ARCHIVE_AFTER_DAYS, TASK_ARCHIVE_BATCH_SIZE, TaskArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+async def archive(days: int, batch_size: int) -> int:
+    """Перенести задачи, завершенные больше days дней назад, вернуть их количество"""
+    async with get_session() as session:
+        return await TaskArchiveService(session).archive_completed(days, batch_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Перенос завершенных задач в архив")
+    parser.add_argument("--days", type=int, default=TASK_ARCHIVE_AFTER_DAYS,
+                        help=f"Сколько дней назад завершена задача (по умолчанию {TASK_ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=TASK_ARCHIVE_BATCH_SIZE,
+                        help=f"Задач в одной транзакции (по умолчанию {TASK_ARCHIVE_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    archived = asyncio.run(archive(args.days, args.batch_size))
+    print(f"Перенесено в архив задач: {archived}")
+
+
+if __name__ == "__main__":
+    main()
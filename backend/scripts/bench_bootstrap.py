@@ -0,0 +1,98 @@
+"""
+Замерить время загрузки данных для первой отрисовки фронтенда
+
+Сравниваются две последовательности запросов против запущенного API:
+
+    before - как фронтенд загружал страницу раньше: язык, часовой пояс,
+             настройки и затем типы задач, предпочтения и затем первая
+             страница задач (независимые цепочки идут параллельно)
+    after  - один запрос /api/bootstrap
+
+Время загрузки - от первого запроса до последнего ответа. Параметр -c
+задает, сколько страниц открывается одновременно (разные вкладки или
+пользователи с одним токеном). Токен доступа создается по JWT_SECRET_KEY.
+Сервер лучше запускать с --max-requests 0: перезапуск воркера (max_requests
+в gunicorn_config.py) обрывает соединения посреди замера.
+
+Запуск:
+    python -m backend.scripts.bench_bootstrap <telegram_id> [--url http://localhost:5000] [-n 200] [-c 1]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import aiohttp
+
+from backend.scripts.load_test import make_token, percentile
+
+PAGE_SIZE = 10
+
+
+async def fetch(session: aiohttp.ClientSession, url: str) -> None:
+    async with session.get(url) as response:
+        await response.read()
+        response.raise_for_status()
+
+
+async def load_before(session: aiohttp.ClientSession, url: str) -> None:
+    """Прежняя загрузка страницы: отдельные запросы TaskList, i18n и TimezoneSwitcher"""
+    async def settings_chain():
+        await fetch(session, f'{url}/api/settings/')
+        await fetch(session, f'{url}/api/settings/task-types/')
+
+    async def tasks_chain():
+        await fetch(session, f'{url}/api/user-preferences/')
+        await fetch(session, f'{url}/api/tasks/paginated?page=1&page_size={PAGE_SIZE}&search=&sort_by=deadline&sort_order=asc&is_completed=false')
+
+    await asyncio.gather(
+        fetch(session, f'{url}/api/user/language'),
+        fetch(session, f'{url}/api/user/timezone'),
+        settings_chain(),
+        tasks_chain(),
+    )
+
+
+async def load_after(session: aiohttp.ClientSession, url: str) -> None:
+    """Загрузка страницы одним запросом"""
+    await fetch(session, f'{url}/api/bootstrap?page_size={PAGE_SIZE}')
+
+
+async def measure(load, url: str, token: str, loads: int, concurrency: int) -> List[float]:
+    """Выполнить loads загрузок страницы, по concurrency одновременно; время каждой, мс"""
+    timings: List[float] = []
+    headers = {'Authorization': f'Bearer {token}'}
+    connector = aiohttp.TCPConnector(limit=concurrency * 6)
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        await load(session, url)  # прогрев соединений и кэшей
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                started = time.perf_counter()
+                await load(session, url)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker(loads // concurrency) for _ in range(concurrency)))
+    return sorted(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время загрузки данных первой отрисовки: отдельные запросы и /api/bootstrap")
+    parser.add_argument("user_id", help="telegram_id пользователя")
+    parser.add_argument("--url", default="http://localhost:5000", help="Адрес API")
+    parser.add_argument("-n", "--loads", type=int, default=200, help="Загрузок страницы в каждом варианте")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="Одновременных загрузок страницы")
+    args = parser.parse_args()
+
+    token = make_token(args.user_id)
+    url = args.url.rstrip('/')
+    print(f"Адрес: {url}, загрузок: {args.loads}, одновременно: {args.concurrency}")
+    for name, load in (('before', load_before), ('after', load_after)):
+        timings = asyncio.run(measure(load, url, token, args.loads, args.concurrency))
+        print(f"{name:<7} мс: среднее {statistics.mean(timings):7.1f}, p50 {percentile(timings, 0.5):7.1f}, "
+              f"p95 {percentile(timings, 0.95):7.1f}, макс {timings[-1]:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
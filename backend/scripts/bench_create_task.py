@@ -0,0 +1,81 @@
+"""
+Замерить время и количество запросов TaskService.create_task
+
+Задачи создаются тем же вызовом, что и из бота (task_dialog) и из API,
+по одной на сессию, и после замера удаляются (вместе со счетчиками).
+Первый вызов идет с пустым кэшем настроек и выводится отдельно.
+Для сравнения до/после запустите скрипт на обеих версиях против одной базы.
+
+Запуск:
+    python -m backend.scripts.bench_create_task <telegram_id> [-n 200] [--keep]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from sqlalchemy import event
+
+from backend.database import engine, get_session
+from backend.services.settings_cache import settings_cache
+from backend.services.task_service import MAX_BATCH_SIZE, TaskService
+
+logger = logging.getLogger(__name__)
+
+# Данные задач замера: дедлайн по продолжительности по умолчанию и заданный вручную
+TASK_VARIANTS = [
+    {'title': 'bench'},
+    {'title': 'bench', 'description': 'bench', 'deadline': '2030-01-01T10:00:00'},
+]
+
+
+async def bench(user_id: str, count: int, keep: bool = False) -> None:
+    """Создать count задач и вывести задержку create_task и количество запросов"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    settings_cache.clear()
+    created, timings, statement_counts = [], [], []
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        for i in range(count):
+            statements.clear()
+            async with get_session() as session:
+                started = time.perf_counter()
+                task = await TaskService(session).create_task(user_id, dict(TASK_VARIANTS[i % len(TASK_VARIANTS)]))
+                timings.append((time.perf_counter() - started) * 1000)
+            statement_counts.append(len(statements))
+            if task is None:
+                print("Задача не создана, см. лог")
+                return
+            created.append(task['id'])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    print(f"База: {engine.dialect.name}, задач: {count}")
+    print(f"Первый вызов (кэш настроек пуст): {timings[0]:.2f} мс, запросов: {statement_counts[0]}")
+    warm = timings[1:] or timings
+    quantiles = statistics.quantiles(warm, n=20) if len(warm) > 1 else warm * 19
+    print(f"Остальные: среднее {statistics.mean(warm):.2f} мс, p50 {statistics.median(warm):.2f} мс, "
+          f"p95 {quantiles[18]:.2f} мс, запросов: {statistics.median(statement_counts[1:] or statement_counts):.0f}")
+
+    if not keep:
+        for start in range(0, len(created), MAX_BATCH_SIZE):
+            async with get_session() as session:
+                await TaskService(session).bulk_delete_tasks(user_id, created[start:start + MAX_BATCH_SIZE])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер создания задач")
+    parser.add_argument("user_id", help="telegram_id пользователя, для которого создаются задачи")
+    parser.add_argument("-n", "--count", type=int, default=200, help="Количество задач (по умолчанию 200)")
+    parser.add_argument("--keep", action="store_true", help="Не удалять созданные задачи")
+    args = parser.parse_args()
+    asyncio.run(bench(args.user_id, args.count, args.keep))
+
+
+if __name__ == "__main__":
+    main()
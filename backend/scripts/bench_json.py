@@ -0,0 +1,71 @@
+"""
+Замерить время кодирования списка задач в JSON-ответ
+
+Сравниваются провайдер Flask по умолчанию (модуль json, с отступами
+в режиме отладки и без них) и PlannerJSONProvider (orjson). Задачи
+того же вида, что отдает TaskService (с datetime в deadline).
+База данных не нужна.
+
+Запуск:
+    python -m backend.scripts.bench_json [-n 500] [-r 200]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.json_provider import PlannerJSONProvider, orjson
+
+
+def make_tasks(count: int) -> list:
+    """Задачи в формате ответа /api/tasks/"""
+    now = datetime(2026, 1, 1, 9, 0)
+    tasks = []
+    for i in range(count):
+        deadline = now + timedelta(hours=i)
+        tasks.append({
+            'id': i + 1,
+            'title': f'Задача {i}',
+            'description': 'Купить молоко и хлеб' if i % 2 else None,
+            'type': {'id': 1, 'name': 'Личные', 'color': '#FF69B4'},
+            'status': {'id': 1, 'name': 'Ожидает выполнения', 'color': '#808080', 'order': 1},
+            'priority': {'id': 2, 'name': 'Важно', 'color': '#FFA500', 'order': 2},
+            'duration': {'id': 1, 'name': 'На день', 'type': 'days', 'value': 1},
+            'deadline': deadline,
+            'deadline_iso': deadline.isoformat(),
+            'created_at': now.isoformat(),
+            'completed_at': None,
+            'is_overdue': i % 3 == 0,
+        })
+    return tasks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время кодирования списка задач в JSON")
+    parser.add_argument("-n", "--tasks", type=int, default=500, help="Задач в ответе")
+    parser.add_argument("-r", "--repeat", type=int, default=200, help="Повторов замера")
+    args = parser.parse_args()
+
+    payload = {'tasks': make_tasks(args.tasks), 'total': args.tasks}
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    providers = {
+        'json (Flask, отладка - с отступами)': (default_provider, True),
+        'json (Flask, компактно)': (default_provider, False),
+        'PlannerJSONProvider' + (' (orjson)' if orjson else ' (json)'): (PlannerJSONProvider(app), False),
+    }
+
+    print(f"Задач: {args.tasks}, повторов: {args.repeat}")
+    baseline = None
+    for name, (provider, debug) in providers.items():
+        app.debug = debug
+        size = len(provider.response(payload).get_data())
+        seconds = min(timeit.repeat(lambda: provider.response(payload), number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:<40} {seconds * 1000:8.3f} мс  {size:>9} байт  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
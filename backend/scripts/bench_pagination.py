@@ -0,0 +1,130 @@
+"""
+Замерить время страницы списка задач в зависимости от глубины страницы
+
+Для каждой сортировки замеряется get_tasks_paginated (LIMIT/OFFSET и COUNT)
+на первой, средней и последней странице и get_tasks_by_cursor (keyset),
+дошедший до тех же страниц. Время OFFSET-страницы растет с количеством задач
+пользователя (COUNT и сортировка всех подходящих задач) и с глубиной страницы
+(пропущенные строки все равно читаются); время страницы по курсору от глубины
+не зависит.
+
+С --seed N пользователю сначала импортируются N задач (TaskImportService),
+после замера они удаляются, если не указан --keep.
+
+Запуск:
+    python -m backend.scripts.bench_pagination <telegram_id> [--seed 10000] [-r 20] [--page-size 10]
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import delete, event
+
+from backend.database import engine, get_session
+from backend.db.models import Task
+from backend.services.task_import import TaskImportService
+from backend.services.task_service import TaskService
+from backend.services.task_stats import TaskStatsService
+
+logger = logging.getLogger(__name__)
+
+SORTS = ['deadline', 'title', 'priority', None]
+SEED_TITLE = 'bench pagination'
+
+
+async def seed(user_id: str, count: int) -> None:
+    """Импортировать count задач с разными дедлайнами и названиями"""
+    lines = ''.join(
+        json.dumps({'title': f'{SEED_TITLE} {i}', 'deadline': f'2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00'}) + '\n'
+        for i in range(count)
+    )
+    async with get_session() as session:
+        report = await TaskImportService(session).import_tasks(user_id, io.BytesIO(lines.encode()), 'ndjson')
+    print(f"Импортировано задач: {report['imported']} из {count}")
+
+
+async def unseed(user_id: str) -> None:
+    async with get_session() as session:
+        await session.execute(delete(Task).where(Task.user_id == int(user_id), Task.title.like(f'{SEED_TITLE} %')))
+        await TaskStatsService(session).reconcile_user(int(user_id))
+        await session.commit()
+    print("Задачи замера удалены")
+
+
+async def timed(call: Callable[[TaskService], Awaitable], repeat: int, statements: List[str]):
+    """Медиана времени вызова, мс, и количество запросов одного вызова"""
+    timings = []
+    for _ in range(repeat):
+        statements.clear()
+        async with get_session() as session:
+            started = time.perf_counter()
+            result = await call(TaskService(session))
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(statements), result
+
+
+async def bench(user_id: str, repeat: int, page_size: int) -> None:
+    statements: List[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with get_session() as session:
+            _, total = await TaskService(session).get_tasks_paginated(user_id, 1, 1)
+        last = max((total + page_size - 1) // page_size, 1)
+        pages = sorted({1, (last + 1) // 2, last})
+        print(f"База: {engine.dialect.name}, задач: {total}, страниц по {page_size}: {last}")
+
+        for sort_by in SORTS:
+            for page in pages:
+                offset_ms, offset_statements, _ = await timed(
+                    lambda service: service.get_tasks_paginated(user_id, page, page_size, {}, sort_by, 'asc'),
+                    repeat, statements
+                )
+                # До нужной страницы по курсору: замеряется только последний переход
+                cursor = None
+                async with get_session() as session:
+                    for _ in range(page - 1):
+                        _, cursor = await TaskService(session).get_tasks_by_cursor(user_id, cursor, page_size, {}, sort_by)
+                cursor_ms, cursor_statements, _ = await timed(
+                    lambda service: service.get_tasks_by_cursor(user_id, cursor, page_size, {}, sort_by),
+                    repeat, statements
+                )
+                print(f"{sort_by or 'без сортировки':<15} страница {page:>6}: "
+                      f"offset {offset_ms:8.2f} мс ({offset_statements} запр.), "
+                      f"cursor {cursor_ms:8.2f} мс ({cursor_statements} запр.)")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def main_async(args) -> None:
+    if args.seed:
+        await seed(args.user_id, args.seed)
+    try:
+        await bench(args.user_id, args.repeat, args.page_size)
+    finally:
+        if args.seed and not args.keep:
+            await unseed(args.user_id)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время страницы списка задач: OFFSET и курсор")
+    parser.add_argument("user_id", help="telegram_id пользователя")
+    parser.add_argument("--seed", type=int, default=0, help="Импортировать N задач перед замером")
+    parser.add_argument("--keep", action="store_true", help="Не удалять импортированные задачи")
+    parser.add_argument("-r", "--repeat", type=int, default=20, help="Повторов каждого замера")
+    parser.add_argument("--page-size", type=int, default=10, help="Задач на странице")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Замерить поиск задач: полнотекстовый индекс и поиск подстроки без него
+
+Для каждого запроса замеряется search_tasks и страница get_tasks_paginated
+с поиском в двух вариантах:
+
+    index     - TaskSearch.condition: в PostgreSQL tsvector (GIN) и pg_trgm,
+                в SQLite - FTS5
+    substring - только lower(...) LIKE '%запрос%' по названию и описанию,
+                как поиск до полнотекстового индекса
+
+Скрипт работает с базой приложения: SQLite (local.db) в разработке,
+PostgreSQL при ENVIRONMENT=PRODUCTION (параметры POSTGRES_* из .env).
+С --seed N пользователю сначала импортируются N задач со случайными
+названиями и описаниями на русском и английском, после замера они
+удаляются, если не указан --keep.
+
+Запуск:
+    python -m backend.scripts.bench_search <telegram_id> [--seed 10000] [-r 20]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import random
+import statistics
+import time
+from typing import List
+from unittest import mock
+
+from sqlalchemy import delete, event
+
+from backend.database import engine, get_session
+from backend.db.models import Task
+from backend.services.task_import import TaskImportService
+from backend.services.task_search import TaskSearch
+from backend.services.task_service import TaskService
+from backend.services.task_stats import TaskStatsService
+
+logger = logging.getLogger(__name__)
+
+SEED_TITLE = 'bench search'
+WORDS = [
+    'купить', 'молоко', 'хлеб', 'отчет', 'встреча', 'позвонить', 'врач', 'проект', 'презентация', 'оплатить',
+    'buy', 'milk', 'report', 'meeting', 'call', 'doctor', 'project', 'invoice', 'deploy', 'review',
+]
+# (название, запрос): слово, форма слова, два слова, префикс, подстрока внутри слова, нет совпадений
+QUERIES = [
+    ('слово', 'отчет'),
+    ('форма слова', 'отчеты'),
+    ('два слова', 'купить молоко'),
+    ('префикс', 'презент'),
+    ('английский', 'deploy review'),
+    ('подстрока', 'локо'),
+    ('нет совпадений', 'жираф'),
+]
+
+
+async def seed(user_id: str, count: int) -> None:
+    """Импортировать count задач со случайными названиями и описаниями"""
+    rnd = random.Random(1)
+    lines = ''.join(
+        json.dumps({
+            'title': f"{SEED_TITLE} {i} " + ' '.join(rnd.sample(WORDS, 3)),
+            'description': ' '.join(rnd.choices(WORDS, k=rnd.randint(0, 12))) or None,
+        }, ensure_ascii=False) + '\n'
+        for i in range(count)
+    )
+    async with get_session() as session:
+        report = await TaskImportService(session).import_tasks(user_id, io.BytesIO(lines.encode()), 'ndjson')
+    print(f"Импортировано задач: {report['imported']} из {count}")
+
+
+async def unseed(user_id: str) -> None:
+    async with get_session() as session:
+        await session.execute(delete(Task).where(Task.user_id == int(user_id), Task.title.like(f'{SEED_TITLE} %')))
+        await TaskStatsService(session).reconcile_user(int(user_id))
+        await session.commit()
+    print("Задачи замера удалены")
+
+
+async def timed(call, repeat: int, statements: List[str]):
+    """Медиана времени вызова, мс, количество запросов и результат последнего вызова"""
+    timings = []
+    for _ in range(repeat):
+        statements.clear()
+        async with get_session() as session:
+            started = time.perf_counter()
+            result = await call(TaskService(session))
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(statements), result
+
+
+async def bench(user_id: str, repeat: int) -> None:
+    statements: List[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with get_session() as session:
+            _, total = await TaskService(session).get_tasks_paginated(user_id, 1, 1)
+        print(f"База: {engine.dialect.name}, задач: {total}")
+
+        for name, search_query in QUERIES:
+            for variant in ('index', 'substring'):
+                patch = mock.patch.object(TaskSearch, 'condition', TaskSearch._substring_condition) \
+                    if variant == 'substring' else contextlib.nullcontext()
+                with patch:
+                    search_ms, _, found = await timed(
+                        lambda service: service.search_tasks(user_id, search_query), repeat, statements
+                    )
+                    page_ms, page_statements, _ = await timed(
+                        lambda service: service.get_tasks_paginated(user_id, 1, 10, {}, None, 'asc', search_query),
+                        repeat, statements
+                    )
+                print(f"{name:<15} {search_query!r:<17} {variant:<9}: найдено {len(found):>6}, "
+                      f"search_tasks {search_ms:8.2f} мс, страница {page_ms:8.2f} мс ({page_statements} запр.)")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def main_async(args) -> None:
+    if args.seed:
+        await seed(args.user_id, args.seed)
+    try:
+        await bench(args.user_id, args.repeat)
+    finally:
+        if args.seed and not args.keep:
+            await unseed(args.user_id)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Поиск задач: полнотекстовый индекс и поиск подстроки")
+    parser.add_argument("user_id", help="telegram_id пользователя")
+    parser.add_argument("--seed", type=int, default=0, help="Импортировать N задач перед замером")
+    parser.add_argument("--keep", action="store_true", help="Не удалять импортированные задачи")
+    parser.add_argument("-r", "--repeat", type=int, default=20, help="Повторов каждого замера")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
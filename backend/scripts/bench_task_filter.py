@@ -0,0 +1,113 @@
+"""
+Замерить построение предиката фильтра задач с кэшем compile_predicate и без него
+
+Фильтры повторяют одни и те же наборы условий (shape), как запросы списка
+задач: значения разные, структура предиката одна. Для каждого варианта
+замеряется время TaskFilter.condition (timeit) и выделенная при этом память
+(tracemalloc), а также память, которую занимает заполненный кэш
+compile_predicate. Без кэша предикат строится заново при каждом вызове
+(compile_predicate.__wrapped__). Одинаковый ключ кэша SQL (cache key) у
+запросов с разными значениями - то, что позволяет SQLAlchemy не компилировать
+их заново. База данных не нужна.
+
+Запуск:
+    python -m backend.scripts.bench_task_filter [-n 10000] [-r 3]
+"""
+import argparse
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, List
+from unittest import mock
+
+from sqlalchemy import select
+
+from backend.db.models import Task
+from backend.models import task_filter
+from backend.models.task_filter import TaskFilter, compile_predicate
+
+# Наборы условий списка задач: фронтенд (вкладки, фильтры) и бот
+SHAPES = [
+    {},
+    {'is_completed': False},
+    {'is_completed': True},
+    {'is_completed': False, 'status_id': 1},
+    {'is_completed': False, 'priority_id': 2},
+    {'is_overdue': True},
+    {'is_completed': False, 'type_id': 1, 'priority_id': 1},
+    {'deadline_from': '2026-01-01', 'deadline_to': '2026-01-31'},
+]
+
+
+def make_filters(count: int) -> List[TaskFilter]:
+    """count фильтров из SHAPES с разными значениями"""
+    rnd = random.Random(1)
+    filters = []
+    for _ in range(count):
+        shape = dict(rnd.choice(SHAPES))
+        for field in ('status_id', 'priority_id', 'type_id'):
+            if field in shape:
+                shape[field] = rnd.randint(1, 5)
+        filters.append(TaskFilter.from_dict(shape))
+    return filters
+
+
+def build_all(filters: List[TaskFilter], now: datetime) -> Callable[[], None]:
+    def build() -> None:
+        for i, task_filter in enumerate(filters):
+            task_filter.condition(i % 100, now=now)
+    return build
+
+
+def measure(name: str, filters: List[TaskFilter], repeat: int, now: datetime) -> float:
+    build = build_all(filters, now)
+    compile_predicate.cache_clear()
+    build()  # прогрев кэша
+
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timeit.repeat(build, number=1, repeat=repeat))
+    print(f"{name:<12} {seconds * 1000:9.1f} мс  {seconds / len(filters) * 1e6:7.1f} мкс/фильтр  "
+          f"пик памяти {peak / 1024:9.1f} КиБ")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Построение предиката фильтра задач: кэш compile_predicate")
+    parser.add_argument("-n", "--filters", type=int, default=10000, help="Фильтров в замере")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Повторов замера")
+    args = parser.parse_args()
+
+    filters = make_filters(args.filters)
+    now = datetime.now(tz=timezone.utc)
+    print(f"Фильтров: {args.filters}, наборов условий: {len({f.shape() for f in filters})}")
+
+    cached = measure('с кэшем', filters, args.repeat, now)
+    print(f"             кэш: {compile_predicate.cache_info()}")
+    with mock.patch.object(task_filter, 'compile_predicate', compile_predicate.__wrapped__):
+        uncached = measure('без кэша', filters, args.repeat, now)
+    print(f"Ускорение: x{uncached / cached:.1f}")
+
+    compile_predicate.cache_clear()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for task_filter_ in filters:
+        task_filter_.condition(1, now=now)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f"Память заполненного кэша ({compile_predicate.cache_info().currsize} предикатов): {size / 1024:.1f} КиБ")
+
+    cache_keys = {
+        select(Task.id).where(task_filter_.condition(i, now=now))._generate_cache_key().key
+        for i, task_filter_ in enumerate(filters[:1000])
+    }
+    print(f"Разных ключей кэша SQL у 1000 запросов: {len(cache_keys)}")
+
+
+if __name__ == "__main__":
+    main()
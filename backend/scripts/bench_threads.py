@@ -0,0 +1,78 @@
+"""
+Замерить пропускную способность API в режиме wsgi в зависимости от количества потоков воркера
+
+Для каждого значения GUNICORN_THREADS скрипт запускает gunicorn с gthread
+воркерами (backend/gunicorn_config.py, SERVER_MODE=wsgi), прогоняет нагрузку
+load_test и останавливает сервер. Сервер работает с базой из окружения
+(в разработке - local.db в текущем каталоге).
+
+Запуск:
+    python -m backend.scripts.bench_threads <telegram_id> [--threads 1,2,4,8,16] [-c 50] [-d 15]
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import subprocess
+import sys
+import time
+import urllib.request
+
+from backend.scripts.load_test import DEFAULT_PATHS, make_token, percentile, run
+
+GUNICORN_CONFIG = pathlib.Path(__file__).resolve().parent.parent / 'gunicorn_config.py'
+
+
+def wait_ready(url: str, timeout: float = 60) -> bool:
+    """Дождаться ответа /api/health"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/api/health', timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def bench(threads: int, port: int, user_id: str, concurrency: int, duration: float) -> dict:
+    """Запустить сервер с threads потоками на воркер и прогнать нагрузку"""
+    url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, SERVER_MODE='wsgi', GUNICORN_THREADS=str(threads))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', str(GUNICORN_CONFIG), '-b', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'backend.run:create_app_wsgi()'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_ready(url):
+            raise RuntimeError(f"Сервер с {threads} потоками не запустился")
+        return asyncio.run(run(url, make_token(user_id), DEFAULT_PATHS, concurrency, duration))
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пропускная способность API в зависимости от потоков воркера")
+    parser.add_argument("user_id", help="telegram_id пользователя, от имени которого идут запросы")
+    parser.add_argument("--threads", default="1,2,4,8,16", help="Количество потоков через запятую")
+    parser.add_argument("--port", type=int, default=5055, help="Порт сервера на время замера")
+    parser.add_argument("-c", "--concurrency", type=int, default=50, help="Одновременных запросов")
+    parser.add_argument("-d", "--duration", type=float, default=15, help="Длительность замера, секунд")
+    args = parser.parse_args()
+
+    print(f"{'потоков':>8} {'запросов/с':>11} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'ошибок':>7}")
+    for threads in (int(value) for value in args.threads.split(',')):
+        result = bench(threads, args.port, args.user_id, args.concurrency, args.duration)
+        timings = sorted(result['timings'])
+        errors = sum(count for status, count in result['statuses'].items() if status != 200)
+        if not timings:
+            print(f"{threads:>8} {'-':>11} {'-':>9} {'-':>9} {'-':>9} {errors:>7}")
+            continue
+        print(f"{threads:>8} {len(timings) / result['elapsed']:>11.1f} {percentile(timings, 0.5):>9.1f} "
+              f"{percentile(timings, 0.95):>9.1f} {percentile(timings, 0.99):>9.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Вывести планы выполнения запросов TaskService и SettingsService
+
+Запросы перехватываются во время реальных вызовов сервисов, поэтому план
+всегда соответствует текущему коду, а не его копии в скрипте.
+
+Запуск:
+    python -m backend.scripts.explain_plans <telegram_id> [--analyze]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import event
+
+from backend.database import engine, get_session
+from backend.services.settings_service import SettingsService
+from backend.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# Сценарии горячих путей: (название, вызов сервиса)
+SCENARIOS = [
+    ("get_tasks", lambda session, user_id: TaskService(session).get_tasks(user_id)),
+    ("get_tasks: незавершенные", lambda session, user_id: TaskService(session).get_tasks(
+        user_id, {'is_completed': False})),
+    ("get_tasks_paginated: по дедлайну", lambda session, user_id: TaskService(session).get_tasks_paginated(
+        user_id, 1, 10, {}, 'deadline', 'asc')),
+    ("get_tasks_paginated: незавершенные по дедлайну", lambda session, user_id: TaskService(session).get_tasks_paginated(
+        user_id, 1, 10, {'is_completed': False}, 'deadline', 'asc')),
+    ("get_tasks_paginated: по названию", lambda session, user_id: TaskService(session).get_tasks_paginated(
+        user_id, 1, 10, {}, 'title', 'asc')),
+    ("get_tasks_paginated: поиск", lambda session, user_id: TaskService(session).get_tasks_paginated(
+        user_id, 1, 10, {}, None, 'asc', 'задача')),
+    ("get_tasks_by_cursor: по дедлайну", lambda session, user_id: TaskService(session).get_tasks_by_cursor(
+        user_id, None, 10, {}, 'deadline', 'asc')),
+    ("get_tasks_paginated: завершенные вместе с архивом", lambda session, user_id: TaskService(session).get_tasks_paginated(
+        user_id, 1, 10, {'is_completed': True}, 'deadline', 'desc')),
+    ("get_task_count: завершенные", lambda session, user_id: TaskService(session).get_task_count(
+        user_id, {'is_completed': True})),
+    ("get_settings", lambda session, user_id: SettingsService(session).get_settings(user_id)),
+]
+
+
+async def explain(user_id: str, analyze: bool = False) -> None:
+    """Выполнить сценарии и вывести план каждого уникального SELECT"""
+    dialect = engine.dialect.name
+    if dialect == 'postgresql':
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+
+    for name, scenario in SCENARIOS:
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and (statement, parameters) not in captured:
+                captured.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with get_session() as session:
+                await scenario(session, user_id)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        print(f"=== {name} ===")
+        async with engine.connect() as conn:
+            for statement, parameters in captured:
+                print(statement.strip())
+                result = await conn.exec_driver_sql(prefix + statement, parameters)
+                for row in result:
+                    # SQLite: (id, parent, notused, detail), PostgreSQL: одна колонка с текстом плана
+                    print("    " + str(row[-1]))
+                print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Планы выполнения запросов к задачам")
+    parser.add_argument("user_id", help="telegram_id пользователя, для которого выполняются запросы")
+    parser.add_argument("--analyze", action="store_true",
+                        help="EXPLAIN ANALYZE (только PostgreSQL, запросы выполняются)")
+    args = parser.parse_args()
+    asyncio.run(explain(args.user_id, args.analyze))
+
+
+if __name__ == "__main__":
+    main()
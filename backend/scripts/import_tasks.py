@@ -0,0 +1,56 @@
+"""
+Импортировать задачи пользователя из CSV или NDJSON
+
+Формат файла совпадает с выгрузкой /api/tasks/export. Настройки указываются
+названиями (колонки type, status, priority, duration) или ID (type_id и т.д.).
+
+Запуск:
+    python -m backend.scripts.import_tasks <telegram_id> <file> [--format csv|ndjson]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from backend.database import get_session
+from backend.services.task_import import IMPORT_FORMATS, TaskImportService
+
+logger = logging.getLogger(__name__)
+
+
+async def import_file(user_id: str, path: str, import_format: str) -> int:
+    """Импортировать файл и вывести прогресс и ошибки по строкам"""
+    def progress(report):
+        print(f"обработано {report['processed']}, импортировано {report['imported']}, "
+              f"ошибок {report['failed']}", file=sys.stderr)
+
+    with open(path, 'rb') as stream:
+        async with get_session() as session:
+            report = await TaskImportService(session).import_tasks(user_id, stream, import_format, progress)
+
+    if report is None:
+        print(f"Пользователь {user_id} не найден", file=sys.stderr)
+        return 1
+    for error in report['errors']:
+        print(json.dumps(error, ensure_ascii=False))
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Импорт задач из CSV или NDJSON")
+    parser.add_argument("user_id", help="telegram_id пользователя, которому добавляются задачи")
+    parser.add_argument("path", help="Файл с задачами")
+    parser.add_argument("--format", choices=IMPORT_FORMATS,
+                        help="Формат файла (по умолчанию определяется по расширению)")
+    args = parser.parse_args()
+
+    import_format = args.format or os.path.splitext(args.path)[1].lstrip('.').lower()
+    if import_format not in IMPORT_FORMATS:
+        parser.error(f"Не удалось определить формат файла, укажите --format {'|'.join(IMPORT_FORMATS)}")
+    sys.exit(asyncio.run(import_file(args.user_id, args.path, import_format)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Нагрузочный тест API: запросы на чтение задач от одного пользователя
+
+Скрипт держит заданное количество одновременных запросов в течение
+заданного времени и выводит число запросов в секунду и задержки.
+Для сравнения режимов сервера запустите API с SERVER_MODE=wsgi
+(gthread воркеры) и SERVER_MODE=asgi (воркеры uvicorn) против одной базы
+и прогоните скрипт с одинаковыми параметрами:
+
+    SERVER_MODE=wsgi gunicorn -c backend/gunicorn_config.py "backend.run:create_app_wsgi()"
+    SERVER_MODE=asgi gunicorn -c backend/gunicorn_config.py "backend.run:create_app_asgi()"
+
+Зависимость от количества потоков воркера измеряет bench_threads.
+Токен доступа создается по JWT_SECRET_KEY из окружения или передается через --token.
+
+Запуск:
+    python -m backend.scripts.load_test <telegram_id> [--url http://localhost:5000] [-c 50] [-d 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import aiohttp
+import jwt
+
+from backend.load_env import env_config
+
+# Запросы, которые делает фронтенд при открытии списка задач
+DEFAULT_PATHS = [
+    '/api/tasks/paginated?page=1&per_page=20',
+    '/api/tasks/count',
+    '/api/tasks/stats',
+    '/api/settings/',
+]
+
+
+def make_token(user_id: str) -> str:
+    """Токен доступа в формате Flask-JWT-Extended (identity - telegram_id)"""
+    now = datetime.now(tz=timezone.utc)
+    claims = {
+        'sub': str(user_id),
+        'type': 'access',
+        'fresh': False,
+        'jti': str(uuid.uuid4()),
+        'iat': now,
+        'nbf': now,
+        'exp': now + timedelta(hours=1),
+    }
+    return jwt.encode(claims, env_config.get('JWT_SECRET_KEY'), algorithm='HS256')
+
+
+async def run(url: str, token: str, paths: List[str], concurrency: int, duration: float) -> Dict:
+    """Держать concurrency запросов duration секунд, вернуть задержки и ответы"""
+    timings: List[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def client(index: int, session: aiohttp.ClientSession) -> None:
+        request = index
+        while time.perf_counter() < deadline:
+            path = paths[request % len(paths)]
+            request += 1
+            started = time.perf_counter()
+            try:
+                async with session.get(url + path, headers=headers) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] += 1
+                # Сервер недоступен: не засыпаем его повторными подключениями
+                await asyncio.sleep(0.1)
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=120)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i, session) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {'timings': timings, 'statuses': statuses, 'elapsed': elapsed}
+
+
+def percentile(values: List[float], share: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API задач")
+    parser.add_argument("user_id", help="telegram_id пользователя, от имени которого идут запросы")
+    parser.add_argument("--url", default="http://localhost:5000", help="Адрес API")
+    parser.add_argument("-c", "--concurrency", type=int, default=50, help="Одновременных запросов")
+    parser.add_argument("-d", "--duration", type=float, default=30, help="Длительность, секунд")
+    parser.add_argument("--token", help="Токен доступа (по умолчанию создается по JWT_SECRET_KEY)")
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Путь запроса (можно указать несколько раз)")
+    args = parser.parse_args()
+
+    token = args.token or make_token(args.user_id)
+    paths = args.paths or DEFAULT_PATHS
+    result = asyncio.run(run(args.url.rstrip('/'), token, paths, args.concurrency, args.duration))
+
+    timings = sorted(result['timings'])
+    print(f"Адрес: {args.url}, одновременных запросов: {args.concurrency}, время: {result['elapsed']:.1f} с")
+    print(f"Ответы: {dict(result['statuses'])}")
+    if not timings:
+        print("Нет успешных запросов")
+        return
+    print(f"Запросов в секунду: {len(timings) / result['elapsed']:.1f}")
+    print(f"Задержка, мс: среднее {statistics.mean(timings):.1f}, p50 {percentile(timings, 0.5):.1f}, "
+          f"p95 {percentile(timings, 0.95):.1f}, p99 {percentile(timings, 0.99):.1f}, макс {timings[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Пересчитать счетчики задач (user_task_stats) по таблице задач
+
+Бот делает это периодически (TASK_STATS_RECONCILE_HOURS), скрипт нужен
+после ручных изменений задач в базе.
+
+Запуск:
+    python -m backend.scripts.reconcile_task_stats [telegram_id]
+"""
+import argparse
+import asyncio
+import logging
+
+from backend.database import get_session
+from backend.services.task_stats import TaskStatsService
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile(user_id: int = None) -> int:
+    """Пересчитать счетчики одного или всех пользователей, вернуть число исправленных"""
+    async with get_session() as session:
+        service = TaskStatsService(session)
+        if user_id is None:
+            return await service.reconcile_all()
+        drift = await service.reconcile_user(user_id)
+        await session.commit()
+        return drift
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересчет счетчиков задач пользователей")
+    parser.add_argument("user_id", nargs="?", type=int, help="telegram_id пользователя (по умолчанию все)")
+    args = parser.parse_args()
+
+    drift = asyncio.run(reconcile(args.user_id))
+    print(f"Исправлено счетчиков: {drift}")
+
+
+if __name__ == "__main__":
+    main()
@@ -70,7 +70,10 @@ class AuthService:
         if not user:
             return False
             
-        stmt = update(User).where(User.telegram_id == int(user_id)).values(language=language)
+        # Язык входит в ответ /api/bootstrap: версия данных сбрасывает его ETag
+        stmt = update(User).where(User.telegram_id == int(user_id)).values(
+            language=language, data_version=User.data_version + 1
+        )
         await self.session.execute(stmt)
         await self.session.commit()
         bot = Bot(token=env_config.get('TELEGRAM_TOKEN'), default=DefaultBotProperties(parse_mode=ParseMode.HTML))
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import User
+from backend.models.task_filter import TaskFilter
+from backend.services.auth_service import AuthService
+from backend.services.settings_service import SettingsService
+from backend.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# Предпочтения списка задач, если пользователь их не сохранял: так их применяет фронтенд
+DEFAULT_PREFERENCES = {
+    "filters": {"is_completed": False},
+    "sort_by": "deadline",
+    "sort_order": "asc"
+}
+
+# Фабрика сессий для одновременных запросов (backend.database.get_session)
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+
+
+class BootstrapService:
+    """
+    Данные для первой отрисовки фронтенда одним запросом
+
+    Пользователь загружается один раз, остальные части ответа получают
+    уже загруженный объект User. Настройки и типы задач берутся из кэша
+    настроек, количество задач и первая страница списка - независимые
+    запросы: с фабрикой сессий они выполняются одновременно, каждый
+    в своей сессии (своем соединении пула), без нее - по очереди в сессии
+    сервиса.
+    """
+
+    def __init__(self, session: AsyncSession, session_factory: Optional[SessionFactory] = None):
+        self.session = session
+        self.session_factory = session_factory
+        self.auth_service = AuthService(session)
+
+    async def get_bootstrap(self, user_id: str, page_size: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Язык, часовой пояс, настройки, типы задач, предпочтения и первая страница задач
+
+        Первая страница строится по сохраненным предпочтениям (фильтры и сортировка),
+        как ее запрашивает фронтенд после загрузки предпочтений.
+
+        Returns:
+            Optional[Dict[str, Any]]: {'language', 'timezone', 'settings', 'task_types',
+            'preferences', 'tasks', 'pagination'} или None, если пользователь не найден
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        preferences = self.parse_preferences(user.settings)
+        task_filter = self._preferences_filter(preferences)
+        sort_by = preferences.get('sort_by') or None
+        sort_order = preferences.get('sort_order') or 'asc'
+
+        parts = (
+            self._get_settings(user),
+            self._run(lambda session: TaskService(session).count_user_tasks(user, task_filter)),
+            self._run(lambda session: TaskService(session).get_user_tasks_page(
+                user, 0, page_size, task_filter, sort_by, sort_order
+            )),
+        )
+        if self.session_factory is None:
+            # Одна сессия не выполняет запросы одновременно
+            (settings, task_types), total_tasks, tasks = [await part for part in parts]
+        else:
+            (settings, task_types), total_tasks, tasks = await asyncio.gather(*parts)
+
+        return {
+            'language': user.language or 'ru',
+            'timezone': user.timezone or 'Europe/Moscow',
+            'settings': settings,
+            'task_types': task_types,
+            'preferences': preferences,
+            'tasks': tasks,
+            'pagination': {
+                'page': 1,
+                'page_size': page_size,
+                'total_tasks': total_tasks,
+                'total_pages': (total_tasks + page_size - 1) // page_size if total_tasks > 0 else 0
+            }
+        }
+
+    async def _get_settings(self, user: User):
+        """Настройки и типы задач пользователя (из кэша настроек, при промахе - один запрос)"""
+        settings_service = SettingsService(self.session)
+        settings = await settings_service.get_user_settings_or_default(user)
+        task_types = await settings_service.get_user_task_types(user)
+        return settings, task_types
+
+    async def _run(self, query: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        """Выполнить запрос в отдельной сессии, если задана фабрика сессий, иначе - в сессии сервиса"""
+        if self.session_factory is None:
+            return await query(self.session)
+        async with self.session_factory() as session:
+            return await query(session)
+
+    @staticmethod
+    def parse_preferences(raw: Any) -> Dict[str, Any]:
+        """Предпочтения из users.settings (JSON-строка или словарь) со значениями по умолчанию"""
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                logger.warning(f"Некорректные предпочтения пользователя: {raw!r}")
+                raw = None
+        preferences = dict(DEFAULT_PREFERENCES)
+        if isinstance(raw, dict):
+            preferences.update(raw)
+        if not isinstance(preferences.get('filters'), dict):
+            preferences['filters'] = {}
+        return preferences
+
+    @staticmethod
+    def _preferences_filter(preferences: Dict[str, Any]) -> TaskFilter:
+        """Фильтр первой страницы из сохраненных фильтров; некорректные сохраненные фильтры не применяются"""
+        try:
+            return TaskFilter.from_dict(preferences['filters'])
+        except ValidationError as e:
+            logger.warning(f"Сохраненные фильтры не применены: {e}")
+            return TaskFilter()
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+import pytz
+from sqlalchemy import and_, case, func, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import metrics
+from backend.db.models import DefaultSettings, Task, User
+from backend.load_env import env_config
+from backend.models.task_filter import overdue_predicate
+from backend.services.global_settings import GLOBAL_SETTINGS_TTL
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_CACHE_SIZE = env_config.get('OVERDUE_CACHE_SIZE', default=4096, cast=int)
+
+
+class OverdueCache:
+    """
+    Количество просроченных задач пользователей в памяти процесса (для ETag)
+
+    Без изменения данных количество просроченных задач меняется, только когда
+    наступает дедлайн открытой задачи. Поэтому запись хранит версию данных,
+    с которой она посчитана, и момент ближайшего дедлайна (или конца дня
+    пользователя - дата тоже входит в версию): до него и до изменения версии
+    подсчет не повторяется. Размер ограничен вытеснением давно не использованных (LRU).
+    """
+
+    def __init__(self, maxsize: int = OVERDUE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[int, Tuple[int, datetime, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, version: int, now: datetime) -> Optional[int]:
+        """Количество просроченных задач для версии version на момент now или None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry_version, valid_until, overdue = entry
+                if entry_version == version and _before(now, valid_until):
+                    self._entries.move_to_end(user_id)
+                    metrics.increment('overdue_cache.hits')
+                    return overdue
+                del self._entries[user_id]
+        metrics.increment('overdue_cache.misses')
+        return None
+
+    def set(self, user_id: int, version: int, valid_until: datetime, overdue: int) -> None:
+        with self._lock:
+            self._entries[user_id] = (version, valid_until, overdue)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _before(now: datetime, moment: datetime) -> bool:
+    """now < moment; SQLite возвращает время без часового пояса - как и в запросе, сравнивается локальное время"""
+    if moment.tzinfo is None:
+        now = now.replace(tzinfo=None)
+    return now < moment
+
+
+overdue_cache = OverdueCache()
+
+
+class DefaultSettingsVersion:
+    """
+    Версия настроек по умолчанию (default_settings) в памяти процесса
+
+    Настройки по умолчанию общие для всех пользователей и меняются вручную
+    в базе, поэтому версия, как и глобальные настройки, перечитывается не чаще
+    одного раза в GLOBAL_SETTINGS_TTL секунд. Пока она не устарела, условный
+    GET настроек по умолчанию не обращается к базе.
+    """
+
+    def __init__(self, ttl: float = GLOBAL_SETTINGS_TTL):
+        self.ttl = ttl
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[str]:
+        with self._lock:
+            if self._token is not None and self._expires_at > time.monotonic():
+                return self._token
+        return None
+
+    def set(self, token: str) -> None:
+        with self._lock:
+            self._token = token
+            self._expires_at = time.monotonic() + self.ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+
+default_settings_version = DefaultSettingsVersion()
+
+
+async def bump_data_version(session: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Увеличить версию данных пользователей (без commit)
+
+    Выполняется в транзакции изменения задач или предпочтений: после commit
+    ETag, выданные до изменения, перестают совпадать во всех процессах.
+    Изменение настроек увеличивает версию в bump_settings_version.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    await session.execute(
+        update(User).where(User.telegram_id.in_(user_ids)).values(data_version=User.data_version + 1)
+    )
+
+
+async def get_version_token(session: AsyncSession, user_id: str, time_dependent: bool = False) -> Optional[str]:
+    """
+    Строка версии данных пользователя для ETag или None, если пользователя нет
+
+    Args:
+        time_dependent: Ответ зависит от текущего времени (списки задач: is_overdue,
+            статистика: completed_today). Тогда в версию входят часовой пояс, текущая
+            дата пользователя и количество просроченных задач: без изменения данных
+            оно меняется ровно тогда, когда у какой-то задачи меняется is_overdue.
+    """
+    result = await session.execute(
+        select(User.data_version, User.timezone).where(User.telegram_id == int(user_id))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    if not time_dependent:
+        return str(row.data_version)
+
+    timezone = pytz.timezone(row.timezone)
+    now = datetime.now(tz=timezone)
+    overdue = overdue_cache.get(int(user_id), row.data_version, now)
+    if overdue is None:
+        # Количество просроченных задач и ближайший дедлайн открытой задачи - одним запросом
+        upcoming = and_(Task.completed_at.is_(None), Task.deadline >= now)
+        result = await session.execute(
+            select(
+                func.count(case((overdue_predicate().params(now=now), 1))),
+                func.min(type_coerce(case((upcoming, Task.deadline)), Task.deadline.type)),
+            ).where(Task.user_id == int(user_id))
+        )
+        overdue, next_deadline = result.one()
+        end_of_day = timezone.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        if next_deadline is not None and next_deadline.tzinfo is None:
+            end_of_day = end_of_day.replace(tzinfo=None)
+        valid_until = min(next_deadline, end_of_day) if next_deadline is not None else end_of_day
+        overdue_cache.set(int(user_id), row.data_version, valid_until, overdue)
+    return f"{row.data_version}:{row.timezone}:{now.date().isoformat()}:{overdue}"
+
+
+async def get_default_settings_version(session: AsyncSession) -> str:
+    """
+    Версия настроек по умолчанию для ETag /api/settings/ - хэш строк default_settings
+
+    Ответ не зависит от данных пользователя, поэтому users.data_version в нее не входит.
+    Берется из default_settings_version, пока та не устарела.
+    """
+    token = default_settings_version.get()
+    if token is None:
+        result = await session.execute(
+            select(DefaultSettings.id, DefaultSettings.setting_type, DefaultSettings.is_active, DefaultSettings.value)
+            .order_by(DefaultSettings.id)
+        )
+        token = hashlib.blake2b(repr(result.all()).encode(), digest_size=8).hexdigest()
+        default_settings_version.set(token)
+    return token
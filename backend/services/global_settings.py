@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import metrics
+from backend.db.models import GlobalSettings
+from backend.load_env import env_config
+from backend.models.global_settings import GlobalConfig
+
+logger = logging.getLogger(__name__)
+
+# Через сколько секунд глобальные настройки перечитываются из базы
+GLOBAL_SETTINGS_TTL = env_config.get('GLOBAL_SETTINGS_TTL', default=60, cast=int)
+
+# Ключи ограничений в global_settings
+MAX_TASKS_PER_USER = 'max_tasks_per_user'
+MAX_REMINDERS_PER_TASK = 'max_reminders_per_task'
+
+
+class LimitExceededError(Exception):
+    """Превышено ограничение из глобальных настроек"""
+
+    def __init__(self, key: str, limit: int):
+        self.key = key
+        self.limit = limit
+        super().__init__(f"Limit {key} exceeded: {limit}")
+
+
+class GlobalSettingsCache:
+    """
+    Глобальные настройки в памяти процесса
+
+    Настройки общие для всех пользователей и меняются вручную в базе,
+    поэтому вместо версий, как у SettingsCache, они перечитываются
+    не чаще одного раза в GLOBAL_SETTINGS_TTL секунд.
+    """
+
+    def __init__(self, ttl: float = GLOBAL_SETTINGS_TTL):
+        self.ttl = ttl
+        self._config: Optional[GlobalConfig] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[GlobalConfig]:
+        """Настройки или None, если их нужно перечитать"""
+        with self._lock:
+            if self._config is not None and self._expires_at > time.monotonic():
+                metrics.increment('global_settings.hits')
+                return self._config
+        metrics.increment('global_settings.misses')
+        return None
+
+    def set(self, config: GlobalConfig) -> None:
+        with self._lock:
+            self._config = config
+            self._expires_at = time.monotonic() + self.ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._config = None
+            self._expires_at = 0.0
+
+
+global_settings_cache = GlobalSettingsCache()
+
+
+async def get_global_settings(session: AsyncSession) -> GlobalConfig:
+    """Глобальные настройки из кэша процесса (одним запросом после истечения TTL)"""
+    config = global_settings_cache.get()
+    if config is None:
+        result = await session.execute(select(GlobalSettings.key, GlobalSettings.value))
+        config = GlobalConfig.from_rows(result.all())
+        global_settings_cache.set(config)
+        logger.debug(f"Глобальные настройки загружены: {config}")
+    return config
+
+
+def normalize_reminders(reminders: Any, config: GlobalConfig) -> List[str]:
+    """
+    Проверить напоминания задачи и привести их к отсортированному списку ISO-строк
+
+    Raises:
+        ValueError: если напоминания не список дат
+        LimitExceededError: если напоминаний больше max_reminders_per_task
+    """
+    if reminders is None:
+        return []
+    if not isinstance(reminders, list):
+        raise ValueError('reminders must be a list')
+    limit = config.limit(MAX_REMINDERS_PER_TASK)
+    if limit is not None and len(reminders) > limit:
+        raise LimitExceededError(MAX_REMINDERS_PER_TASK, limit)
+
+    normalized = []
+    for reminder in reminders:
+        if isinstance(reminder, str):
+            reminder = datetime.fromisoformat(reminder.replace('Z', '+00:00'))
+        if not isinstance(reminder, datetime):
+            raise ValueError(f'Invalid reminder: {reminder}')
+        normalized.append(reminder.isoformat())
+    return sorted(normalized)
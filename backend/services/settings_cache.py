@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import metrics
+from backend.db.models import User
+from backend.load_env import env_config
+from backend.models.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_CACHE_SIZE = env_config.get('SETTINGS_CACHE_SIZE', default=1024, cast=int)
+SETTINGS_CACHE_TTL = env_config.get('SETTINGS_CACHE_TTL', default=300, cast=int)
+
+
+class SettingsCache:
+    """
+    Кэш настроек пользователей (статусы, приоритеты, продолжительности, типы задач) в памяти процесса
+
+    Запись кэша хранит users.settings_version, с которой она была загружена, и отдается,
+    только пока версия пользователя не изменилась. Версию увеличивает bump_settings_version
+    в транзакции изменения настроек, поэтому изменение в одном процессе (Flask или бот)
+    сбрасывает кэш во всех остальных без отдельного канала оповещения.
+    TTL ограничивает время жизни записи, размер ограничен вытеснением давно не использованных (LRU).
+    """
+
+    def __init__(self, maxsize: int = SETTINGS_CACHE_SIZE, ttl: float = SETTINGS_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: 'OrderedDict[int, Tuple[int, float, Settings]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, version: int) -> Optional[Settings]:
+        """Настройки пользователя версии version или None, если их нет в кэше"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry_version, expires_at, settings = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    metrics.increment('settings_cache.hits')
+                    return settings
+                del self._entries[user_id]
+                metrics.increment('settings_cache.expired')
+        metrics.increment('settings_cache.misses')
+        return None
+
+    def set(self, user_id: int, version: int, settings: Settings) -> None:
+        """Сохранить настройки пользователя версии version"""
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic() + self.ttl, settings)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                metrics.increment('settings_cache.evictions')
+
+    def invalidate(self, user_id: int) -> None:
+        """Удалить настройки пользователя из кэша"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                metrics.increment('settings_cache.invalidations')
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+settings_cache = SettingsCache()
+
+
+async def bump_settings_version(session: AsyncSession, user_id: int) -> None:
+    """
+    Увеличить версию настроек пользователя (без commit)
+
+    Выполняется в транзакции изменения настроек: после commit записи кэша
+    с прежней версией перестают отдаваться во всех процессах. Тем же запросом
+    увеличивается версия данных пользователя (ETag, см. data_version).
+    """
+    await session.execute(
+        update(User).where(User.telegram_id == user_id).values(
+            settings_version=User.settings_version + 1, data_version=User.data_version + 1
+        )
+    )
+    settings_cache.invalidate(user_id)
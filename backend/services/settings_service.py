@@ -1,7 +1,7 @@
 import json
 import logging
 from typing import Dict, Any, List, Optional, Type
-from sqlalchemy import select
+from sqlalchemy import literal, null, select, String, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db.models import (
@@ -9,6 +9,9 @@ from backend.db.models import (
     DurationSetting, TaskTypeSetting, DurationType, User
 )
 from backend.services.auth_service import AuthService
+from backend.services.data_version import bump_data_version
+from backend.services.settings_cache import bump_settings_version, settings_cache
+from backend.services.task_stats import TaskStatsService
 from backend.models.settings import Settings
 from backend.models.status import Status
 from backend.models.priority import Priority
@@ -17,6 +20,20 @@ from backend.models.task_type import TaskType
 
 logger = logging.getLogger(__name__)
 
+# Настройки в снимке кэша: ключ Settings -> (модель в базе, модель снимка, колонка сортировки).
+# Продолжительности идут первыми: по первой ветке UNION ALL определяются типы колонок
+# результата, и duration_type читается как перечисление
+SETTING_KINDS = {
+    'durations': (DurationSetting, Duration, DurationSetting.id),
+    'statuses': (StatusSetting, Status, StatusSetting.order),
+    'priorities': (PrioritySetting, Priority, PrioritySetting.order),
+    'task_types': (TaskTypeSetting, TaskType, TaskTypeSetting.order),
+}
+SETTING_COLUMNS = (
+    'id', 'name', 'code', 'description', 'color', 'order',
+    'is_default', 'is_final', 'is_active', 'duration_type', 'value',
+)
+
 class SettingsService:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -36,41 +53,49 @@ class SettingsService:
         if user_id:
             logger.debug(f"Получение настроек для пользователя {user_id}")
             user = await self.auth_service.get_user_by_id(user_id)
-            
+
             if user:
                 logger.debug(f"Пользователь {user_id} найден, получаем его настройки")
-                
-                # Получаем пользовательские настройки
-                statuses = await self.get_statuses(user_id)
-                logger.debug(f"Получены статусы: {len(statuses)}")
-
-                priorities = await self.get_priorities(user_id)
-                logger.debug(f"Получены приоритеты: {len(priorities)}")
-
-                durations = await self.get_durations(user_id)
-                logger.debug(f"Получены длительности: {len(durations)}")
-
-                task_types = await self.get_task_types(user_id)
-                logger.debug(f"Получены типы задач: {len(task_types)}")
-
-                # Если у пользователя есть хотя бы одна настройка, возвращаем их
-                if statuses or priorities or durations or task_types:
-                    logger.debug(f"Найдены пользовательские настройки для пользователя {user_id}")
-                    result = {
-                        "statuses": statuses,
-                        "priorities": priorities,
-                        "durations": durations,
-                        "task_types": task_types
-                    }
-                    logger.debug(f"Возвращаем настройки: {result}")
-                    return result
-                else:
-                    logger.debug(f"Пользовательские настройки не найдены для пользователя {user_id}, возвращаем настройки по умолчанию")
-            else:
-                logger.warning(f"Пользователь {user_id} не найден, возвращаем настройки по умолчанию")
+                return await self.get_user_settings_or_default(user)
+            logger.warning(f"Пользователь {user_id} не найден, возвращаем настройки по умолчанию")
         else:
             logger.debug("ID пользователя не указан, возвращаем настройки по умолчанию")
 
+        return await self._get_default_settings()
+
+    async def get_user_settings_or_default(self, user: User) -> Dict[str, Any]:
+        """Активные настройки уже загруженного пользователя или настройки по умолчанию, если у него их нет"""
+        # Получаем пользовательские настройки из кэша
+        settings = await self.get_cached_settings(user)
+        statuses = self._active(settings.statuses)
+        logger.debug(f"Получены статусы: {len(statuses)}")
+
+        priorities = self._active(settings.priorities)
+        logger.debug(f"Получены приоритеты: {len(priorities)}")
+
+        durations = self._active(settings.durations)
+        logger.debug(f"Получены длительности: {len(durations)}")
+
+        task_types = self._active(settings.task_types)
+        logger.debug(f"Получены типы задач: {len(task_types)}")
+
+        # Если у пользователя есть хотя бы одна настройка, возвращаем их
+        if statuses or priorities or durations or task_types:
+            logger.debug(f"Найдены пользовательские настройки для пользователя {user.telegram_id}")
+            result = {
+                "statuses": statuses,
+                "priorities": priorities,
+                "durations": durations,
+                "task_types": task_types
+            }
+            logger.debug(f"Возвращаем настройки: {result}")
+            return result
+
+        logger.debug(f"Пользовательские настройки не найдены для пользователя {user.telegram_id}, возвращаем настройки по умолчанию")
+        return await self._get_default_settings()
+
+    async def _get_default_settings(self) -> Dict[str, Any]:
+        """Активные настройки по умолчанию (default_settings)"""
         # Получаем все настройки по умолчанию
         default_statuses = await self.session.execute(
             select(DefaultSettings).where(
@@ -105,6 +130,71 @@ class SettingsService:
             "task_types": [json.loads(task_type.value) for task_type in default_task_types.scalars()]
         }
 
+    async def get_cached_settings(self, user: User) -> Settings:
+        """Все настройки пользователя, включая неактивные, из кэша настроек (при промахе - из базы)"""
+        version = user.settings_version or 0
+        settings = settings_cache.get(user.telegram_id, version)
+        if settings is None:
+            settings = await self._load_settings(user.telegram_id)
+            settings_cache.set(user.telegram_id, version, settings)
+        return settings
+
+    async def _load_settings(self, user_id: int) -> Settings:
+        """Загрузить все настройки пользователя из базы одним запросом (UNION ALL по таблицам настроек)"""
+        logger.debug(f"Загрузка настроек пользователя {user_id} в кэш")
+        query = union_all(*(
+            select(
+                literal(key, String).label('kind'),
+                order.label('sort_key'),
+                *(getattr(model, column, null()).label(column) for column in SETTING_COLUMNS)
+            ).where(model.user_id == user_id) # type: ignore
+            for key, (model, _, order) in SETTING_KINDS.items()
+        ))
+        query = query.order_by(query.selected_columns.sort_key, query.selected_columns.id)
+        result = await self.session.execute(query)
+
+        settings: Dict[str, List[Any]] = {key: [] for key in SETTING_KINDS}
+        for row in result.mappings():
+            snapshot_model = SETTING_KINDS[row['kind']][1]
+            values = {column: row[column] for column in SETTING_COLUMNS if column in snapshot_model.model_fields}
+            if snapshot_model is Duration:
+                values['type'] = row['duration_type'].value
+            settings[row['kind']].append(snapshot_model(**values))
+        return Settings(**settings)
+
+    @staticmethod
+    def _to_model(setting: Any) -> Any:
+        """Настройка из базы в виде модели кэша настроек (Status, Priority, Duration, TaskType)"""
+        if isinstance(setting, StatusSetting):
+            return Status(
+                id=setting.id, name=setting.name, code=setting.code, color=setting.color, order=setting.order,
+                is_default=setting.is_default, is_final=setting.is_final, is_active=setting.is_active
+            )
+        if isinstance(setting, PrioritySetting):
+            return Priority(
+                id=setting.id, name=setting.name, color=setting.color, order=setting.order,
+                is_default=setting.is_default, is_active=setting.is_active
+            )
+        if isinstance(setting, DurationSetting):
+            return Duration(
+                id=setting.id, name=setting.name, type=setting.duration_type.value, value=setting.value,
+                is_default=setting.is_default, is_active=setting.is_active
+            )
+        return TaskType(
+            id=setting.id, name=setting.name, description=setting.description, color=setting.color,
+            order=setting.order, is_default=setting.is_default, is_active=setting.is_active
+        )
+
+    @staticmethod
+    def _active(items: List[Any]) -> List[Dict[str, Any]]:
+        """Активные настройки в виде словарей ответа API"""
+        return [item.model_dump(mode='json') for item in items if item.is_active]
+
+    async def _commit_settings(self, user: User) -> None:
+        """Сохранить изменение настроек пользователя и сбросить их кэш во всех процессах"""
+        await bump_settings_version(self.session, user.telegram_id)
+        await self.session.commit()
+
     async def get_task_types(self, user_id: str) -> List[Dict[str, Any]]:
         """Получить список типов задач пользователя"""
         logger.debug(f"Получение типов задач для пользователя {user_id}")
@@ -113,17 +203,14 @@ class SettingsService:
         if not user:
             logger.warning(f"Пользователь {user_id} не найден")
             return []
+        return await self.get_user_task_types(user)
 
+    async def get_user_task_types(self, user: User) -> List[Dict[str, Any]]:
+        """Активные типы задач уже загруженного пользователя или типы задач по умолчанию"""
         # Сначала пробуем получить пользовательские настройки
-        result = await self.session.execute(
-            select(TaskTypeSetting).where(
-                TaskTypeSetting.user_id == user.telegram_id, # type: ignore
-                TaskTypeSetting.is_active == True
-            ).order_by(TaskTypeSetting.order)
-        )
-        task_types = list(result.scalars())
+        task_types = self._active((await self.get_cached_settings(user)).task_types)
 
-        logger.debug(f"Найдено {len(task_types)} пользовательских типов задач для пользователя {user_id}")
+        logger.debug(f"Найдено {len(task_types)} пользовательских типов задач для пользователя {user.telegram_id}")
 
         # Если пользовательских настроек нет, берем настройки по умолчанию
         if not task_types:
@@ -146,18 +233,7 @@ class SettingsService:
             logger.debug(f"Найдено {len(default_task_types_list)} типов задач по умолчанию")
             return default_task_types_list
 
-        return [
-            {
-                "id": task_type.id,
-                "name": task_type.name,
-                "description": task_type.description,
-                "color": task_type.color,
-                "order": task_type.order,
-                "is_default": task_type.is_default,
-                "is_active": task_type.is_active
-            }
-            for task_type in task_types
-        ]
+        return task_types
 
     async def create_task_type(
         self,
@@ -170,7 +246,7 @@ class SettingsService:
             return None
 
         task_type = TaskTypeSetting(
-            user_id=user.id,
+            user_id=user.telegram_id,
             name=task_type_data["name"],
             description=task_type_data.get("description"),
             color=task_type_data.get("color"),
@@ -180,7 +256,7 @@ class SettingsService:
         )
 
         self.session.add(task_type)
-        await self.session.commit()
+        await self._commit_settings(user)
         await self.session.refresh(task_type)
 
         return {
@@ -205,7 +281,7 @@ class SettingsService:
             return None
 
         task_type = await self.session.get(TaskTypeSetting, task_type_id)
-        if not task_type or task_type.user_id != user.id:
+        if not task_type or task_type.user_id != user.telegram_id:
             return None
 
         if "name" in task_type_data:
@@ -221,7 +297,7 @@ class SettingsService:
         if "is_active" in task_type_data:
             task_type.is_active = task_type_data["is_active"]
 
-        await self.session.commit()
+        await self._commit_settings(user)
         await self.session.refresh(task_type)
 
         return {
@@ -241,11 +317,14 @@ class SettingsService:
             return False
 
         task_type = await self.session.get(TaskTypeSetting, task_type_id)
-        if not task_type or task_type.user_id != user.id:
+        if not task_type or task_type.user_id != user.telegram_id:
             return False
 
         await self.session.delete(task_type)
-        await self.session.commit()
+        await self.session.flush()
+        # Задачи удаленного типа остаются без типа
+        await TaskStatsService(self.session).reconcile_user(user.telegram_id)
+        await self._commit_settings(user)
 
         return True
 
@@ -266,7 +345,7 @@ class SettingsService:
 
         if setting_type == 'status':
             setting = StatusSetting(
-                user_id=user.id,
+                user_id=user.telegram_id,
                 name=setting_data['name'],
                 code=setting_data['code'],
                 color=setting_data.get('color', '#808080'),
@@ -277,7 +356,7 @@ class SettingsService:
             )
         elif setting_type == 'priority':
             setting = PrioritySetting(
-                user_id=user.id,
+                user_id=user.telegram_id,
                 name=setting_data['name'],
                 color=setting_data.get('color', '#808080'),
                 order=setting_data.get('order', 0),
@@ -286,7 +365,7 @@ class SettingsService:
             )
         else:  # duration
             setting = DurationSetting(
-                user_id=user.id,
+                user_id=user.telegram_id,
                 name=setting_data['name'],
                 duration_type=DurationType(setting_data['type']),
                 value=setting_data['value'],
@@ -295,10 +374,10 @@ class SettingsService:
             )
 
         self.session.add(setting)
-        await self.session.commit()
+        await self._commit_settings(user)
         await self.session.refresh(setting)
 
-        return setting.to_dict()
+        return self._to_model(setting).model_dump(mode='json')
 
     async def update_setting(
         self,
@@ -317,7 +396,7 @@ class SettingsService:
             return None
 
         setting = await self.session.get(setting_class, setting_id)
-        if not setting or setting.user_id != user.id:
+        if not setting or setting.user_id != user.telegram_id:
             return None
 
         if setting_type == 'status':
@@ -358,10 +437,10 @@ class SettingsService:
             if 'is_default' in setting_data:
                 setting.is_default = setting_data['is_default']
 
-        await self.session.commit()
+        await self._commit_settings(user)
         await self.session.refresh(setting)
 
-        return setting.to_dict()
+        return self._to_model(setting).model_dump(mode='json')
 
     async def delete_setting(
         self,
@@ -379,11 +458,14 @@ class SettingsService:
             return False
 
         setting = await self.session.get(setting_class, setting_id)
-        if not setting or setting.user_id != user.id:
+        if not setting or setting.user_id != user.telegram_id:
             return False
 
         await self.session.delete(setting)
-        await self.session.commit()
+        await self.session.flush()
+        # Задачи удаленной настройки остаются без нее (ON DELETE SET NULL)
+        await TaskStatsService(self.session).reconcile_user(user.telegram_id)
+        await self._commit_settings(user)
 
         return True
 
@@ -487,13 +569,7 @@ class SettingsService:
             return []
 
         # Сначала пробуем получить пользовательские настройки
-        result = await self.session.execute(
-            select(StatusSetting).where(
-                StatusSetting.user_id == user.telegram_id, # type: ignore
-                StatusSetting.is_active == True
-            ).order_by(StatusSetting.order)
-        )
-        statuses = list(result.scalars())
+        statuses = self._active((await self.get_cached_settings(user)).statuses)
 
         logger.debug(f"Найдено {len(statuses)} пользовательских статусов для пользователя {user_id}")
 
@@ -518,19 +594,7 @@ class SettingsService:
             logger.debug(f"Найдено {len(default_statuses_list)} статусов по умолчанию")
             return default_statuses_list
 
-        return [
-            {
-                "id": status.id,
-                "name": status.name,
-                "code": status.code,
-                "color": status.color,
-                "order": status.order,
-                "is_default": status.is_default,
-                "is_final": status.is_final,
-                "is_active": status.is_active
-            }
-            for status in statuses
-        ]
+        return statuses
 
     async def get_priorities(self, user_id: str) -> List[Dict[str, Any]]:
         """Получить список приоритетов пользователя"""
@@ -542,13 +606,7 @@ class SettingsService:
             return []
 
         # Сначала пробуем получить пользовательские настройки
-        result = await self.session.execute(
-            select(PrioritySetting).where(
-                PrioritySetting.user_id == user.telegram_id, # type: ignore
-                PrioritySetting.is_active == True
-            ).order_by(PrioritySetting.order)
-        )
-        priorities = list(result.scalars())
+        priorities = self._active((await self.get_cached_settings(user)).priorities)
 
         logger.debug(f"Найдено {len(priorities)} пользовательских приоритетов для пользователя {user_id}")
 
@@ -573,17 +631,7 @@ class SettingsService:
             logger.debug(f"Найдено {len(default_priorities_list)} приоритетов по умолчанию")
             return default_priorities_list
 
-        return [
-            {
-                "id": priority.id,
-                "name": priority.name,
-                "color": priority.color,
-                "order": priority.order,
-                "is_default": priority.is_default,
-                "is_active": priority.is_active
-            }
-            for priority in priorities
-        ]
+        return priorities
 
     async def get_durations(self, user_id: str) -> List[Dict[str, Any]]:
         """Получить список длительностей пользователя"""
@@ -595,13 +643,7 @@ class SettingsService:
             return []
 
         # Сначала пробуем получить пользовательские настройки
-        result = await self.session.execute(
-            select(DurationSetting).where(
-                DurationSetting.user_id == user.telegram_id, # type: ignore
-                DurationSetting.is_active == True
-            ).order_by(DurationSetting.id)
-        )
-        durations = list(result.scalars())
+        durations = self._active((await self.get_cached_settings(user)).durations)
 
         logger.debug(f"Найдено {len(durations)} пользовательских приоритетов для пользователя {user_id}")
 
@@ -631,17 +673,7 @@ class SettingsService:
         
             logger.debug(f"Найдено {len(default_durations_list)} длительностей по умолчанию")
             return default_durations_list
-        return [
-            {
-                "id": duration.id,
-                "name": duration.name,
-                "type": duration.duration_type.value,
-                "value": duration.value,
-                "is_default": duration.is_default,
-                "is_active": duration.is_active
-            }
-            for duration in durations
-        ]
+        return durations
 
     async def get_user_settings(self, user_id: str):
         """Получить пользователя по ID"""
@@ -663,6 +695,7 @@ class SettingsService:
         # Сохраняем изменения
         logger.info(f"Сохранение настроек пользователя {user_id}: {user.settings}")
         self.session.add(user)
+        await bump_data_version(self.session, [user.telegram_id])
         await self.session.commit()
 
         return True
@@ -0,0 +1,192 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+
+from sqlalchemy import DateTime, FromClause, Subquery, delete, insert, literal, literal_column, or_, select, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import Task, TaskArchive
+from backend.load_env import env_config
+from backend.models.task_filter import TaskFilter
+from backend.services.data_version import bump_data_version
+from backend.services.task_stats import ARCHIVED_STAT_KEY, TaskStatsService, task_stat_keys
+
+logger = logging.getLogger(__name__)
+
+# Задачи, завершенные больше указанного количества дней назад, переносятся в архив (0 - не переносить)
+TASK_ARCHIVE_AFTER_DAYS = env_config.get('TASK_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+# Количество задач, переносимых в архив одной транзакцией
+TASK_ARCHIVE_BATCH_SIZE = env_config.get('TASK_ARCHIVE_BATCH_SIZE', default=500, cast=int)
+
+# Колонки, которые переносятся между tasks и tasks_archive
+ARCHIVE_COLUMNS = tuple(column.key for column in Task.__table__.c)
+
+# Колонки задач, которые читают списки из task_source
+SOURCE_COLUMNS = (
+    'id', 'user_id', 'title', 'description', 'deadline', 'created_at', 'completed_at',
+    'type_id', 'status_id', 'priority_id', 'duration_id',
+)
+
+
+@lru_cache(maxsize=None)
+def archived_tasks(dialect: str) -> Subquery:
+    """
+    Задачи вместе с архивом: UNION ALL tasks и tasks_archive
+
+    Подзапрос называется tasks, поэтому колонка search_vector в PostgreSQL
+    доступна поиску по тому же имени (tasks.search_vector), что и для таблицы.
+    Условия WHERE базы данных переносят внутрь обеих частей и используют их индексы.
+    Подзапрос строится один раз: от него зависит кэш compile_predicate.
+    """
+    live = [Task.__table__.c[name] for name in SOURCE_COLUMNS]
+    archived = [TaskArchive.__table__.c[name] for name in SOURCE_COLUMNS]
+    if dialect == 'postgresql':
+        live.append(literal_column('tasks.search_vector', TSVECTOR).label('search_vector'))
+        archived.append(literal_column('tasks_archive.search_vector', TSVECTOR).label('search_vector'))
+    return union_all(select(*live), select(*archived)).subquery('tasks')
+
+
+def task_source(dialect: str, task_filter: TaskFilter) -> FromClause:
+    """Таблица задач для фильтра: tasks или tasks вместе с архивом (TaskFilter.includes_archive)"""
+    return archived_tasks(dialect) if task_filter.includes_archive() else Task.__table__
+
+
+class TaskArchiveService:
+    """
+    Перенос давно завершенных задач в tasks_archive и обратно
+
+    Задача переносится целиком с тем же id (id задач не повторяются: в SQLite
+    tasks объявлена с AUTOINCREMENT). Счетчики user_task_stats
+    описывают задачи в tasks, задачи в архиве учитываются счетчиком archived.
+    Изменение задачи из архива (TaskService.update_task) возвращает ее в tasks.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.stats = TaskStatsService(session)
+
+    async def archive_completed(
+        self,
+        older_than_days: int = TASK_ARCHIVE_AFTER_DAYS,
+        batch_size: int = TASK_ARCHIVE_BATCH_SIZE
+    ) -> int:
+        """
+        Перенести в архив задачи, завершенные и не изменявшиеся больше older_than_days дней
+
+        Каждая часть из batch_size задач переносится своей транзакцией,
+        поэтому блокировки держатся недолго.
+
+        Returns:
+            int: Количество перенесенных задач
+        """
+        cutoff = datetime.now(tz=timezone.utc) - timedelta(days=older_than_days)
+        archived = 0
+        while True:
+            try:
+                moved = await self._archive_batch(cutoff, batch_size)
+                await self.session.commit()
+            except Exception:
+                await self.session.rollback()
+                raise
+            archived += moved
+            if moved < batch_size:
+                break
+        logger.info(f"Перенесено в архив задач: {archived}")
+        return archived
+
+    async def _archive_batch(self, cutoff: datetime, batch_size: int) -> int:
+        """Перенести в архив одну часть задач (без commit)"""
+        query = select(
+            Task.id, Task.user_id, Task.status_id, Task.priority_id, Task.type_id, Task.completed_at
+        ).where(
+            Task.completed_at < cutoff,
+            or_(Task.updated_at.is_(None), Task.updated_at < cutoff)
+        ).order_by(Task.completed_at, Task.id).limit(batch_size)
+        if self.session.bind.dialect.name == 'postgresql':
+            # Задачи, которые сейчас изменяются, переносятся в следующий раз
+            query = query.with_for_update(skip_locked=True)
+        rows = (await self.session.execute(query)).all()
+        if not rows:
+            return 0
+
+        await self._move(Task, TaskArchive, [row.id for row in rows], archived_at=datetime.now(tz=timezone.utc))
+        for row in rows:
+            self.stats.remove(row.user_id, task_stat_keys(row._mapping))
+            self.stats.add(row.user_id, [ARCHIVED_STAT_KEY])
+        await self.stats.flush()
+        await bump_data_version(self.session, (row.user_id for row in rows))
+        return len(rows)
+
+    async def restore(self, user_id: int, task_ids: Iterable[int]) -> List[int]:
+        """
+        Вернуть задачи пользователя из архива в tasks (без commit)
+
+        Время изменения задачи обновляется, чтобы она не попала
+        в архив при следующем переносе.
+
+        Returns:
+            List[int]: id возвращенных задач (задач не из архива в списке нет)
+        """
+        rows = await self._archived_rows(user_id, task_ids)
+        if not rows:
+            return []
+
+        task_ids = [row.id for row in rows]
+        await self._move(TaskArchive, Task, task_ids, updated_at=datetime.now(tz=timezone.utc))
+        for row in rows:
+            self.stats.remove(user_id, [ARCHIVED_STAT_KEY])
+            self.stats.add(user_id, task_stat_keys(row._mapping))
+        await self.stats.flush()
+        await bump_data_version(self.session, [user_id])
+        logger.debug(f"Задачи {task_ids} пользователя {user_id} возвращены из архива")
+        return task_ids
+
+    async def delete(self, user_id: int, task_ids: Iterable[int]) -> List[int]:
+        """
+        Удалить задачи пользователя из архива (без commit)
+
+        Returns:
+            List[int]: id удаленных задач
+        """
+        rows = await self._archived_rows(user_id, task_ids)
+        if not rows:
+            return []
+
+        task_ids = [row.id for row in rows]
+        await self.session.execute(delete(TaskArchive).where(TaskArchive.id.in_(task_ids)))
+        for _ in rows:
+            self.stats.remove(user_id, [ARCHIVED_STAT_KEY])
+        await self.stats.flush()
+        await bump_data_version(self.session, [user_id])
+        return task_ids
+
+    async def _archived_rows(self, user_id: int, task_ids: Iterable[int]) -> List[Any]:
+        """Задачи пользователя из архива с колонками счетчиков"""
+        task_ids = [int(task_id) for task_id in task_ids]
+        if not task_ids:
+            return []
+        query = select(
+            TaskArchive.id, TaskArchive.status_id, TaskArchive.priority_id,
+            TaskArchive.type_id, TaskArchive.completed_at
+        ).where(TaskArchive.user_id == user_id, TaskArchive.id.in_(task_ids))
+        if self.session.bind.dialect.name == 'postgresql':
+            query = query.with_for_update()
+        return (await self.session.execute(query)).all()
+
+    async def _move(self, source: Type[Any], target: Type[Any], task_ids: List[int], **overrides: Optional[datetime]) -> None:
+        """
+        Перенести задачи между tasks и tasks_archive: INSERT ... SELECT и DELETE
+
+        Args:
+            overrides: Значения колонок-дат, заменяющие перенесенные (archived_at, updated_at)
+        """
+        values = {name: source.__table__.c[name] for name in ARCHIVE_COLUMNS}
+        values.update({
+            name: literal(value, DateTime(timezone=True)) for name, value in overrides.items()
+        })
+        await self.session.execute(
+            insert(target).from_select(list(values), select(*values.values()).where(source.id.in_(task_ids)))
+        )
+        await self.session.execute(delete(source).where(source.id.in_(task_ids)))
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или не соответствует параметрам сортировки"""
+
+
+def encode_cursor(sort_by: Optional[str], sort_order: str, value: Any, task_id: int) -> str:
+    """
+    Закодировать позицию последней показанной задачи в непрозрачный курсор
+
+    Args:
+        sort_by: Поле сортировки, для которого построен курсор
+        sort_order: Порядок сортировки (asc, desc)
+        value: Значение ключа сортировки у последней задачи
+        task_id: ID последней задачи
+
+    Returns:
+        str: Курсор в виде base64url-строки
+    """
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps(
+        {'s': sort_by or '', 'o': sort_order, 'v': value, 'id': task_id},
+        separators=(',', ':'),
+        ensure_ascii=False
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: Optional[str], sort_order: str) -> Tuple[Any, int]:
+    """
+    Раскодировать курсор и проверить, что он построен для той же сортировки
+
+    Returns:
+        Tuple[Any, int]: Значение ключа сортировки и ID последней задачи
+
+    Raises:
+        InvalidCursorError: если курсор поврежден или построен для другой сортировки
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        value = payload['v']
+        task_id = int(payload['id'])
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['dt'])
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+    if payload.get('s') != (sort_by or '') or payload.get('o') != sort_order:
+        raise InvalidCursorError("Cursor does not match sort parameters")
+
+    return value, task_id
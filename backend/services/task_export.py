@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+# Формат выгрузки -> MIME-тип ответа
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Колонки CSV: настройки выгружаются названиями
+CSV_COLUMNS = (
+    'id', 'title', 'description', 'type', 'status', 'priority', 'duration',
+    'deadline', 'created_at', 'completed_at', 'is_overdue'
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_row(task: Dict[str, Any]) -> List[Any]:
+    return [
+        task['id'],
+        task['title'],
+        task['description'] or '',
+        task['type']['name'] if task['type'] else '',
+        task['status']['name'] if task['status'] else '',
+        task['priority']['name'] if task['priority'] else '',
+        task['duration']['name'] if task['duration'] else '',
+        task['deadline_iso'] or '',
+        task['created_at'],
+        task['completed_at'] or '',
+        task['is_overdue'],
+    ]
+
+
+async def export_chunks(
+    tasks: AsyncIterator[List[Dict[str, Any]]],
+    export_format: str
+) -> AsyncIterator[str]:
+    """
+    Преобразовать части задач (TaskService.stream_tasks) в текст выгрузки
+
+    Каждая часть задач превращается в один фрагмент текста, поэтому память
+    ограничена размером части, а не количеством задач.
+
+    Args:
+        tasks: Асинхронный итератор частей задач
+        export_format: Формат выгрузки (ndjson, csv)
+
+    Yields:
+        str: Очередной фрагмент выгрузки
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    if export_format == 'ndjson':
+        async for chunk in tasks:
+            yield ''.join(
+                json.dumps(task, default=_json_default, ensure_ascii=False) + '\n' for task in chunk
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM, чтобы Excel открывал выгрузку в UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+    async for chunk in tasks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(task) for task in chunk)
+        yield buffer.getvalue()
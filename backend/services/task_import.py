@@ -0,0 +1,326 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import Task, User
+from backend.models.global_settings import GlobalConfig
+from backend.models.task_filter import TaskFilter
+from backend.services.auth_service import AuthService
+from backend.services.data_version import bump_data_version
+from backend.services.global_settings import (
+    MAX_TASKS_PER_USER, LimitExceededError, get_global_settings, normalize_reminders
+)
+from backend.services.task_service import TaskService
+from backend.services.task_stats import TaskStatsService, task_stat_keys
+
+logger = logging.getLogger(__name__)
+
+# Форматы импорта: те же, что и у выгрузки (/api/tasks/export)
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Количество задач в одной вставке (COPY или executemany)
+IMPORT_BATCH_SIZE = 1000
+
+# Сколько ошибок по строкам возвращается в отчете (остальные только считаются)
+MAX_REPORTED_ERRORS = 1000
+
+# Колонки настроек: поле в файле -> поле задачи
+SETTING_FIELDS = {
+    'type': 'type_id',
+    'status': 'status_id',
+    'priority': 'priority_id',
+    'duration': 'duration_id',
+}
+
+# Колонки таблицы tasks, которые заполняет импорт
+IMPORT_COLUMNS = (
+    'user_id', 'title', 'description', 'type_id', 'status_id', 'priority_id', 'duration_id',
+    'deadline', 'completed_at', 'created_at', 'updated_at', 'reminders', 'tags', 'custom_fields'
+)
+
+# Колонки с JSON: для COPY передаются строкой
+JSON_COLUMNS = ('reminders', 'tags', 'custom_fields')
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class ImportRowError(ValueError):
+    """Строка импорта не может быть преобразована в задачу"""
+
+
+class TaskImportService:
+    """
+    Импорт задач из CSV или NDJSON
+
+    Файл читается потоково, названия настроек сопоставляются с настройками
+    пользователя, загруженными один раз, задачи записываются пачками через
+    COPY (PostgreSQL) или executemany. Весь импорт выполняется в одной
+    транзакции: строки с ошибками пропускаются и попадают в отчет.
+    Строки сверх max_tasks_per_user тоже попадают в отчет как ошибки.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.auth_service = AuthService(session)
+        self.stats = TaskStatsService(session)
+
+    async def import_tasks(
+        self,
+        user_id: str,
+        stream: BinaryIO,
+        import_format: str,
+        on_progress: Optional[ProgressCallback] = None,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Импортировать задачи пользователя
+
+        Args:
+            user_id: ID пользователя
+            stream: Бинарный поток с файлом в кодировке UTF-8 (BOM допускается)
+            import_format: Формат файла (csv, ndjson)
+            on_progress: Вызывается после записи каждой пачки с текущим отчетом
+            batch_size: Количество задач в одной вставке
+
+        Returns:
+            Optional[Dict[str, Any]]: Отчет {'processed', 'imported', 'failed', 'errors'},
+            где errors - список {'row', 'error'}; None, если пользователь не найден
+        """
+        if import_format not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {import_format}")
+
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        # Все настройки пользователя - один раз на весь импорт
+        settings = await TaskService(self.session).get_settings_by_field(user)
+        names = {
+            field: {setting.name.strip().casefold(): setting for setting in owned.values()}
+            for field, owned in settings.items()
+        }
+        defaults = {
+            field: next((setting.id for setting in owned.values() if setting.is_default), None)
+            for field, owned in settings.items()
+        }
+
+        config = await get_global_settings(self.session)
+        # Сколько задач еще можно создать: счетчик total читается один раз на импорт
+        capacity = config.limit(MAX_TASKS_PER_USER)
+        if capacity is not None:
+            capacity -= await self.stats.count_for_filter(user.telegram_id, TaskFilter())
+
+        report = {'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+        timezone = pytz.timezone(user.timezone)
+        batch: List[Dict[str, Any]] = []
+
+        try:
+            for row_number, record in self._read_records(stream, import_format):
+                report['processed'] += 1
+                try:
+                    if isinstance(record, Exception):
+                        raise ImportRowError(str(record))
+                    values = self._task_values(user, record, settings, names, defaults, config, timezone)
+                    if capacity is not None and report['imported'] + len(batch) >= capacity:
+                        raise ImportRowError(f'Task limit reached: {config.max_tasks_per_user}')
+                    batch.append(values)
+                except ImportRowError as e:
+                    report['failed'] += 1
+                    if len(report['errors']) < MAX_REPORTED_ERRORS:
+                        report['errors'].append({'row': row_number, 'error': str(e)})
+                    continue
+
+                if len(batch) >= batch_size:
+                    await self._write_batch(batch)
+                    report['imported'] += len(batch)
+                    batch = []
+                    self._progress(user_id, report, on_progress)
+
+            if batch:
+                await self._write_batch(batch)
+                report['imported'] += len(batch)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        self._progress(user_id, report, on_progress)
+        return report
+
+    @staticmethod
+    def _read_records(stream: BinaryIO, import_format: str) -> Iterator[Tuple[int, Any]]:
+        """Прочитать записи файла: (номер строки, словарь или ошибка разбора)"""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            if import_format == 'csv':
+                reader = csv.DictReader(text)
+                while True:
+                    try:
+                        record = next(reader)
+                    except StopIteration:
+                        return
+                    except csv.Error as e:
+                        yield reader.line_num, e
+                        continue
+                    yield reader.line_num, record
+            else:
+                for row_number, line in enumerate(text, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        yield row_number, e
+                        continue
+                    yield row_number, record if isinstance(record, dict) else ImportRowError('Row must be an object')
+        finally:
+            # Поток принадлежит вызывающему коду
+            text.detach()
+
+    def _task_values(
+        self,
+        user: User,
+        record: Dict[str, Any],
+        settings: Dict[str, Dict[int, Any]],
+        names: Dict[str, Dict[str, Any]],
+        defaults: Dict[str, Optional[int]],
+        config: GlobalConfig,
+        timezone
+    ) -> Dict[str, Any]:
+        """Значения колонок задачи из записи файла"""
+        now = datetime.now(tz=timezone)
+
+        title = record.get('title') or ''
+        description = record.get('description') or None
+        if not isinstance(title, str) or not isinstance(description, (str, type(None))):
+            raise ImportRowError('title and description must be strings')
+        title = title.strip() or "Новая задача"
+        if len(title) > Task.title.type.length:
+            raise ImportRowError('title is too long')
+        if description and len(description) > Task.description.type.length:
+            raise ImportRowError('description is too long')
+
+        values = {
+            'user_id': user.telegram_id,
+            'title': title,
+            'description': description,
+        }
+        for name, field in SETTING_FIELDS.items():
+            values[field] = self._setting_id(record, name, field, settings[field], names[field], defaults[field])
+
+        deadline = self._datetime(record, 'deadline_iso') or self._datetime(record, 'deadline')
+        duration = settings['duration_id'].get(values['duration_id'])
+        if not deadline and duration:
+            deadline = duration.deadline_from(now)
+        values['deadline'] = deadline
+
+        completed_at = self._datetime(record, 'completed_at')
+        status = settings['status_id'].get(values['status_id'])
+        if not completed_at and status and status.is_final:
+            completed_at = now
+        values['completed_at'] = completed_at
+
+        values['created_at'] = self._datetime(record, 'created_at') or now
+        values['updated_at'] = now
+        values['reminders'] = self._reminders(record, config)
+        values['tags'] = []
+        values['custom_fields'] = {}
+        return values
+
+    @staticmethod
+    def _setting_id(
+        record: Dict[str, Any],
+        name: str,
+        field: str,
+        owned: Dict[int, Any],
+        by_name: Dict[str, Any],
+        default: Optional[int]
+    ) -> Optional[int]:
+        """
+        ID настройки пользователя по названию (CSV, объект из NDJSON-выгрузки)
+        или по ID из колонки <поле>_id; без значения - настройка по умолчанию
+        """
+        value = record.get(name)
+        if isinstance(value, dict):
+            value = value.get('name')
+        if isinstance(value, str) and value.strip():
+            setting = by_name.get(value.strip().casefold())
+            if not setting:
+                raise ImportRowError(f'Unknown {name}: {value}')
+            return setting.id
+
+        setting_id = record.get(field)
+        if setting_id not in (None, ''):
+            try:
+                setting_id = int(setting_id)
+            except (TypeError, ValueError):
+                raise ImportRowError(f'Invalid {field}: {setting_id}')
+            if setting_id not in owned:
+                raise ImportRowError(f'Unknown {field}: {setting_id}')
+            return setting_id
+
+        return default
+
+    @staticmethod
+    def _reminders(record: Dict[str, Any], config: GlobalConfig) -> List[str]:
+        """Напоминания: список в NDJSON или JSON-строка в CSV"""
+        reminders = record.get('reminders')
+        try:
+            if isinstance(reminders, str):
+                reminders = json.loads(reminders) if reminders.strip() else None
+            return normalize_reminders(reminders, config)
+        except LimitExceededError:
+            raise ImportRowError(f'Too many reminders: maximum {config.max_reminders_per_task}')
+        except ValueError:
+            raise ImportRowError(f'Invalid reminders: {record.get("reminders")}')
+
+    @staticmethod
+    def _datetime(record: Dict[str, Any], field: str) -> Optional[datetime]:
+        value = record.get(field)
+        if value in (None, ''):
+            return None
+        if not isinstance(value, str):
+            raise ImportRowError(f'Invalid {field}: {value}')
+        parsed = TaskService.parse_deadline(value)
+        if parsed is None:
+            raise ImportRowError(f'Invalid {field}: {value}')
+        return parsed
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Записать пачку задач (COPY в PostgreSQL, executemany в остальных СУБД) и счетчики задач"""
+        if self.session.bind.dialect.name == 'postgresql':
+            # Соединение сессии уже в транзакции (настройки читались через него),
+            # поэтому COPY выполняется в той же транзакции, что и весь импорт
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            records = [
+                tuple(json.dumps(values[column]) if column in JSON_COLUMNS else values[column]
+                      for column in IMPORT_COLUMNS)
+                for values in batch
+            ]
+            await raw_connection.driver_connection.copy_records_to_table(
+                Task.__tablename__, records=records, columns=IMPORT_COLUMNS
+            )
+        else:
+            await self.session.execute(insert(Task), batch)
+
+        for values in batch:
+            self.stats.add(values['user_id'], task_stat_keys(values))
+        await self.stats.flush()
+        await bump_data_version(self.session, (values['user_id'] for values in batch))
+
+    @staticmethod
+    def _progress(user_id: str, report: Dict[str, Any], on_progress: Optional[ProgressCallback]) -> None:
+        logger.info(
+            f"Импорт задач пользователя {user_id}: обработано {report['processed']}, "
+            f"импортировано {report['imported']}, ошибок {report['failed']}"
+        )
+        if on_progress:
+            on_progress(report)
@@ -0,0 +1,116 @@
+import re
+from typing import List
+
+from sqlalchemy import func, or_, select, null, literal_column, table, column, ColumnElement, FromClause, CTE
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import Task
+
+# Конфигурации полнотекстового поиска PostgreSQL, используемые в tasks.search_vector
+SEARCH_CONFIGURATIONS = ('russian', 'english')
+
+# Сгенерированная колонка tsvector существует только в PostgreSQL и не отображается в модели Task
+# (подзапрос задач вместе с архивом тоже называется tasks, см. task_archive.archived_tasks)
+search_vector = literal_column('tasks.search_vector', type_=TSVECTOR)
+
+# Теневые FTS5-таблицы для SQLite (см. миграции task_search и tasks_archive)
+tasks_fts = table('tasks_fts', column('rowid'), column('title'), column('description'))
+tasks_archive_fts = table('tasks_archive_fts', column('rowid'), column('title'), column('description'))
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class TaskSearch:
+    """
+    Полнотекстовый поиск задач
+
+    В PostgreSQL используется сгенерированная колонка tsvector (конфигурации ru+en)
+    с GIN-индексом и pg_trgm для поиска подстрок, в SQLite - таблица FTS5.
+    В обоих случаях совпадение подстроки в названии или описании тоже считается
+    найденным, поэтому результаты не уже, чем у прежнего поиска через `in`.
+    Для задач вместе с архивом в SQLite поиск идет по FTS5-таблицам tasks и архива
+    (id задач в них не пересекаются).
+    """
+
+    def __init__(self, session: AsyncSession, search_query: str, tasks: FromClause = Task.__table__):
+        self.tasks = tasks.c
+        self.fts_tables = [tasks_fts] if tasks is Task.__table__ else [tasks_fts, tasks_archive_fts]
+        self.dialect = session.bind.dialect.name
+        self.query = search_query.strip().lower()
+        self.tokens: List[str] = _TOKEN_RE.findall(self.query)
+
+    def _substring_condition(self) -> ColumnElement:
+        """Совпадение подстроки (без учета регистра), использует триграммные индексы"""
+        return or_(
+            func.lower(self.tasks.title).contains(self.query, autoescape=True),
+            func.lower(self.tasks.description).contains(self.query, autoescape=True)
+        )
+
+    def _ts_query(self) -> ColumnElement:
+        """tsquery, объединяющий запрос по всем конфигурациям через ИЛИ"""
+        ts_query = None
+        for config in SEARCH_CONFIGURATIONS:
+            part = func.plainto_tsquery(literal_column(f"'{config}'::regconfig"), self.query)
+            ts_query = part if ts_query is None else ts_query.op('||')(part)
+        return ts_query
+
+    def _fts_match(self) -> str:
+        """Запрос FTS5: все слова запроса как префиксы"""
+        return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in self.tokens)
+
+    def _matches(self) -> List[CTE]:
+        """
+        Совпадения FTS5 (id задачи и bm25) по каждой FTS-таблице
+
+        CTE не зависит от строки задач, поэтому SQLite материализует его один
+        раз: условие WHERE и релевантность (через автоматический индекс по id)
+        читают готовый результат, а не выполняют MATCH для каждой строки задач.
+        CTE объявляется в том подзапросе, где используется (nesting), поэтому
+        несколько поисков в одном запросе (UNION ALL в get_facets) не
+        конфликтуют по имени.
+        """
+        return [
+            select(fts.c.rowid.label('id'), func.bm25(literal_column(fts.name)).label('rank'))
+            .where(literal_column(fts.name).op('MATCH')(self._fts_match()))
+            .cte(f'{fts.name}_match', nesting=True)
+            .prefix_with('MATERIALIZED')
+            for fts in self.fts_tables
+        ]
+
+    def condition(self) -> ColumnElement:
+        """Условие WHERE для поиска"""
+        if not self.tokens:
+            return self._substring_condition()
+
+        if self.dialect == 'postgresql':
+            return or_(search_vector.op('@@')(self._ts_query()), self._substring_condition())
+
+        if self.dialect == 'sqlite':
+            return or_(
+                *(self.tasks.id.in_(select(matches.c.id)) for matches in self._matches()),
+                self._substring_condition()
+            )
+
+        return self._substring_condition()
+
+    def rank(self) -> ColumnElement:
+        """Релевантность найденной задачи: чем больше, тем выше в выдаче"""
+        if not self.tokens:
+            return null()
+
+        if self.dialect == 'postgresql':
+            return (
+                func.ts_rank(search_vector, self._ts_query())
+                + func.similarity(func.lower(self.tasks.title), self.query)
+            )
+
+        if self.dialect == 'sqlite':
+            # bm25() возвращает отрицательные значения, лучшие совпадения - наименьшие
+            bm25 = [
+                select(matches.c.rank).where(matches.c.id == self.tasks.id).scalar_subquery()
+                for matches in self._matches()
+            ]
+            return -func.coalesce(*bm25, 0)
+
+        return null()
@@ -1,89 +1,161 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import AsyncIterator, List, Mapping, Optional, Dict, Any, Tuple, Union
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, insert, update, delete, null, func, or_, and_, tuple_, case, literal, union_all, type_coerce, Integer, String, Select, FromClause
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+import json
 import logging
-import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
+from types import SimpleNamespace
 
-from backend.db.models import Task, DurationSetting, TaskTypeSetting, StatusSetting, PrioritySetting
+import pytz
+
+from backend.db.models import Task, User, DurationSetting, TaskTypeSetting, StatusSetting, PrioritySetting
+from backend.models.status import Status
+from backend.models.task_filter import TaskFilter, overdue_predicate
 from backend.services.auth_service import AuthService
+from backend.services.data_version import bump_data_version
+from backend.services.global_settings import (
+    MAX_TASKS_PER_USER, GlobalConfig, LimitExceededError, get_global_settings, normalize_reminders
+)
+from backend.services.settings_service import SettingsService
+from backend.services.task_archive import TaskArchiveService, task_source
+from backend.services.task_cursor import encode_cursor, decode_cursor
+from backend.services.task_search import TaskSearch
+from backend.services.task_stats import TASK_STAT_COLUMNS, TaskStatsService, stat_count, task_stat_keys
 
 logger = logging.getLogger(__name__)
 
+# Начиная с этого количества задач get_task_count(approximate=True) возвращает
+# оценку планировщика: точный COUNT по большому набору дороже, чем сама страница
+APPROXIMATE_COUNT_THRESHOLD = 10000
+
+# Размер части при потоковом чтении задач (stream_tasks)
+EXPORT_CHUNK_SIZE = 500
+
+# Операции пакетного изменения задач (apply_batch) и их максимальное количество в одном пакете
+BATCH_OPERATIONS = ('create', 'update', 'delete')
+MAX_BATCH_SIZE = 200
+
+# Фасеты (get_facets): поле фильтра -> ключ ответа со списком {'id', 'count'}
+FACET_FIELDS = {
+    'status_id': 'by_status',
+    'priority_id': 'by_priority',
+    'type_id': 'by_type',
+    'duration_id': 'by_duration',
+}
+
+# Фильтр задач: TaskFilter или словарь с теми же ключами (dialog_data бота, внутренние вызовы)
+TaskFilterArg = Union[TaskFilter, Dict[str, Any], None]
+
+
+def task_list_columns(tasks: FromClause = Task.__table__) -> Tuple[Any, ...]:
+    """Колонки списков задач: только поля ответа, без JSON-колонок и ORM-объектов"""
+    columns = tasks.c
+    return (
+        columns.id,
+        columns.title,
+        columns.description,
+        columns.deadline,
+        columns.created_at,
+        columns.completed_at,
+        TaskTypeSetting.id.label('type_id'),
+        TaskTypeSetting.name.label('type_name'),
+        TaskTypeSetting.color.label('type_color'),
+        StatusSetting.id.label('status_id'),
+        StatusSetting.name.label('status_name'),
+        StatusSetting.color.label('status_color'),
+        StatusSetting.order.label('status_order'),
+        PrioritySetting.id.label('priority_id'),
+        PrioritySetting.name.label('priority_name'),
+        PrioritySetting.color.label('priority_color'),
+        PrioritySetting.order.label('priority_order'),
+        DurationSetting.id.label('duration_id'),
+        DurationSetting.name.label('duration_name'),
+        DurationSetting.duration_type.label('duration_type'),
+        DurationSetting.value.label('duration_value'),
+    )
+
+
+# Колонки задачи в INSERT/UPDATE ... RETURNING, из которых собирается ответ (_task_row_dict)
+TASK_RETURNING_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.deadline,
+    Task.created_at,
+    Task.completed_at,
+    Task.type_id,
+    Task.status_id,
+    Task.priority_id,
+    Task.duration_id,
+)
+
 class TaskService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.auth_service = AuthService(session)
+        self.stats = TaskStatsService(session)
 
     async def get_tasks(
         self,
         user_id: str,
-        filters: Optional[Dict[str, Any]] = None
+        filters: TaskFilterArg = None
     ) -> list[Any] | tuple[Any]:
         """Получить список задач пользователя с фильтрами"""
         user = await self.auth_service.get_user_by_id(user_id)
         if not user:
             return []
 
-        query = select(Task).where(Task.user_id == user.telegram_id) # type: ignore
-
-        if filters:
-            if filters.get('id'):
-                query = query.where(Task.id == int(filters['id']))
-            if filters.get('status_id'):
-                query = query.where(Task.status_id == int(filters['status_id']))
-            if filters.get('priority_id'):
-                query = query.where(Task.priority_id == int(filters['priority_id']))
-            if filters.get('duration_id'):
-                query = query.where(Task.duration_id == int(filters['duration_id']))
-            if filters.get('type_id'):
-                query = query.where(Task.type_id == int(filters['type_id']))
-            
-            # Фильтрация по завершенным/незавершенным задачам
-            if 'is_completed' in filters:
-                if filters['is_completed'] is False:
-                    # Показываем только незавершенные задачи (completed_at is NULL)
-                    query = query.where(Task.completed_at == None)
-                elif filters['is_completed'] is True:
-                    # Показываем только завершенные задачи (completed_at is NOT NULL)
-                    query = query.where(Task.completed_at != None)
-            
-            # Добавляем фильтрацию по дедлайну
-            deadline_conditions = []
-            if filters.get('deadline_from'):
-                deadline_from = datetime.strptime(filters['deadline_from'], '%Y-%m-%d')
-                # Устанавливаем время на начало дня (00:00:00)
-                deadline_from = deadline_from.replace(hour=0, minute=0, second=0, microsecond=0)
-                deadline_conditions.append(Task.deadline >= deadline_from)
-            if filters.get('deadline_to'):
-                deadline_to = datetime.strptime(filters['deadline_to'], '%Y-%m-%d')
-                # Устанавливаем время на конец дня (23:59:59)
-                deadline_to = deadline_to.replace(hour=23, minute=59, second=59, microsecond=999999)
-                deadline_conditions.append(Task.deadline <= deadline_to)
-            if deadline_conditions:
-                query = query.where(and_(*deadline_conditions))
-
-        query = query.options(
-            selectinload(Task.status),
-            selectinload(Task.priority),
-            selectinload(Task.duration),
-            selectinload(Task.type)
-        )
+        now = self._now(user)
+        conditions, _, tasks = self._list_conditions(user, filters, now=now)
+        query = self._list_query(tasks=tasks, now=now).where(*conditions)
 
         result = await self.session.execute(query)
-        tasks = result.scalars().all()
+        return self._rows_to_dicts(result.all())
+
+    async def stream_tasks(
+        self,
+        user_id: str,
+        filters: TaskFilterArg = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Получить задачи пользователя частями по мере чтения из базы
 
-        # Используем asyncio.gather для параллельного выполнения
-        return await asyncio.gather(*[self._task_to_dict(task) for task in tasks])
+        Строки читаются серверным курсором (yield_per), поэтому в памяти
+        одновременно находится не больше chunk_size задач.
+
+        Args:
+            user_id: ID пользователя
+            filters: TaskFilter или словарь с фильтрами (как в get_tasks)
+            chunk_size: Количество задач в одной части
+
+        Yields:
+            List[Dict[str, Any]]: Очередная часть задач, упорядоченных по id
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return
+
+        now = self._now(user)
+        conditions, _, tasks = self._list_conditions(user, filters, now=now)
+        query = self._list_query(tasks=tasks, now=now).where(*conditions).order_by(tasks.c.id) \
+            .execution_options(yield_per=chunk_size)
+
+        result = await self.session.stream(query)
+        try:
+            async for rows in result.partitions():
+                yield self._rows_to_dicts(rows)
+        finally:
+            await result.close()
 
     async def get_tasks_paginated(
         self,
         user_id: str,
         page: int = 1,
         page_size: int = 10,
-        filters: Optional[Dict[str, Any]] = None,
+        filters: TaskFilterArg = None,
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
         search_query: Optional[str] = None
@@ -95,8 +167,8 @@ class TaskService:
             user_id: ID пользователя
             page: Номер страницы (начиная с 1)
             page_size: Количество задач на странице
-            filters: Словарь с фильтрами (status_id, priority_id, duration_id, type_id)
-            sort_by: Поле для сортировки (title, deadline, priority, status)
+            filters: TaskFilter или словарь с фильтрами (status_id, priority_id, duration_id, type_id, ...)
+            sort_by: Поле для сортировки (title, deadline, priority, status, overdue, created_at)
             sort_order: Порядок сортировки (asc, desc)
             search_query: Строка для поиска в названии и описании задачи
             
@@ -106,69 +178,60 @@ class TaskService:
         user = await self.auth_service.get_user_by_id(user_id)
         if not user:
             return [], 0
-            
-        # Получаем все задачи с фильтрами
-        all_tasks = await self.get_tasks(user_id, filters)
-        
-        # Применяем поиск, если указан
-        if search_query and search_query.strip():
-            search_query = search_query.lower()
-            filtered_tasks = []
-            for task in all_tasks:
-                title = task['title'].lower()
-                description = task['description'].lower() if task['description'] else ""
-                
-                if search_query in title or search_query in description:
-                    filtered_tasks.append(task)
-            all_tasks = filtered_tasks
-        
-        # Применяем сортировку, если указана
-        if sort_by:
-            reverse = sort_order.lower() == "desc"
-            
-            if sort_by == "title":
-                all_tasks.sort(key=lambda x: x['title'].lower(), reverse=reverse)
-            elif sort_by == "deadline":
-                # Сортируем по дедлайну, задачи без дедлайна в конце
-                all_tasks.sort(
-                    key=lambda x: (x['deadline'] is None, x['deadline']), 
-                    reverse=reverse
-                )
-            elif sort_by == "priority":
-                # Сортируем по приоритету, задачи без приоритета в конце
-                all_tasks.sort(
-                    key=lambda x: (
-                        x['priority'] is None, 
-                        -x['priority']['order'] if x['priority'] else 0
-                    ), 
-                    reverse=reverse
-                )
-            elif sort_by == "status":
-                # Сортируем по статусу, задачи без статуса в конце
-                all_tasks.sort(
-                    key=lambda x: (
-                        x['status'] is None, 
-                        x['status']['order'] if x['status'] else 0
-                    ), 
-                    reverse=reverse
-                )
-        
-        # Получаем общее количество задач
-        total_tasks = len(all_tasks)
-        
+
+        now = self._now(user)
+
+        # Получаем общее количество задач отдельным COUNT-запросом
+        total_tasks = await self.count_user_tasks(user, filters, search_query, now)
+
         # Вычисляем смещение для пагинации
         offset = (page - 1) * page_size
-        
-        # Получаем задачи для текущей страницы
-        paginated_tasks = all_tasks[offset:offset + page_size] if offset < total_tasks else []
-        
-        return paginated_tasks, total_tasks
-        
+        if page < 1 or offset >= total_tasks:
+            return [], total_tasks
+
+        tasks = await self.get_user_tasks_page(user, offset, page_size, filters, sort_by, sort_order, search_query, now)
+        return tasks, total_tasks
+
+    async def count_user_tasks(
+        self,
+        user: User,
+        filters: TaskFilterArg = None,
+        search_query: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> int:
+        """Количество задач уже загруженного пользователя для списка с пагинацией (COUNT-запрос)"""
+        conditions, _, tasks = self._list_conditions(user, filters, search_query, now or self._now(user))
+        return await self._count(conditions, tasks)
+
+    async def get_user_tasks_page(
+        self,
+        user: User,
+        offset: int,
+        limit: int,
+        filters: TaskFilterArg = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        search_query: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Страница списка задач уже загруженного пользователя
+
+        Не зависит от count_user_tasks: оба запроса можно выполнять одновременно
+        в разных сессиях (см. BootstrapService).
+        """
+        now = now or self._now(user)
+        conditions, search, tasks = self._list_conditions(user, filters, search_query, now)
+        query = self._page_query(conditions, tasks, sort_by, sort_order, search, offset, limit, now)
+
+        result = await self.session.execute(query)
+        return self._rows_to_dicts(result.all())
+
     async def search_tasks(
         self,
         user_id: str,
         search_query: str,
-        filters: Optional[Dict[str, Any]] = None
+        filters: TaskFilterArg = None
     ) -> List[Dict[str, Any]]:
         """
         Поиск задач по названию и описанию
@@ -176,247 +239,474 @@ class TaskService:
         Args:
             user_id: ID пользователя
             search_query: Строка для поиска
-            filters: Словарь с фильтрами (status_id, priority_id, duration_id, type_id)
+            filters: TaskFilter или словарь с фильтрами (status_id, priority_id, duration_id, type_id, ...)
             
         Returns:
-            List[Dict[str, Any]]: Список найденных задач
+            List[Dict[str, Any]]: Список найденных задач, упорядоченный по релевантности
         """
         if not search_query.strip():
             return []
-            
-        # Получаем все задачи с фильтрами
-        all_tasks = await self.get_tasks(user_id, filters)
-        
-        # Применяем поиск
-        search_query = search_query.lower()
-        found_tasks = []
-        
-        for task in all_tasks:
-            title = task['title'].lower()
-            description = task['description'].lower() if task['description'] else ""
-            
-            if search_query in title or search_query in description:
-                found_tasks.append(task)
-                
-        return found_tasks
-        
+
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return []
+
+        now = self._now(user)
+        conditions, search, tasks = self._list_conditions(user, filters, search_query, now)
+        query = self._list_query(tasks=tasks, now=now).where(*conditions).order_by(search.rank().desc(), tasks.c.id)
+
+        result = await self.session.execute(query)
+        return self._rows_to_dicts(result.all())
+
     async def get_task_count(
         self,
         user_id: str,
-        filters: Optional[Dict[str, Any]] = None,
-        search_query: Optional[str] = None
+        filters: TaskFilterArg = None,
+        search_query: Optional[str] = None,
+        approximate: bool = False
     ) -> int:
         """
         Получить общее количество задач пользователя с учетом фильтров и поиска
         
         Args:
             user_id: ID пользователя
-            filters: Словарь с фильтрами (status_id, priority_id, duration_id, type_id)
+            filters: TaskFilter или словарь с фильтрами (status_id, priority_id, duration_id, type_id, ...)
             search_query: Строка для поиска в названии и описании задачи
+            approximate: Разрешить оценку планировщика PostgreSQL вместо точного
+                подсчета, если задач больше APPROXIMATE_COUNT_THRESHOLD
             
         Returns:
             int: Общее количество задач
         """
-        # Если есть поисковый запрос, используем метод search_tasks
-        if search_query and search_query.strip():
-            tasks = await self.search_tasks(user_id, search_query, filters)
-            return len(tasks)
-            
-        # Иначе получаем количество задач с фильтрами
         user = await self.auth_service.get_user_by_id(user_id)
         if not user:
             return 0
-            
-        query = select(func.count()).select_from(Task).where(Task.user_id == user.telegram_id) # type: ignore
-        
-        if filters:
-            if filters.get('status_id'):
-                query = query.where(Task.status_id == int(filters['status_id']))
-            if filters.get('priority_id'):
-                query = query.where(Task.priority_id == int(filters['priority_id']))
-            if filters.get('duration_id'):
-                query = query.where(Task.duration_id == int(filters['duration_id']))
-            if filters.get('type_id'):
-                query = query.where(Task.type_id == int(filters['type_id']))
-            
-            # Фильтрация по завершенным/незавершенным задачам
-            if 'is_completed' in filters:
-                if filters['is_completed'] is False:
-                    # Показываем только незавершенные задачи (completed_at is NULL)
-                    query = query.where(Task.completed_at == None)
-                elif filters['is_completed'] is True:
-                    # Показываем только завершенные задачи (completed_at is NOT NULL)
-                    query = query.where(Task.completed_at != None)
-            
-            # Добавляем фильтрацию по дедлайну
-            deadline_conditions = []
-            if filters.get('deadline_from'):
-                deadline_from = datetime.strptime(filters['deadline_from'], '%Y-%m-%d')
-                # Устанавливаем время на начало дня (00:00:00)
-                deadline_from = deadline_from.replace(hour=0, minute=0, second=0, microsecond=0)
-                deadline_conditions.append(Task.deadline >= deadline_from)
-            if filters.get('deadline_to'):
-                deadline_to = datetime.strptime(filters['deadline_to'], '%Y-%m-%d')
-                # Устанавливаем время на конец дня (23:59:59)
-                deadline_to = deadline_to.replace(hour=23, minute=59, second=59, microsecond=999999)
-                deadline_conditions.append(Task.deadline <= deadline_to)
-            if deadline_conditions:
-                query = query.where(and_(*deadline_conditions))
-                
+
+        if search_query is None or not search_query.strip():
+            # Фильтр без поиска по одному полю - из счетчиков user_task_stats
+            count = await self.stats.count_for_filter(user.telegram_id, TaskFilter.from_dict(filters))
+            if count is not None:
+                return count
+
+        conditions, _, tasks = self._list_conditions(user, filters, search_query)
+
+        if approximate:
+            estimate = await self._estimate_count(conditions, tasks)
+            if estimate is not None and estimate >= APPROXIMATE_COUNT_THRESHOLD:
+                return estimate
+
+        return await self._count(conditions, tasks)
+
+    async def get_facets(
+        self,
+        user_id: str,
+        filters: TaskFilterArg = None,
+        search_query: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Количество задач по значениям статуса, приоритета, типа, продолжительности и завершенности
+
+        Для каждого поля применяются все фильтры, кроме фильтра по самому полю:
+        счетчик значения - количество задач в списке, если выбрать это значение.
+        Все группировки выполняются одним запросом (UNION ALL). Завершенность
+        считается вместе с архивом: выбор завершенных задач включает архив.
+
+        Returns:
+            Optional[Dict[str, Any]]: {'by_status', 'by_priority', 'by_type', 'by_duration',
+            'open', 'completed'}, где by_* - список {'id', 'count'} (id = None - настройка
+            не задана); None, если пользователь не найден
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        task_filter = TaskFilter.from_dict(filters)
+        now = self._now(user)
+
+        def facet(field, value_of, **update):
+            conditions, _, tasks = self._list_conditions(
+                user, task_filter.model_copy(update={field: None, **update}), search_query, now
+            )
+            value = value_of(tasks.c)
+            return select(
+                literal(field, String).label('field'), value.label('value'), func.count().label('task_count')
+            ).select_from(tasks).where(*conditions).group_by(value)
+
+        query = union_all(
+            *(facet(field, lambda columns, field=field: columns[field]) for field in FACET_FIELDS),
+            facet('is_completed', lambda columns: case((columns.completed_at.is_(None), 0), else_=1).cast(Integer),
+                  include_archived=True),
+        )
         result = await self.session.execute(query)
-        count = result.scalar()
-        
-        return count or 0
+
+        facets: Dict[str, Any] = {key: [] for key in FACET_FIELDS.values()}
+        facets.update(open=0, completed=0)
+        for field, value, task_count in result.all():
+            if field == 'is_completed':
+                facets['completed' if value else 'open'] = task_count
+            else:
+                facets[FACET_FIELDS[field]].append({'id': value, 'count': task_count})
+        return facets
+
+    async def get_task_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Статистика задач пользователя из счетчиков user_task_stats (см. TaskStatsService.get_stats)"""
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+        return await self.stats.get_stats(user)
+
+    async def _count(self, conditions: List[Any], tasks: FromClause) -> int:
+        """Точное количество задач, удовлетворяющих условиям"""
+        query = select(func.count()).select_from(tasks).where(*conditions)
+        result = await self.session.execute(query)
+        return result.scalar() or 0
+
+    async def _estimate_count(self, conditions: List[Any], tasks: FromClause) -> Optional[int]:
+        """
+        Оценка количества задач по плану запроса (только PostgreSQL)
+
+        Returns:
+            Optional[int]: Оценка планировщика или None, если оценка недоступна
+        """
+        if self.session.bind.dialect.name != 'postgresql':
+            return None
+
+        connection = await self.session.connection()
+        compiled = select(tasks.c.id).where(*conditions).compile(dialect=connection.dialect)
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+        try:
+            result = await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.warning(f"Не удалось оценить количество задач: {e}")
+            return None
+
+    def _list_conditions(
+        self,
+        user,
+        filters: TaskFilterArg = None,
+        search_query: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> Tuple[List[Any], Optional[TaskSearch], FromClause]:
+        """
+        Условия WHERE для списка задач с учетом фильтров и поиска (общие для списков и подсчета)
+
+        Поисковый запрос берется из search_query, а если он не передан - из фильтра.
+        now - время, с которым сравнивается дедлайн в фильтре по просрочке
+        (то же, что и в колонке is_overdue запроса).
+
+        Returns:
+            Условия, поиск (None без поискового запроса) и таблица задач, к колонкам
+            которой относятся условия: tasks или tasks вместе с архивом (task_source)
+        """
+        task_filter = TaskFilter.from_dict(filters)
+        tasks = task_source(self.session.bind.dialect.name, task_filter)
+        conditions = [task_filter.condition(user.telegram_id, tasks, now=now or self._now(user))]
+        if search_query is None:
+            search_query = task_filter.search
+        search = None
+        if search_query and search_query.strip():
+            search = TaskSearch(self.session, search_query, tasks)
+            conditions.append(search.condition())
+        return conditions, search, tasks
+
+    def _sort_key(
+        self,
+        query: Select,
+        tasks: FromClause,
+        sort_by: Optional[str],
+        sort_order: Optional[str],
+        now: datetime
+    ):
+        """
+        Ключ сортировки задач (настройки уже присоединены в _list_query)
+
+        Returns:
+            Запрос, выражение ключа, признак сортировки ключа по убыванию
+            и признак NULL в конце (None, если ключ не может быть NULL).
+            Выражение ключа равно None, если задачи упорядочены только по id.
+        """
+        descending = (sort_order or "asc").lower() == "desc"
+
+        if sort_by == "title":
+            title = func.lower(tasks.c.title)
+            if self.session.bind.dialect.name == 'postgresql':
+                # Побайтовое сравнение UTF-8 совпадает с порядком строк в Python
+                title = title.collate('C')
+            return query, title, descending, None
+        if sort_by == "deadline":
+            return query, tasks.c.deadline, descending, not descending
+        if sort_by == "created_at":
+            created_at = tasks.c.created_at
+            if self.session.bind.dialect.name == 'sqlite':
+                # SQLite хранит CURRENT_TIMESTAMP без микросекунд, а datetime из курсора
+                # передается с ними: ключ сравнивается строкой в том виде, в каком хранится
+                created_at = type_coerce(created_at, String)
+            return query, created_at, descending, not descending
+        if sort_by == "priority":
+            # Задачи с большим значением order идут первыми, задачи без приоритета в конце
+            return query, PrioritySetting.order, not descending, not descending
+        if sort_by == "status":
+            return query, StatusSetting.order, descending, not descending
+        if sort_by == "overdue":
+            # По возрастанию просроченные задачи идут первыми
+            return query, case((overdue_predicate(tasks).params(now=now), 0), else_=1), descending, None
+
+        return query, None, descending, None
+
+    def _page_query(
+        self,
+        conditions: List[Any],
+        tasks: FromClause,
+        sort_by: Optional[str],
+        sort_order: Optional[str],
+        search: Optional[TaskSearch],
+        offset: int,
+        limit: int,
+        now: datetime
+    ) -> Select:
+        """
+        Запрос страницы списка задач с OFFSET/LIMIT
+
+        Сначала подзапрос выбирает id задач страницы и ключ сортировки (из
+        настроек в нем читается только та, по которой идет сортировка), затем
+        колонки списка и настройки присоединяются только для задач страницы.
+
+        Порядок совпадает с прежней сортировкой в Python: задачи без значения
+        поля идут в конце при сортировке по возрастанию и в начале при сортировке
+        по убыванию, при равенстве ключей задачи упорядочены по id.
+        Без явной сортировки результаты поиска упорядочены по релевантности.
+        """
+        ids_query, key, key_descending, nulls_last = self._sort_key(
+            self._list_query(tasks.c.id, tasks=tasks).where(*conditions), tasks, sort_by, sort_order, now
+        )
+        if key is None and search is not None:
+            key, key_descending, nulls_last = search.rank(), True, None
+
+        if key is not None:
+            ids_query = self._order_by_key(ids_query.add_columns(key.label('sort_key')), key, key_descending, nulls_last)
+        page = ids_query.order_by(tasks.c.id).offset(offset).limit(limit).subquery()
+
+        query = self._list_query(tasks=tasks, now=now).join(page, page.c.id == tasks.c.id)
+        if key is not None:
+            query = self._order_by_key(query, page.c.sort_key, key_descending, nulls_last)
+        return query.order_by(tasks.c.id)
+
+    @staticmethod
+    def _order_by_key(query: Select, key, key_descending: bool, nulls_last: Optional[bool]) -> Select:
+        """Добавить ORDER BY по ключу сортировки, сгруппировав задачи без значения ключа"""
+        if nulls_last is not None:
+            query = query.order_by(key.is_(None).asc() if nulls_last else key.is_(None).desc())
+        return query.order_by(key.desc() if key_descending else key.asc())
+
+    @staticmethod
+    def _seek_condition(tasks: FromClause, key, key_descending: bool, value: Any, last_id: int):
+        """
+        Условие WHERE для задач, идущих после позиции курсора внутри группы задач
+        с заполненным ключом (или после last_id, если ключа нет)
+
+        При сортировке ключа по возрастанию используется сравнение кортежей
+        (key, id) > (value, last_id), которое обслуживается индексом по (key, id).
+        """
+        task_id = tasks.c.id
+        if key is None:
+            return task_id > last_id
+        if key_descending:
+            # id всегда по возрастанию, поэтому сравнение кортежей неприменимо;
+            # key <= value ограничивает диапазон сканирования индекса
+            return and_(key <= value, or_(key < value, task_id > last_id))
+        return tuple_(key, task_id) > tuple_(value, last_id)
+
+    async def get_tasks_by_cursor(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        filters: TaskFilterArg = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        search_query: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Получить страницу задач пользователя по курсору (keyset-пагинация)
+
+        В отличие от get_tasks_paginated, глубина страницы не влияет на скорость,
+        а изменение задач между запросами не приводит к пропускам и повторам.
+        Порядок задач тот же, что и в get_tasks_paginated, кроме поиска без явной
+        сортировки: релевантность не является стабильным ключом, поэтому задачи
+        упорядочены по id.
+
+        Args:
+            user_id: ID пользователя
+            cursor: Курсор из предыдущего ответа (None - первая страница)
+            limit: Количество задач на странице
+            filters: TaskFilter или словарь с фильтрами (status_id, priority_id, duration_id, type_id, ...)
+            sort_by: Поле для сортировки (title, deadline, priority, status, overdue, created_at)
+            sort_order: Порядок сортировки (asc, desc)
+            search_query: Строка для поиска в названии и описании задачи
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: Список задач и курсор следующей
+            страницы (None, если страница последняя)
+
+        Raises:
+            InvalidCursorError: если курсор поврежден или построен для другой сортировки
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return [], None
+
+        sort_order = (sort_order or "asc").lower()
+        now = self._now(user)
+        conditions, _, tasks = self._list_conditions(user, filters, search_query, now)
+
+        query, key, key_descending, nulls_last = self._sort_key(
+            self._list_query(tasks=tasks, now=now), tasks, sort_by, sort_order, now
+        )
+        if key is not None:
+            # Значение ключа берем из БД, чтобы курсор совпадал с порядком сортировки в SQL
+            query = query.add_columns(key.label('sort_key'))
+
+        query = query.where(*conditions)
+
+        # Задачи без значения ключа читаются отдельным запросом: так каждый запрос
+        # упорядочен только по (key, id) или по id и может идти по индексу без сортировки
+        if key is None or nulls_last is None:
+            groups = [False]
+        else:
+            groups = [False, True] if nulls_last else [True, False]
+
+        value, last_id = None, None
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort_by, sort_order)
+            groups = groups[groups.index(key is not None and value is None):]
+
+        rows = []
+        for null_group in groups:
+            group_query = query
+            if nulls_last is not None:
+                group_query = group_query.where(key.is_(None) if null_group else key.is_not(None))
+            if last_id is not None:
+                group_query = group_query.where(
+                    self._seek_condition(tasks, None if null_group else key, key_descending, value, last_id)
+                )
+                # Следующие группы читаются с начала
+                last_id = None
+            if key is not None and not null_group:
+                group_query = group_query.order_by(key.desc() if key_descending else key.asc())
+            group_query = group_query.order_by(tasks.c.id).limit(limit + 1 - len(rows))
+
+            rows += (await self.session.execute(group_query)).all()
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(sort_by, sort_order, last.sort_key if key is not None else None, last.id)
+
+        return self._rows_to_dicts(rows), next_cursor
 
     async def create_task(
         self,
         user_id: str,
         task_data: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
-        try:
-            """Создать новую задачу"""
-            logger.debug(f"Creating task for user {user_id} with data: {task_data}")
+        """
+        Создать новую задачу
 
-            user = await self.auth_service.get_user_by_id(user_id)
-            if not user:
-                logger.error(f"User {user_id} not found")
-                return None
+        Raises:
+            ValueError: 'Invalid <поле>', если настройка не принадлежит пользователю
+                или значение поля не разбирается (_task_input)
+            LimitExceededError: если у пользователя уже max_tasks_per_user задач
+                или напоминаний больше max_reminders_per_task
+        """
+        logger.debug(f"Creating task for user {user_id} with data: {task_data}")
 
-            # Проверяем наличие обязательного поля title
-            if 'title' not in task_data:
-                task_data['title'] = "Новая задача"  # Устанавливаем значение по умолчанию только если поле отсутствует
-                logger.debug("Title not provided, using default: 'Новая задача'")
-            elif not task_data['title']:  # Если поле есть, но пустое
-                task_data['title'] = "Новая задача"
-                logger.debug("Title is empty, using default: 'Новая задача'")
-
-            # Проверяем, принадлежит ли тип задачи пользователю
-            if task_data.get('type_id'):
-                logger.debug(f"Checking if type_id {task_data['type_id']} belongs to user {user_id}")
-                type_query = select(TaskTypeSetting).where(
-                    TaskTypeSetting.id == int(task_data['type_id']), # type: ignore
-                    TaskTypeSetting.user_id == user.telegram_id # type: ignore
-                )
-                type_result = await self.session.execute(type_query)
-                if not type_result.scalar_one_or_none():
-                    logger.error(f"Type {task_data['type_id']} does not belong to user {user_id}")
-                    return None
-                logger.debug(f"Type {task_data['type_id']} belongs to user {user_id}")
-
-            # Получаем настройки по умолчанию, если они не указаны
-            if not task_data.get('status_id'):
-                status_query = select(StatusSetting).where(
-                    StatusSetting.user_id == user.telegram_id, # type: ignore
-                    StatusSetting.is_default == True
-                )
-                status_result = await self.session.execute(status_query)
-                status = status_result.scalar_one_or_none()
-                if status:
-                    task_data['status_id'] = status.id
-                    logger.debug(f"Using default status with ID: {status.id}")
-                else:
-                    logger.debug("No default status found")
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            logger.error(f"User {user_id} not found")
+            return None
 
-            if not task_data.get('priority_id'):
-                priority_query = select(PrioritySetting).where(
-                    PrioritySetting.user_id == user.telegram_id, # type: ignore
-                    PrioritySetting.is_default == True
-                )
-                priority_result = await self.session.execute(priority_query)
-                priority = priority_result.scalar_one_or_none()
-                if priority:
-                    task_data['priority_id'] = priority.id
-                    logger.debug(f"Using default priority with ID: {priority.id}")
-                else:
-                    logger.debug("No default priority found")
+        settings = await self.get_settings_by_field(user)
+        config = await get_global_settings(self.session)
+        # Настройки проверяются по кэшу настроек пользователя, как в apply_batch
+        task_data = self._task_input(task_data, settings, config)
 
-            if not task_data.get('type_id'):
-                type_query = select(TaskTypeSetting).where(
-                    TaskTypeSetting.user_id == user.telegram_id, # type: ignore
-                    TaskTypeSetting.is_default == True
-                )
-                type_result = await self.session.execute(type_query)
-                task_type = type_result.scalar_one_or_none()
-                if task_type:
-                    task_data['type_id'] = task_type.id
-
-            if not task_data.get('duration_id'):
-                type_query = select(DurationSetting).where(
-                    DurationSetting.user_id == user.telegram_id, # type: ignore
-                    DurationSetting.is_default == True
-                )
-                type_result = await self.session.execute(type_query)
-                task_duration = type_result.scalar_one_or_none()
-                if task_duration:
-                    task_data['duration_id'] = task_duration.id
-
-            # Обрабатываем deadline, если он пришел в строковом формате
-            deadline = task_data.get('deadline')
-            if isinstance(deadline, str):
-                try:
-                    # Сначала пробуем ISO формат
-                    try:
-                        deadline = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                        logger.debug(f"Converted ISO deadline string to datetime: {deadline}")
-                    except ValueError:
-                        # Пробуем формат '01.04.2025 11:18'
-                        if ' ' in deadline:
-                            # Есть дата и время в формате ДД.ММ.ГГГГ ЧЧ:ММ
-                            deadline = datetime.strptime(deadline, '%d.%m.%Y %H:%M')
-                        else:
-                            # Только дата в формате ДД.ММ.ГГГГ
-                            deadline = datetime.strptime(deadline, '%d.%m.%Y')
-                        logger.debug(f"Converted localized deadline string to datetime: {deadline}")
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error converting deadline: {e}, value: {deadline}, type: {type(deadline)}")
-                    # Сохраняем None в случае ошибки конвертации
-                    deadline = None
-                task_data['deadline'] = deadline
-                logger.debug(f"Manually updating deadline to: {task_data['deadline']}, type: {type(task_data['deadline']) if task_data['deadline'] else None}")
-
-            task = Task(
-                user_id=user.telegram_id,
-                title=task_data['title'],
-                description=task_data.get('description'),
-                type_id=int(task_data.get('type_id')),
-                priority_id=int(task_data.get('priority_id')),
-                duration_id=int(task_data.get('duration_id')),
-                deadline=task_data.get('deadline')
-            )
-            logger.debug(f"Created task object: {task}")
-
-            # Устанавливаем статус и проверяем, является ли он финальным
-            if task_data.get('status_id'):
-                status_query = select(StatusSetting).where(StatusSetting.id == int(task_data['status_id'])) # type: ignore
-                status_result = await self.session.execute(status_query)
-                status = status_result.scalar_one_or_none()
-                if status:
-                    task.change_status(status)
-                else:
-                    task.status_id = task_data.get('status_id')
-
-            if task.duration_id and not task.deadline:
-                logger.debug(f"Task has duration_id {task.duration_id}, calculating deadline")
-                duration = await self.session.get(DurationSetting, int(task.duration_id))
-                if duration:
-                    task.deadline = await duration.calculate_deadline_async(self.session)
-                    logger.debug(f"Calculated deadline: {task.deadline}")
-                else:
-                    logger.warning(f"Duration {task.duration_id} not found")
-            elif task.deadline:
-                logger.debug(f"Using manually set deadline: {task.deadline}")
+        # Пустое название заменяется значением по умолчанию
+        if not task_data.get('title'):
+            task_data['title'] = "Новая задача"
+            logger.debug("Title not provided, using default: 'Новая задача'")
 
-            logger.debug("Adding task to session")
-            self.session.add(task)
-            logger.debug("Committing session")
-            await self.session.commit()
-            logger.debug("Refreshing task")
-            await self.session.refresh(task)
-            logger.debug(f"Task created with ID: {task.id}")
+        # Получаем настройки по умолчанию, если они не указаны
+        for field, owned in settings.items():
+            if not task_data.get(field):
+                default = next((setting for setting in owned.values() if setting.is_default), None)
+                task_data[field] = default.id if default else None
+                logger.debug(f"Using default {field}: {task_data[field]}")
 
-            return await self._task_to_dict(task)
-        except Exception as e:
+        values = {
+            'user_id': user.telegram_id,
+            'title': task_data['title'],
+            'description': task_data.get('description'),
+            'type_id': task_data['type_id'],
+            'priority_id': task_data['priority_id'],
+            'duration_id': task_data['duration_id'],
+            'status_id': task_data['status_id'],
+            'deadline': task_data.get('deadline'),
+            'reminders': task_data.get('reminders') or [],
+            'tags': [],
+            'custom_fields': {},
+        }
+
+        # Финальный статус сразу завершает задачу
+        now = self._now(user)
+        status = settings['status_id'].get(values['status_id'])
+        values['completed_at'] = now if status and status.is_final else None
+
+        if values['duration_id'] and not values['deadline']:
+            # Дедлайн по продолжительности, если он не задан вручную
+            values['deadline'] = settings['duration_id'][values['duration_id']].deadline_from(now)
+            logger.debug(f"Calculated deadline: {values['deadline']}")
+
+        try:
+            # Одна вставка: колонки, которые заполняет база, возвращаются RETURNING
+            result = await self.session.execute(self._limited_insert(user.telegram_id, values, config))
+            row = result.one_or_none()
+            if row is None:
+                logger.info(f"Task not created for user {user_id}: task limit reached")
+                raise LimitExceededError(MAX_TASKS_PER_USER, config.max_tasks_per_user)
+            self.stats.add(user.telegram_id, task_stat_keys(values))
+            await self.stats.flush()
+            await bump_data_version(self.session, [user.telegram_id])
+            await self.session.commit()
+        except SQLAlchemyError as e:
             logger.exception(f"Error creating task: {e}")
+            await self.session.rollback()
+            return None
+        logger.debug(f"Task created with ID: {row.id}")
+
+        return self._task_row_dict(row, settings, now)
+
+    @staticmethod
+    def _limited_insert(user_id: int, values: Dict[str, Any], config: GlobalConfig):
+        """
+        INSERT задачи ... RETURNING с проверкой max_tasks_per_user в том же запросе
+
+        Строка вставляется через SELECT с условием по счетчику total (user_task_stats),
+        поэтому при достигнутом ограничении запрос ничего не вставляет и не возвращает.
+        Отдельного COUNT нет, задачи в архиве не учитываются.
+        """
+        columns = Task.__table__.c
+        row = select(*(literal(value, columns[key].type) for key, value in values.items()))
+        limit = config.limit(MAX_TASKS_PER_USER)
+        if limit is not None:
+            row = row.where(stat_count(user_id) < limit)
+        return insert(Task).from_select(list(values), row).returning(*TASK_RETURNING_COLUMNS)
 
     async def update_task(
         self,
@@ -424,182 +714,583 @@ class TaskService:
         task_id: int,
         task_data: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
-        """Обновить задачу"""
+        """
+        Обновить задачу одним UPDATE ... RETURNING
+
+        Изменяются только переданные поля, принадлежность задачи пользователю
+        проверяется условием того же UPDATE. Ответ собирается из RETURNING
+        и кэша настроек без повторного чтения задачи. Задача из архива
+        возвращается в tasks и изменяется там.
+
+        Raises:
+            ValueError: 'Invalid <поле>', если настройка не принадлежит пользователю
+                или значение поля не разбирается (_task_input)
+            LimitExceededError: если напоминаний больше max_reminders_per_task
+        """
         user = await self.auth_service.get_user_by_id(user_id)
         if not user:
             return None
 
-        task = await self.session.get(Task, task_id)
-        if not task or task.user_id != user.telegram_id:
-            return None
+        settings = await self.get_settings_by_field(user)
+        task_data = self._task_input(task_data, settings, await get_global_settings(self.session))
 
-        # Проверяем, принадлежит ли тип задачи пользователю
-        if task_data.get('type_id'):
-            type_query = select(TaskTypeSetting).where(
-                TaskTypeSetting.id == int(task_data['type_id']), # type: ignore
-                TaskTypeSetting.user_id == user.telegram_id # type: ignore
-            )
-            type_result = await self.session.execute(type_query)
-            if not type_result.scalar_one_or_none():
+        now = self._now(user)
+        values = self._update_values(user, task_data, settings, now)
+        # Прежние значения нужны счетчикам, только если меняются их поля
+        track_stats = any(column.key in values for column in TASK_STAT_COLUMNS)
+        row, old_values = await self._update_returning(user.telegram_id, int(task_id), values, track_stats)
+        if row is None:
+            if not await TaskArchiveService(self.session).restore(user.telegram_id, [task_id]):
                 return None
+            row, old_values = await self._update_returning(user.telegram_id, int(task_id), values, track_stats)
 
-        if 'title' in task_data:
-            task.title = task_data['title']
-        if 'description' in task_data:
-            task.description = task_data['description']
-        if 'type_id' in task_data:
-            task.type_id = task_data['type_id']
-        if 'status_id' in task_data:
-            # Получаем новый статус
-            status_query = select(StatusSetting).where(StatusSetting.id == int(task_data['status_id'])) # type: ignore
-            status_result = await self.session.execute(status_query)
-            new_status = status_result.scalar_one_or_none()
-            
-            if new_status:
-                # Используем метод change_status для обновления статуса и completed_at
-                task.change_status(new_status)
-            else:
-                # Если статус не найден, просто обновляем status_id
-                task.status_id = task_data['status_id']
-        if 'priority_id' in task_data:
-            task.priority_id = task_data['priority_id']
+        if track_stats:
+            self.stats.remove(user.telegram_id, task_stat_keys(old_values))
+            self.stats.add(user.telegram_id, task_stat_keys(row._mapping))
+            await self.stats.flush()
+        await bump_data_version(self.session, [user.telegram_id])
+        await self.session.commit()
+
+        return self._task_row_dict(row, settings, now)
+
+    def _update_values(
+        self,
+        user: User,
+        task_data: Dict[str, Any],
+        settings: Dict[str, Dict[int, Any]],
+        now: datetime
+    ) -> Dict[str, Any]:
+        """
+        Значения SET для update_task: только переданные поля и их побочные эффекты
+
+        task_data уже проверены _task_input.
+
+        - status_id: completed_at вычисляется в запросе по статусу пользователя
+          (финальный - now, нефинальный - NULL, статус не найден - без изменений);
+        - duration_id без deadline: дедлайн по продолжительности от now. Месяцы и годы
+          считаются в часовом поясе пользователя (как в create_task), поэтому дедлайн
+          вычисляется по кэшу настроек, а не арифметикой дат в SQL.
+        """
+        values: Dict[str, Any] = {}
+        for field in ('title', 'description', 'type_id', 'priority_id', 'duration_id', 'status_id', 'reminders'):
+            if field in task_data:
+                values[field] = task_data[field]
+
+        if 'status_id' in values:
+            is_final = select(StatusSetting.is_final).where(
+                StatusSetting.id == values['status_id'],
+                StatusSetting.user_id == user.telegram_id
+            ).scalar_subquery()
+            values['completed_at'] = case(
+                {True: now, False: null()}, value=is_final, else_=Task.completed_at
+            )
         if 'completed_at' in task_data:
-            task.completed_at = task_data['completed_at']
+            values['completed_at'] = task_data['completed_at']
+
         if 'deadline' in task_data:
-            # Преобразуем строковое значение deadline в datetime
-            deadline_value = task_data['deadline']
-            if isinstance(deadline_value, str):
-                try:
-                    # Сначала пробуем ISO формат
-                    try:
-                        deadline_value = datetime.fromisoformat(deadline_value.replace('Z', '+00:00'))
-                        #deadline_value = deadline_value.replace(tzinfo=pytz.timezone(user.timezone))
-                        logger.debug(f"Converted ISO deadline string to datetime: {deadline_value}")
-                    except ValueError:
-                        # Пробуем формат '01.04.2025 11:18'
-                        if ' ' in deadline_value:
-                            # Есть дата и время в формате ДД.ММ.ГГГГ ЧЧ:ММ
-                            deadline_value = datetime.strptime(deadline_value, '%d.%m.%Y %H:%M')
-                            #deadline_value = deadline_value.replace(tzinfo=pytz.timezone(user.timezone))
-                        else:
-                            # Только дата в формате ДД.ММ.ГГГГ
-                            deadline_value = datetime.strptime(deadline_value, '%d.%m.%Y')
-                            #deadline_value = deadline_value.replace(tzinfo=pytz.timezone(user.timezone))
-                        logger.debug(f"Converted localized deadline string to datetime: {deadline_value}")
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error converting deadline: {e}, value: {deadline_value}, type: {type(deadline_value)}")
-                    # Сохраняем None в случае ошибки конвертации
-                    deadline_value = None
-            task.deadline = deadline_value
-            logger.debug(f"Manually updating deadline to: {task.deadline}, type: {type(task.deadline) if task.deadline else None}")
-        if 'duration_id' in task_data:
-            task.duration_id = task_data['duration_id']
+            values['deadline'] = task_data['deadline']
+            logger.debug(f"Manually updating deadline to: {values['deadline']}")
+        elif values.get('duration_id'):
             # Вычисляем дедлайн на основе продолжительности только если дедлайн не задан вручную
-            if task.duration_id and 'deadline' not in task_data:
-                duration = await self.session.get(DurationSetting, int(task.duration_id))
-                if duration:
-                    task.deadline = await duration.calculate_deadline_async(self.session)
-                    logger.debug(f"Calculated deadline based on duration: {task.deadline}")
-        self.session.add(task)
-        await self.session.commit()
-        await self.session.refresh(task)
+            duration = settings['duration_id'].get(values['duration_id'])
+            if duration:
+                values['deadline'] = duration.deadline_from(now)
+                logger.debug(f"Calculated deadline based on duration: {values['deadline']}")
+
+        if not values:
+            values['updated_at'] = func.now()
+        return values
+
+    async def _update_returning(
+        self,
+        user_id: int,
+        task_id: int,
+        values: Dict[str, Any],
+        with_old: bool
+    ) -> Tuple[Optional[Any], Optional[Mapping[str, Any]]]:
+        """
+        UPDATE задачи пользователя ... RETURNING TASK_RETURNING_COLUMNS
 
-        return await self._task_to_dict(task)
+        Args:
+            with_old: Вернуть и прежние значения TASK_STAT_COLUMNS (для счетчиков)
+
+        Returns:
+            Tuple: (строка RETURNING, прежние значения) или (None, None), если задачи нет
+        """
+        statement = update(Task).values(**values).execution_options(synchronize_session=False)
+        returning = list(TASK_RETURNING_COLUMNS)
+        old_values = None
+
+        if with_old and self.session.bind.dialect.name == 'postgresql':
+            # Прежние значения - из той же строки, заблокированной подзапросом до UPDATE
+            old = select(Task.id, *TASK_STAT_COLUMNS).where(
+                Task.id == task_id, Task.user_id == user_id
+            ).with_for_update().subquery('old')
+            statement = statement.where(Task.id == old.c.id)
+            returning += [old.c[column.key].label(f'old_{column.key}') for column in TASK_STAT_COLUMNS]
+        else:
+            statement = statement.where(Task.id == task_id, Task.user_id == user_id)
+            if with_old:
+                # В SQLite RETURNING не видит таблиц из FROM: прежние значения - отдельным запросом
+                result = await self.session.execute(
+                    select(*TASK_STAT_COLUMNS).where(Task.id == task_id, Task.user_id == user_id)
+                )
+                old_values = result.mappings().one_or_none()
+                if old_values is None:
+                    return None, None
+
+        result = await self.session.execute(statement.returning(*returning))
+        row = result.one_or_none()
+        if row is not None and with_old and old_values is None:
+            old_values = {column.key: row._mapping[f'old_{column.key}'] for column in TASK_STAT_COLUMNS}
+        return row, old_values
 
     async def delete_task(self, user_id: str, task_id: int) -> bool:
-        """Удалить задачу"""
+        """Удалить задачу (в том числе из архива)"""
         user = await self.auth_service.get_user_by_id(user_id)
         if not user:
             return False
 
         task = await self.session.get(Task, int(task_id))
         if not task or task.user_id != user.telegram_id:
-            return False
+            if not await TaskArchiveService(self.session).delete(user.telegram_id, [task_id]):
+                return False
+            await self.session.commit()
+            return True
 
+        self.stats.remove(user.telegram_id, task_stat_keys(task))
+        await self.stats.flush()
+        await bump_data_version(self.session, [user.telegram_id])
         await self.session.delete(task)
         await self.session.commit()
 
         return True
 
-    async def _task_to_dict(self, task: Task) -> Dict[str, Any]:
-        """Преобразовать задачу в словарь"""
-        logger.debug(f"Converting task {task.id} to dict")
-        logger.debug(f"Task duration_id: {task.duration_id}")
-        logger.debug(f"Task deadline: {task.deadline}")
-        
-        try:
-            # Загружаем связанные объекты заранее
-            if task.type_id:
-                type_query = select(TaskTypeSetting).where(TaskTypeSetting.id == int(task.type_id)) # type: ignore
-                type_result = await self.session.execute(type_query)
-                task_type = type_result.scalar_one_or_none()
-            else:
-                task_type = None
-                
-            if task.status_id:
-                status_query = select(StatusSetting).where(StatusSetting.id == int(task.status_id)) # type: ignore
-                status_result = await self.session.execute(status_query)
-                status = status_result.scalar_one_or_none()
-            else:
-                status = None
-                
-            if task.priority_id:
-                priority_query = select(PrioritySetting).where(PrioritySetting.id == int(task.priority_id)) # type: ignore
-                priority_result = await self.session.execute(priority_query)
-                priority = priority_result.scalar_one_or_none()
+    async def apply_batch(
+        self,
+        user_id: str,
+        operations: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Выполнить пакет операций над задачами в одной транзакции
+
+        Принадлежность задач и настроек пользователю проверяется общими
+        запросами на весь пакет, изменения сохраняются одним commit.
+        Операции, не прошедшие проверку, пропускаются, остальные выполняются.
+        Создание сверх max_tasks_per_user пропускается с ошибкой 'Task limit reached'
+        (удаление в том же пакете освобождает место для следующих созданий).
+
+        Args:
+            user_id: ID пользователя
+            operations: Операции в порядке выполнения:
+                {'op': 'create', 'data': {...}},
+                {'op': 'update', 'id': 1, 'data': {...}},
+                {'op': 'delete', 'id': 1}
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Результаты в порядке операций
+            ({'op', 'id', 'ok', 'task'} или {'op', 'id', 'ok': False, 'error'}),
+            None, если пользователь не найден
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        # Задачи пользователя, которые изменяются или удаляются в пакете, - одним запросом
+        task_ids = {
+            operation['id'] for operation in operations
+            if operation.get('op') in ('update', 'delete') and isinstance(operation.get('id'), int)
+        }
+        tasks: Dict[int, Task] = {}
+        if task_ids:
+            tasks = await self._user_tasks(user, task_ids)
+            # Задачи из архива возвращаются в tasks, как и в update_task
+            missing = task_ids - tasks.keys()
+            if missing and await TaskArchiveService(self.session).restore(user.telegram_id, missing):
+                tasks.update(await self._user_tasks(user, missing))
+        # Счетчики: задачи пакета исключаются в исходном виде и учитываются заново
+        # после всех операций (кроме удаленных)
+        for task in tasks.values():
+            self.stats.remove(user.telegram_id, task_stat_keys(task))
+        created: List[Task] = []
+
+        settings = await self.get_settings_by_field(user)
+        config = await get_global_settings(self.session)
+        now = self._now(user)
+
+        # Сколько задач еще можно создать: счетчик total читается один раз на пакет
+        capacity = config.limit(MAX_TASKS_PER_USER)
+        if capacity is not None and any(operation.get('op') == 'create' for operation in operations):
+            capacity -= await self.stats.count_for_filter(user.telegram_id, TaskFilter())
+
+        results: List[Dict[str, Any]] = []
+        # Пары (результат, задача) для созданных и измененных задач
+        saved: List[Tuple[Dict[str, Any], Task]] = []
+        deleted_ids = []
+        for operation in operations:
+            op = operation.get('op')
+            task_id = operation.get('id')
+            data = operation.get('data') or {}
+            item = {'op': op, 'id': task_id, 'ok': False}
+            results.append(item)
+
+            if op not in BATCH_OPERATIONS:
+                item['error'] = 'Unknown operation'
+                continue
+            if not isinstance(data, dict):
+                item['error'] = 'Invalid data'
+                continue
+            if op != 'create' and task_id not in tasks:
+                item['error'] = 'Task not found'
+                continue
+            # Значения проверяются до выполнения: ошибка - у операции, а не у всего пакета
+            try:
+                data = self._task_input(data, settings, config)
+            except LimitExceededError:
+                item['error'] = 'Too many reminders'
+                continue
+            except ValueError as e:
+                item['error'] = str(e)
+                continue
+
+            if op == 'delete':
+                deleted_ids.append(tasks.pop(task_id).id)
+                item['ok'] = True
+                if capacity is not None:
+                    capacity += 1
+                continue
+
+            if op == 'create':
+                if capacity is not None:
+                    if capacity <= 0:
+                        item['error'] = 'Task limit reached'
+                        continue
+                    capacity -= 1
+                task = self._new_batch_task(user, data, settings, now)
+                self.session.add(task)
+                created.append(task)
+                # Дедлайн по продолжительности, если он не задан
+                recalculate_deadline = not task.deadline
             else:
-                priority = None
-                
-            # Подготовим данные о длительности, если она есть
-            duration_data = None
-            if task.duration_id:
-                try:
-                    duration_query = select(DurationSetting).where(DurationSetting.id == int(task.duration_id)) # type: ignore
-                    duration_result = await self.session.execute(duration_query)
-                    duration = duration_result.scalar_one_or_none()
-                    
-                    if duration:
-                        duration_data = {
-                            'id': duration.id,
-                            'name': duration.name,
-                            'type': duration.duration_type.value if duration.duration_type else None,
-                            'value': duration.value
-                        }
-                        logger.debug(f"Duration data: {duration_data}")
-                except Exception as e:
-                    logger.exception(f"Error preparing duration data: {e}")
-                    duration_data = None
-            
-            result = {
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
+                task = tasks[task_id]
+                self._apply_batch_update(task, data, settings, now)
+                # Дедлайн по новой продолжительности, если он не задан вручную
+                recalculate_deadline = 'duration_id' in data and 'deadline' not in data
+
+            duration = settings['duration_id'].get(task.duration_id)
+            if duration and recalculate_deadline:
+                task.deadline = duration.deadline_from(now)
+            saved.append((item, task))
+
+        try:
+            # Получаем id новых задач и удаляем задачи до общего commit
+            await self.session.flush()
+            for task in (*tasks.values(), *created):
+                self.stats.add(user.telegram_id, task_stat_keys(task))
+            await self.stats.flush()
+            if deleted_ids:
+                await self.session.execute(delete(Task).where(Task.id.in_(deleted_ids)))
+            await bump_data_version(self.session, [user.telegram_id])
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        # Задачи в ответе - одним запросом по колонкам списка
+        if saved:
+            result = await self.session.execute(
+                self._list_query(now=now).where(Task.id.in_([task.id for _, task in saved]))
+            )
+            task_dicts = {task['id']: task for task in self._rows_to_dicts(result.all())}
+            for item, task in saved:
+                # Задача могла быть удалена следующей операцией пакета
+                item.update(id=task.id, ok=True, task=task_dicts.get(task.id))
+
+        return results
+
+    async def _user_tasks(self, user: User, task_ids) -> Dict[int, Task]:
+        """Задачи пользователя из tasks по id"""
+        result = await self.session.execute(
+            select(Task).where(Task.user_id == user.telegram_id, Task.id.in_(task_ids))
+        )
+        return {task.id: task for task in result.scalars()}
+
+    async def restore_task(self, user_id: str, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Вернуть задачу из архива в tasks
+
+        Returns:
+            Optional[Dict[str, Any]]: Задача или None, если задачи пользователя нет в архиве
+        """
+        user = await self.auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        if not await TaskArchiveService(self.session).restore(user.telegram_id, [task_id]):
+            return None
+        await self.session.commit()
+
+        result = await self.session.execute(self._list_query(now=self._now(user)).where(Task.id == int(task_id)))
+        return self._rows_to_dicts(result.all())[0]
+
+    async def bulk_create_tasks(self, user_id: str, tasks_data: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Создать несколько задач одним пакетом (None для задач, которые не удалось создать)"""
+        results = await self.apply_batch(user_id, [{'op': 'create', 'data': data} for data in tasks_data])
+        return [item.get('task') for item in results] if results is not None else [None] * len(tasks_data)
+
+    async def bulk_update_tasks(
+        self,
+        user_id: str,
+        task_ids: List[int],
+        task_data: Dict[str, Any]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Применить одно изменение к нескольким задачам (например, перевести их в другой статус)"""
+        results = await self.apply_batch(
+            user_id, [{'op': 'update', 'id': task_id, 'data': task_data} for task_id in task_ids]
+        )
+        return [item.get('task') for item in results] if results is not None else [None] * len(task_ids)
+
+    async def bulk_delete_tasks(self, user_id: str, task_ids: List[int]) -> List[bool]:
+        """Удалить несколько задач одним пакетом (True для удаленных задач)"""
+        results = await self.apply_batch(user_id, [{'op': 'delete', 'id': task_id} for task_id in task_ids])
+        return [item['ok'] for item in results] if results is not None else [False] * len(task_ids)
+
+    async def get_settings_by_field(self, user: User) -> Dict[str, Dict[int, Any]]:
+        """Настройки пользователя по полям задачи из кэша настроек: {'status_id': {id: Status}, ...}"""
+        settings = await SettingsService(self.session).get_cached_settings(user)
+        return settings.by_field()
+
+    def _task_input(
+        self,
+        task_data: Dict[str, Any],
+        settings: Dict[str, Dict[int, Any]],
+        config: GlobalConfig
+    ) -> Dict[str, Any]:
+        """
+        Проверить и привести переданные поля задачи (create_task, update_task, apply_batch)
+
+        Настройки приводятся к int и проверяются по настройкам пользователя (пустое
+        значение - None), deadline и completed_at разбираются parse_deadline (пустая
+        строка - None), напоминания - normalize_reminders. Остальные поля не меняются.
+
+        Raises:
+            ValueError: 'Invalid <поле>' для некорректного значения
+            LimitExceededError: если напоминаний больше max_reminders_per_task
+        """
+        data = dict(task_data)
+        for field, owned in settings.items():
+            if field not in data:
+                continue
+            if not data[field]:
+                data[field] = None
+                continue
+            try:
+                data[field] = int(data[field])
+            except (TypeError, ValueError):
+                raise ValueError(f'Invalid {field}') from None
+            if data[field] not in owned:
+                raise ValueError(f'Invalid {field}')
+        for field in ('deadline', 'completed_at'):
+            value = data.get(field)
+            if value in (None, ''):
+                if field in data:
+                    data[field] = None
+            elif isinstance(value, str):
+                data[field] = self.parse_deadline(value)
+                if data[field] is None:
+                    raise ValueError(f'Invalid {field}')
+            elif not isinstance(value, datetime):
+                raise ValueError(f'Invalid {field}')
+        if 'reminders' in data:
+            try:
+                data['reminders'] = normalize_reminders(data['reminders'], config)
+            except ValueError:
+                raise ValueError('Invalid reminders') from None
+        return data
+
+    def _new_batch_task(
+        self,
+        user: User,
+        data: Dict[str, Any],
+        settings: Dict[str, Dict[int, Any]],
+        now: datetime
+    ) -> Task:
+        """
+        Новая задача пакета: пропущенные настройки берутся по умолчанию, как в create_task
+
+        Args:
+            now: Время пакета (completed_at задачи в финальном статусе)
+        """
+        values = {}
+        for field, owned in settings.items():
+            values[field] = data.get(field) or next(
+                (setting.id for setting in owned.values() if setting.is_default), None
+            )
+        task = Task(
+            user_id=user.telegram_id,
+            title=data.get('title') or "Новая задача",
+            description=data.get('description'),
+            deadline=data.get('deadline'),
+            reminders=data.get('reminders') or [],
+            **values
+        )
+        status = settings['status_id'].get(task.status_id)
+        if status and status.is_final:
+            task.completed_at = now
+        return task
+
+    def _apply_batch_update(
+        self,
+        task: Task,
+        data: Dict[str, Any],
+        settings: Dict[str, Dict[int, Any]],
+        now: datetime
+    ) -> None:
+        """Изменить задачу пакета теми же правилами, что и update_task (data проверены _task_input)"""
+        for field in ('title', 'description', 'type_id', 'priority_id', 'duration_id', 'reminders'):
+            if field in data:
+                setattr(task, field, data[field])
+        if 'status_id' in data:
+            self._set_status(task, data['status_id'], settings['status_id'].get(data['status_id']), now)
+        for field in ('completed_at', 'deadline'):
+            if field in data:
+                setattr(task, field, data[field])
+
+    @staticmethod
+    def _set_status(task: Task, status_id: Optional[int], status: Optional[Status], now: datetime) -> None:
+        """Установить статус задачи: финальный статус завершает задачу, остальные - открывают"""
+        task.status_id = status_id
+        if status:
+            task.completed_at = now if status.is_final else None
+
+    @staticmethod
+    def parse_deadline(deadline: str) -> Optional[datetime]:
+        """Разобрать дедлайн из ISO-строки или формата ДД.ММ.ГГГГ [ЧЧ:ММ] (None при ошибке)"""
+        try:
+            # Сначала пробуем ISO формат
+            try:
+                value = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+                logger.debug(f"Converted ISO deadline string to datetime: {value}")
+            except ValueError:
+                # Пробуем формат '01.04.2025 11:18'
+                if ' ' in deadline:
+                    # Есть дата и время в формате ДД.ММ.ГГГГ ЧЧ:ММ
+                    value = datetime.strptime(deadline, '%d.%m.%Y %H:%M')
+                else:
+                    # Только дата в формате ДД.ММ.ГГГГ
+                    value = datetime.strptime(deadline, '%d.%m.%Y')
+                logger.debug(f"Converted localized deadline string to datetime: {value}")
+            return value
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error converting deadline: {e}, value: {deadline}, type: {type(deadline)}")
+            # Сохраняем None в случае ошибки конвертации
+            return None
+
+    def _task_row_dict(self, row, settings: Dict[str, Dict[int, Any]], now: datetime) -> Dict[str, Any]:
+        """
+        Словарь задачи из строки INSERT/UPDATE ... RETURNING без повторного чтения
+
+        Args:
+            row: Строка с колонками TASK_RETURNING_COLUMNS
+            settings: Настройки пользователя по полям задачи (get_settings_by_field)
+            now: Время, с которым сравнивается дедлайн в is_overdue
+        """
+        # Признак просрочки - как overdue_predicate в запросе списка. В RETURNING он не
+        # вычисляется: SQLite 3.40 с триггером tasks_fts_ai возвращает completed_at IS NULL = 0
+        deadline = row.deadline
+        if deadline and deadline.tzinfo is None:
+            # SQLite хранит время без часового пояса и сравнивает его с now так же
+            now = now.replace(tzinfo=None)
+        is_overdue = row.completed_at is None and deadline is not None and deadline < now
+
+        task_type = settings['type_id'].get(row.type_id)
+        status = settings['status_id'].get(row.status_id)
+        priority = settings['priority_id'].get(row.priority_id)
+        duration = settings['duration_id'].get(row.duration_id)
+        # Те же колонки, что у строки _list_query
+        list_row = SimpleNamespace(
+            id=row.id, title=row.title, description=row.description,
+            deadline=row.deadline, created_at=row.created_at, completed_at=row.completed_at,
+            is_overdue=is_overdue,
+            type_id=task_type and task_type.id, type_name=task_type and task_type.name,
+            type_color=task_type and task_type.color,
+            status_id=status and status.id, status_name=status and status.name,
+            status_color=status and status.color, status_order=status and status.order,
+            priority_id=priority and priority.id, priority_name=priority and priority.name,
+            priority_color=priority and priority.color, priority_order=priority and priority.order,
+            duration_id=duration and duration.id, duration_name=duration and duration.name,
+            duration_type=duration and duration.type, duration_value=duration and duration.value,
+        )
+        return self._rows_to_dicts([list_row])[0]
+
+    @staticmethod
+    def _now(user: User) -> datetime:
+        """Текущее время в часовом поясе пользователя: одно значение на весь запрос"""
+        return datetime.now(tz=pytz.timezone(user.timezone))
+
+    @staticmethod
+    def _list_query(*columns, tasks: FromClause = Task.__table__, now: Optional[datetime] = None) -> Select:
+        """
+        Запрос колонок списка задач вместе с настройками
+
+        Args:
+            columns: Выбираемые колонки (по умолчанию task_list_columns и признак
+                просрочки is_overdue). Неиспользуемые LEFT JOIN по первичному ключу
+                настроек SQLite и PostgreSQL не выполняют.
+            tasks: Таблица задач (см. _list_conditions)
+            now: Время, с которым сравнивается дедлайн в is_overdue
+        """
+        if not columns:
+            overdue = overdue_predicate(tasks).params(now=now or datetime.now(tz=timezone.utc))
+            columns = (*task_list_columns(tasks), overdue.label('is_overdue'))
+        return select(*columns).select_from(tasks) \
+            .outerjoin(TaskTypeSetting, tasks.c.type_id == TaskTypeSetting.id) \
+            .outerjoin(StatusSetting, tasks.c.status_id == StatusSetting.id) \
+            .outerjoin(PrioritySetting, tasks.c.priority_id == PrioritySetting.id) \
+            .outerjoin(DurationSetting, tasks.c.duration_id == DurationSetting.id)
+
+    @staticmethod
+    def _rows_to_dicts(rows) -> List[Dict[str, Any]]:
+        """
+        Преобразовать строки _list_query в словари задач
+
+        Признак просрочки is_overdue вычисляется в запросе (overdue_predicate).
+        """
+        tasks = []
+        for row in rows:
+            deadline = row.deadline
+            completed_at = row.completed_at
+            tasks.append({
+                'id': row.id,
+                'title': row.title,
+                'description': row.description,
                 'type': {
-                    'id': task_type.id,
-                    'name': task_type.name,
-                    'color': task_type.color
-                } if task_type else None,
+                    'id': row.type_id,
+                    'name': row.type_name,
+                    'color': row.type_color
+                } if row.type_id is not None else None,
                 'status': {
-                    'id': status.id,
-                    'name': status.name,
-                    'color': status.color,
-                    'order': status.order
-                } if status else None,
+                    'id': row.status_id,
+                    'name': row.status_name,
+                    'color': row.status_color,
+                    'order': row.status_order
+                } if row.status_id is not None else None,
                 'priority': {
-                    'id': priority.id,
-                    'name': priority.name,
-                    'color': priority.color,
-                    'order': priority.order
-                } if priority else None,
-                'duration': duration_data,
-                'deadline': task.deadline if task.deadline else None,
-                'deadline_iso': task.deadline.isoformat() if task.deadline else None,
-                'created_at': task.created_at.isoformat(),
-                'completed_at': task.completed_at.isoformat() if task.completed_at else None,
-                'is_overdue': task.is_overdue()
-            }
-            logger.debug(f"Task {task.id} converted to dict successfully")
-            return result
-        except Exception as e:
-            logger.exception(f"Error converting task {task.id} to dict: {e}")
-            raise 
\ No newline at end of file
+                    'id': row.priority_id,
+                    'name': row.priority_name,
+                    'color': row.priority_color,
+                    'order': row.priority_order
+                } if row.priority_id is not None else None,
+                'duration': {
+                    'id': row.duration_id,
+                    'name': row.duration_name,
+                    'type': row.duration_type.value if row.duration_type else None,
+                    'value': row.duration_value
+                } if row.duration_id is not None else None,
+                'deadline': deadline if deadline else None,
+                'deadline_iso': deadline.isoformat() if deadline else None,
+                'created_at': row.created_at.isoformat(),
+                'completed_at': completed_at.isoformat() if completed_at else None,
+                'is_overdue': bool(row.is_overdue)
+            })
+        return tasks
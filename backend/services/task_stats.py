@@ -0,0 +1,253 @@
+import logging
+from collections import Counter
+from datetime import datetime, time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import pytz
+from sqlalchemy import String, Integer, delete, func, literal, select, tuple_, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import Task, TaskArchive, User, UserTaskStat
+from backend.models.task_filter import TaskFilter
+from backend.services.data_version import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Счетчики по настройкам: вид счетчика -> поле задачи
+SETTING_STATS = {
+    'status': 'status_id',
+    'priority': 'priority_id',
+    'type': 'type_id',
+}
+
+# Фильтры, количество задач для которых берется из счетчиков:
+# набор условий TaskFilter.shape() -> вид счетчика
+FILTER_STATS = {
+    (): 'total',
+    ('open',): 'open',
+    ('completed',): 'completed',
+    ('status_id',): 'status',
+    ('priority_id',): 'priority',
+    ('type_id',): 'type',
+}
+
+# Счетчик задач в архиве (TaskArchiveService)
+ARCHIVED_STAT_KEY = ('archived', 0)
+
+# Счетчики, к которым прибавляются задачи из архива, если фильтр включает архив
+# (в архиве только завершенные задачи: open не меняется, остальные считаются по таблицам)
+ARCHIVE_FILTER_STATS = {'total', 'completed'}
+
+# Колонки задачи, от которых зависят ее счетчики (task_stat_keys)
+TASK_STAT_COLUMNS = (Task.status_id, Task.priority_id, Task.type_id, Task.completed_at)
+
+StatKey = Tuple[str, int]
+
+
+def task_stat_keys(task: Union[Task, Mapping[str, Any]]) -> Tuple[StatKey, ...]:
+    """
+    Счетчики, в которые входит задача
+
+    Args:
+        task: Задача или словарь с колонками задачи (status_id, priority_id, type_id, completed_at)
+    """
+    def value(field):
+        return task.get(field) if isinstance(task, Mapping) else getattr(task, field)
+
+    return (
+        ('total', 0),
+        ('completed', 0) if value('completed_at') else ('open', 0),
+        *((kind, value(field) or 0) for kind, field in SETTING_STATS.items()),
+    )
+
+
+def stat_count(user_id: int, kind: str = 'total', key: int = 0):
+    """Значение счетчика пользователя скалярным подзапросом (0, если счетчика нет)"""
+    return func.coalesce(
+        select(UserTaskStat.task_count).where(
+            UserTaskStat.user_id == user_id, UserTaskStat.kind == kind, UserTaskStat.key == key
+        ).scalar_subquery(),
+        0
+    )
+
+
+class TaskStatsService:
+    """
+    Счетчики задач пользователя в таблице user_task_stats
+
+    Изменения задач накапливаются через add/remove и записываются flush()
+    в той же транзакции, что и сами задачи. Просроченные и завершенные сегодня
+    задачи зависят от текущего времени, поэтому считаются при чтении по индексам
+    ix_tasks_user_id_open_deadline и ix_tasks_user_id_completed_at.
+    Расхождения счетчиков с задачами исправляет reconcile_user / reconcile_all.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: Counter = Counter()
+
+    def add(self, user_id: int, keys: Iterable[StatKey], sign: int = 1) -> None:
+        """Учесть задачу в счетчиках (sign=-1 - исключить)"""
+        for kind, key in keys:
+            self._pending[(user_id, kind, key)] += sign
+
+    def remove(self, user_id: int, keys: Iterable[StatKey]) -> None:
+        """Исключить задачу из счетчиков"""
+        self.add(user_id, keys, -1)
+
+    async def flush(self) -> None:
+        """Записать накопленные изменения счетчиков одним запросом (без commit)"""
+        rows = [
+            {'user_id': user_id, 'kind': kind, 'key': key, 'task_count': delta}
+            for (user_id, kind, key), delta in self._pending.items() if delta
+        ]
+        self._pending.clear()
+        if rows:
+            await self.session.execute(self._upsert(increment=True), rows)
+
+    def _upsert(self, increment: bool):
+        """INSERT ... ON CONFLICT: прибавить значение к счетчику или заменить его"""
+        dialect_insert = postgresql.insert if self.session.bind.dialect.name == 'postgresql' else sqlite.insert
+        table = UserTaskStat.__table__
+        statement = dialect_insert(table)
+        task_count = statement.excluded['task_count']
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.kind, table.c.key],
+            set_={'task_count': table.c['task_count'] + task_count if increment else task_count}
+        )
+
+    async def get_stats(self, user: User) -> Dict[str, Any]:
+        """
+        Статистика задач пользователя одним запросом
+
+        Returns:
+            Dict[str, Any]: {'total', 'open', 'completed', 'overdue', 'completed_today',
+            'archived', 'by_status', 'by_priority', 'by_type'}, где by_* - список {'id', 'count'}
+            (id = None - настройка не задана). Все счетчики, кроме archived, - по задачам
+            без архива
+        """
+        timezone = pytz.timezone(user.timezone)
+        now = datetime.now(tz=timezone)
+        start_of_day = timezone.localize(datetime.combine(now.date(), time.min))
+
+        def count(kind, *conditions):
+            return select(
+                literal(kind, String), literal(0, Integer), func.count()
+            ).select_from(Task).where(Task.user_id == user.telegram_id, *conditions)
+
+        query = union_all(
+            select(UserTaskStat.kind, UserTaskStat.key, UserTaskStat.task_count).where(
+                UserTaskStat.user_id == user.telegram_id
+            ),
+            count('overdue', Task.completed_at.is_(None), Task.deadline < now),
+            count('completed_today', Task.completed_at >= start_of_day),
+        )
+        result = await self.session.execute(query)
+
+        stats: Dict[str, Any] = {
+            'total': 0, 'open': 0, 'completed': 0, 'overdue': 0, 'completed_today': 0, 'archived': 0,
+            **{f'by_{kind}': [] for kind in SETTING_STATS},
+        }
+        for kind, key, task_count in result.all():
+            if kind in SETTING_STATS:
+                if task_count:
+                    stats[f'by_{kind}'].append({'id': key or None, 'count': task_count})
+            else:
+                stats[kind] = task_count
+        return stats
+
+    async def count_for_filter(self, user_id: int, task_filter: TaskFilter) -> Optional[int]:
+        """
+        Количество задач по счетчику, если фильтр им покрывается
+
+        Returns:
+            Optional[int]: Количество задач или None, если нужен подсчет по таблице задач
+        """
+        shape = task_filter.shape()
+        kind = FILTER_STATS.get(shape)
+        if kind is None or task_filter.search:
+            return None
+        key = getattr(task_filter, shape[0]) if kind in SETTING_STATS else 0
+        counters = [(kind, key)]
+        if task_filter.includes_archive() and kind != 'open':
+            if kind not in ARCHIVE_FILTER_STATS:
+                return None
+            counters.append(ARCHIVED_STAT_KEY)
+        result = await self.session.execute(
+            select(func.sum(UserTaskStat.task_count)).where(
+                UserTaskStat.user_id == user_id,
+                tuple_(UserTaskStat.kind, UserTaskStat.key).in_(counters)
+            )
+        )
+        return result.scalar() or 0
+
+    async def reconcile_user(self, user_id: int) -> int:
+        """
+        Пересчитать счетчики пользователя по задачам (без commit)
+
+        Returns:
+            int: Количество исправленных счетчиков
+        """
+        result = await self.session.execute(
+            select(
+                Task.status_id, Task.priority_id, Task.type_id, Task.completed_at.is_not(None), func.count()
+            ).where(Task.user_id == user_id).group_by(
+                Task.status_id, Task.priority_id, Task.type_id, Task.completed_at.is_not(None)
+            )
+        )
+        actual: Counter = Counter()
+        for status_id, priority_id, type_id, is_completed, task_count in result.all():
+            keys = task_stat_keys({
+                'status_id': status_id, 'priority_id': priority_id, 'type_id': type_id,
+                'completed_at': is_completed,
+            })
+            for key in keys:
+                actual[key] += task_count
+        archived = await self.session.scalar(
+            select(func.count()).select_from(TaskArchive).where(TaskArchive.user_id == user_id)
+        )
+        if archived:
+            actual[ARCHIVED_STAT_KEY] = archived
+
+        result = await self.session.execute(
+            select(UserTaskStat.kind, UserTaskStat.key, UserTaskStat.task_count).where(
+                UserTaskStat.user_id == user_id
+            )
+        )
+        stored = {(kind, key): task_count for kind, key, task_count in result.all()}
+        drift = sum(1 for key in stored.keys() | actual.keys() if stored.get(key, 0) != actual.get(key, 0))
+        if not drift:
+            return 0
+
+        logger.warning(f"Счетчики задач пользователя {user_id} расходятся с задачами: {drift}, пересчитываем")
+        # Количества в ответах API меняются: ETag, выданные по старым счетчикам, больше не подходят
+        await bump_data_version(self.session, [user_id])
+        await self.session.execute(delete(UserTaskStat).where(UserTaskStat.user_id == user_id))
+        rows: List[Dict[str, Any]] = [
+            {'user_id': user_id, 'kind': kind, 'key': key, 'task_count': task_count}
+            for (kind, key), task_count in actual.items()
+        ]
+        if rows:
+            # Счетчик мог появиться после удаления в параллельной транзакции - заменяем его
+            await self.session.execute(self._upsert(increment=False), rows)
+        return drift
+
+    async def reconcile_all(self) -> int:
+        """
+        Пересчитать счетчики всех пользователей (каждый пользователь - своя транзакция)
+
+        Returns:
+            int: Количество исправленных счетчиков
+        """
+        result = await self.session.execute(select(User.telegram_id))
+        drift = 0
+        for user_id in result.scalars().all():
+            try:
+                drift += await self.reconcile_user(user_id)
+                await self.session.commit()
+            except Exception as e:
+                await self.session.rollback()
+                logger.exception(f"Не удалось пересчитать счетчики задач пользователя {user_id}: {e}")
+        logger.info(f"Счетчики задач пересчитаны, исправлено: {drift}")
+        return drift
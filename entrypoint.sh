@@ -1,7 +1,11 @@
 #!/usr/bin/env sh
 
 if [ "$RUN_BOT" -eq 0 ]; then
-  gunicorn -c /app/backend/gunicorn_config.py "backend.run:create_app_wsgi()"
+  if [ "${SERVER_MODE:-asgi}" = "wsgi" ]; then
+    gunicorn -c /app/backend/gunicorn_config.py "backend.run:create_app_wsgi()"
+  else
+    gunicorn -c /app/backend/gunicorn_config.py "backend.run:create_app_asgi()"
+  fi
 else
   python -m "backend.run"
 fi
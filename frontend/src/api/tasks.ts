@@ -78,6 +78,8 @@ export interface CreateTaskDto {
     duration_id?: number;
     deadline?: Date;
     completed?: boolean;
+    // ISO-даты напоминаний, не больше max_reminders_per_task
+    reminders?: string[];
 }
 
 export interface UpdateTaskDto {
@@ -89,6 +91,62 @@ export interface UpdateTaskDto {
     duration_id?: number;
     deadline?: Date;
     completed?: boolean;
+    // ISO-даты напоминаний, не больше max_reminders_per_task
+    reminders?: string[];
+}
+
+export type BatchOperation =
+    | { op: 'create'; data: CreateTaskDto }
+    | { op: 'update'; id: number; data: UpdateTaskDto }
+    | { op: 'delete'; id: number };
+
+// Ошибка превышения ограничения (409 - лимит задач, 400 - лимит напоминаний)
+export interface LimitError {
+    error: string;
+    code: 'max_tasks_per_user' | 'max_reminders_per_task';
+    limit: number;
+}
+
+export interface BatchResult {
+    op: BatchOperation['op'];
+    id: number | null;
+    ok: boolean;
+    task?: Task;
+    error?: string;
+}
+
+export interface ImportReport {
+    processed: number;
+    imported: number;
+    failed: number;
+    errors: { row: number; error: string }[];
+}
+
+export interface SettingCount {
+    id: number | null;
+    count: number;
+}
+
+export interface TaskStats {
+    total: number;
+    open: number;
+    completed: number;
+    overdue: number;
+    completed_today: number;
+    // Задачи в архиве (остальные счетчики - без архива)
+    archived: number;
+    by_status: SettingCount[];
+    by_priority: SettingCount[];
+    by_type: SettingCount[];
+}
+
+export interface TaskFacets {
+    by_status: SettingCount[];
+    by_priority: SettingCount[];
+    by_type: SettingCount[];
+    by_duration: SettingCount[];
+    open: number;
+    completed: number;
 }
 
 export interface TaskFilters {
@@ -97,8 +155,11 @@ export interface TaskFilters {
     duration_id?: number;
     type_id?: number;
     is_completed?: boolean;
+    is_overdue?: boolean;
     deadline_from?: string;
     deadline_to?: string;
+    // Включить задачи из архива (завершенные задачи читаются вместе с архивом всегда)
+    include_archived?: boolean;
 }
 
 export interface PaginationParams {
@@ -125,8 +186,53 @@ export interface UserPreferences {
     sort_order?: 'asc' | 'desc';
 }
 
+// Данные для загрузки страницы одним запросом (/api/bootstrap)
+export interface BootstrapData {
+    language: string;
+    timezone: string;
+    settings: Settings;
+    task_types: TaskType[];
+    // Сохраненные предпочтения; по ним построена первая страница задач
+    preferences: UserPreferences;
+    tasks: Task[];
+    pagination: PaginatedResponse['pagination'];
+}
+
+// Нормализовать предпочтения: идентификаторы настроек в фильтрах - числа
+const normalizePreferences = (data: Partial<UserPreferences>): UserPreferences => {
+    const normalized: UserPreferences = {
+        filters: data.filters || {},
+        sort_by: data.sort_by,
+        sort_order: data.sort_order || 'asc'
+    };
+
+    // Убедимся, что type_id является числом
+    if (normalized.filters?.type_id) {
+        normalized.filters.type_id = Number(normalized.filters.type_id);
+    }
+
+    // Убедимся, что status_id является числом
+    if (normalized.filters?.status_id) {
+        normalized.filters.status_id = Number(normalized.filters.status_id);
+    }
+
+    // Убедимся, что priority_id является числом
+    if (normalized.filters?.priority_id) {
+        normalized.filters.priority_id = Number(normalized.filters.priority_id);
+    }
+
+    return normalized;
+};
+
 
 export const TasksAPI = {
+    // Данные для первой отрисовки одним запросом: язык, часовой пояс, настройки,
+    // типы задач, предпочтения и первая страница задач по сохраненным предпочтениям
+    getBootstrap: async (pageSize?: number): Promise<BootstrapData> => {
+        const response = await api.get<BootstrapData>('/bootstrap', { params: { page_size: pageSize } });
+        return { ...response.data, preferences: normalizePreferences(response.data.preferences) };
+    },
+
     // Задачи
     getTasks: async (filters?: TaskFilters) => {
         const response = await api.get<{ tasks: Task[] }>('/tasks/', { params: filters });
@@ -164,17 +270,36 @@ export const TasksAPI = {
     // Получить общее количество задач с учетом фильтров и поиска
     getTaskCount: async (
         filters?: TaskFilters,
-        search?: string
+        search?: string,
+        approximate?: boolean
     ) => {
         const response = await api.get<{ count: number }>('/tasks/count', {
             params: {
                 ...filters,
-                search
+                search,
+                approximate
             }
         });
         return response.data.count;
     },
 
+    // Количество задач по значениям каждого фильтра (для счетчиков в фильтрах)
+    getTaskFacets: async (filters?: TaskFilters, search?: string) => {
+        const response = await api.get<TaskFacets>('/tasks/facets', {
+            params: {
+                ...filters,
+                search
+            }
+        });
+        return response.data;
+    },
+
+    // Получить статистику задач (счетчики обновляются вместе с задачами)
+    getTaskStats: async () => {
+        const response = await api.get<TaskStats>('/tasks/stats');
+        return response.data;
+    },
+
     // Получить задачу по ID
     getTask: async (taskId: number): Promise<Task> => {
         const response = await api.get<Task>(`/tasks/${taskId}`);
@@ -198,6 +323,29 @@ export const TasksAPI = {
         await api.delete(`/tasks/${taskId}`);
     },
 
+    // Вернуть задачу из архива
+    restoreTask: async (taskId: number) => {
+        const response = await api.post<Task>(`/tasks/${taskId}/restore`);
+        return response.data;
+    },
+
+    // Импортировать задачи из файла CSV или NDJSON (формат по расширению файла)
+    importTasks: async (file: File) => {
+        const formData = new FormData();
+        formData.append('file', file);
+        const response = await api.post<ImportReport>('/tasks/import', formData, {
+            headers: { 'Content-Type': 'multipart/form-data' },
+            timeout: 0,
+        });
+        return response.data;
+    },
+
+    // Выполнить несколько операций с задачами одним запросом (в одной транзакции)
+    batchTasks: async (operations: BatchOperation[]) => {
+        const response = await api.post<{ results: BatchResult[] }>('/tasks/batch', { operations });
+        return response.data.results;
+    },
+
     // Настройки
     getSettings: async () => {
         const response = await api.get<Settings>('/settings/');
@@ -339,26 +487,7 @@ export const SettingsAPI = {
             console.log('Raw response from API:', JSON.stringify(response.data));
             const received_data = JSON.parse(response.data);
             // Создаем нормализованный объект настроек
-            const normalized: UserPreferences = {
-                filters: received_data.filters || {},
-                sort_by: received_data.sort_by,
-                sort_order: received_data.sort_order || 'asc'
-            };
-
-            // Убедимся, что type_id является числом
-            if (normalized.filters?.type_id) {
-                normalized.filters.type_id = Number(normalized.filters.type_id);
-            }
-
-            // Убедимся, что status_id является числом
-            if (normalized.filters?.status_id) {
-                normalized.filters.status_id = Number(normalized.filters.status_id);
-            }
-
-            // Убедимся, что priority_id является числом
-            if (normalized.filters?.priority_id) {
-                normalized.filters.priority_id = Number(normalized.filters.priority_id);
-            }
+            const normalized = normalizePreferences(received_data);
 
             console.log('Normalized preferences:', normalized);
             return normalized;
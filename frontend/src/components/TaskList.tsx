@@ -70,6 +70,8 @@ export const TaskList: React.FC<TaskListProps> = ({ onEditTask, onDeleteTask, re
     const isInitialMount = useRef(true);
     const preferencesLoaded = useRef(false);
     const userTriggeredUpdate = useRef(false);
+    // Первая страница задач получена вместе с начальными данными (loadInitialData)
+    const initialPageLoaded = useRef(false);
     
     // Загрузка настроек (статусы, приоритеты, типы задач)
     const fetchSettings = useCallback(async () => {
@@ -85,87 +87,111 @@ export const TaskList: React.FC<TaskListProps> = ({ onEditTask, onDeleteTask, re
         }
     }, []);
     
-    // Загрузка настроек пользователя
-    const loadUserPreferences = useCallback(async () => {
-        try {
-            console.log('Loading user preferences...');
-            const preferences = await SettingsAPI.getUserPreferences();
-            console.log('Loaded user preferences:', preferences);
-
-            // Проверяем, что у нас есть предпочтения и они не пустые
-            if (preferences && typeof preferences === 'object') {
-                // Применяем сохраненные фильтры, если они есть
-                if (preferences.filters && Object.keys(preferences.filters).length > 0) {
-                    console.log('Applying filters from preferences:', preferences.filters);
-                    
-                    // Устанавливаем фильтры в состояние компонента
-                    setFilters(prevFilters => ({...prevFilters, ...preferences.filters}));
-                    
-                    // Устанавливаем состояния UI компонентов фильтров
-                    if (preferences.filters.status_id !== undefined) {
-                        console.log('Setting status filter:', preferences.filters.status_id);
-                        setSelectedStatus(Number(preferences.filters.status_id));
-                    }
-                    
-                    if (preferences.filters.priority_id !== undefined) {
-                        console.log('Setting priority filter:', preferences.filters.priority_id);
-                        setSelectedPriority(Number(preferences.filters.priority_id));
-                    }
-                    
-                    if (preferences.filters.type_id !== undefined) {
-                        console.log('Setting type filter:', preferences.filters.type_id);
-                        setSelectedType(Number(preferences.filters.type_id));
-                    }
-                    
-                    if (preferences.filters.deadline_from) {
-                        console.log('Setting deadline_from filter:', preferences.filters.deadline_from);
-                        setDeadlineFrom(new Date(preferences.filters.deadline_from));
-                    }
-                    
-                    if (preferences.filters.deadline_to) {
-                        console.log('Setting deadline_to filter:', preferences.filters.deadline_to);
-                        setDeadlineTo(new Date(preferences.filters.deadline_to));
-                    }
-                    
-                    if (preferences.filters.is_completed !== undefined) {
-                        console.log('Setting is_completed filter:', preferences.filters.is_completed);
-                        setShowCompleted(preferences.filters.is_completed);
-                    } else {
-                        console.log('No is_completed filter found in preferences');
-                        setShowCompleted(true);
-                    }
-                } else {
-                    console.log('No filters found in preferences or filters is empty:', preferences.filters);
-                    setFilters(prevFilters => ({...prevFilters, ...preferences.filters}));
-                    setSelectedStatus('');
-                    setSelectedPriority('');
-                    setSelectedType('');
-                    setShowCompleted(true);
+    // Применение сохраненных настроек пользователя к фильтрам и сортировке
+    const applyUserPreferences = useCallback((preferences: UserPreferences) => {
+        // Проверяем, что у нас есть предпочтения и они не пустые
+        if (preferences && typeof preferences === 'object') {
+            // Применяем сохраненные фильтры, если они есть
+            if (preferences.filters && Object.keys(preferences.filters).length > 0) {
+                console.log('Applying filters from preferences:', preferences.filters);
+                
+                // Устанавливаем фильтры в состояние компонента
+                setFilters(prevFilters => ({...prevFilters, ...preferences.filters}));
+                
+                // Устанавливаем состояния UI компонентов фильтров
+                if (preferences.filters.status_id !== undefined) {
+                    console.log('Setting status filter:', preferences.filters.status_id);
+                    setSelectedStatus(Number(preferences.filters.status_id));
                 }
                 
-                // Применяем сохраненную сортировку, если она есть
-                if (preferences.sort_by) {
-                    console.log('Setting sort_by:', preferences.sort_by);
-                    setSortField(preferences.sort_by);
-                } else {
-                    console.log('Setting empty sort_by');
-                    setSortField('');
+                if (preferences.filters.priority_id !== undefined) {
+                    console.log('Setting priority filter:', preferences.filters.priority_id);
+                    setSelectedPriority(Number(preferences.filters.priority_id));
                 }
                 
-                if (preferences.sort_order) {
-                    console.log('Setting sort_order:', preferences.sort_order);
-                    setSortDirection(preferences.sort_order);
+                if (preferences.filters.type_id !== undefined) {
+                    console.log('Setting type filter:', preferences.filters.type_id);
+                    setSelectedType(Number(preferences.filters.type_id));
+                }
+                
+                if (preferences.filters.deadline_from) {
+                    console.log('Setting deadline_from filter:', preferences.filters.deadline_from);
+                    setDeadlineFrom(new Date(preferences.filters.deadline_from));
+                }
+                
+                if (preferences.filters.deadline_to) {
+                    console.log('Setting deadline_to filter:', preferences.filters.deadline_to);
+                    setDeadlineTo(new Date(preferences.filters.deadline_to));
+                }
+                
+                if (preferences.filters.is_completed !== undefined) {
+                    console.log('Setting is_completed filter:', preferences.filters.is_completed);
+                    setShowCompleted(preferences.filters.is_completed);
+                } else {
+                    console.log('No is_completed filter found in preferences');
+                    setShowCompleted(true);
                 }
             } else {
-                console.log('No valid preferences received');
+                console.log('No filters found in preferences or filters is empty:', preferences.filters);
+                setFilters(prevFilters => ({...prevFilters, ...preferences.filters}));
+                setSelectedStatus('');
+                setSelectedPriority('');
+                setSelectedType('');
+                setShowCompleted(true);
+            }
+            
+            // Применяем сохраненную сортировку, если она есть
+            if (preferences.sort_by) {
+                console.log('Setting sort_by:', preferences.sort_by);
+                setSortField(preferences.sort_by);
+            } else {
+                console.log('Setting empty sort_by');
+                setSortField('');
             }
             
+            if (preferences.sort_order) {
+                console.log('Setting sort_order:', preferences.sort_order);
+                setSortDirection(preferences.sort_order);
+            }
+        } else {
+            console.log('No valid preferences received');
+        }
+    }, []);
+
+    // Загрузка настроек пользователя
+    const loadUserPreferences = useCallback(async () => {
+        try {
+            console.log('Loading user preferences...');
+            const preferences = await SettingsAPI.getUserPreferences();
+            console.log('Loaded user preferences:', preferences);
+            applyUserPreferences(preferences);
             preferencesLoaded.current = true;
         } catch (error) {
             console.error('Error loading user preferences:', error);
             preferencesLoaded.current = true;
         }
-    }, []);
+    }, [applyUserPreferences]);
+
+    // Начальная загрузка одним запросом (/api/bootstrap): справочники, настройки
+    // пользователя и первая страница задач; при ошибке - отдельными запросами
+    const loadInitialData = useCallback(async () => {
+        try {
+            const data = await TasksAPI.getBootstrap(pagination.page_size);
+            setStatuses(data.settings.statuses);
+            setPriorities(data.settings.priorities);
+            setTaskTypes(data.task_types);
+            applyUserPreferences(data.preferences);
+            setTaskData({ tasks: data.tasks, pagination: data.pagination });
+            setError(null);
+            setLoading(false);
+            initialPageLoaded.current = true;
+            preferencesLoaded.current = true;
+        } catch (err) {
+            console.error('Error loading bootstrap data:', err);
+            fetchSettings();
+            loadUserPreferences();
+        }
+    }, [pagination.page_size, applyUserPreferences, fetchSettings, loadUserPreferences]);
     
     // Сохранение настроек пользователя
     const saveUserPreferences = useCallback(async () => {
@@ -225,11 +251,8 @@ export const TaskList: React.FC<TaskListProps> = ({ onEditTask, onDeleteTask, re
         isInitialMount.current = true;
         preferencesLoaded.current = false;
         
-        // Загружаем настройки и справочники
-        fetchSettings();
-        
-        // Загружаем пользовательские настройки
-        loadUserPreferences();
+        // Загружаем справочники, пользовательские настройки и первую страницу задач
+        loadInitialData();
         
         // Создаем стабильный обработчик событий
         const handleRefreshEvent = () => {
@@ -251,9 +274,14 @@ export const TaskList: React.FC<TaskListProps> = ({ onEditTask, onDeleteTask, re
     useEffect(() => {
         // Загружаем задачи только когда предпочтения загружены
         if (preferencesLoaded.current) {
+            isInitialMount.current = false;
+            // Первая страница уже пришла с начальными данными
+            if (initialPageLoaded.current) {
+                initialPageLoaded.current = false;
+                return;
+            }
             console.log('Preferences loaded - fetching tasks');
             fetchTasksStable();
-            isInitialMount.current = false;
         }
     }, [preferencesLoaded.current]); // eslint-disable-line react-hooks/exhaustive-deps
     
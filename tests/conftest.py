@@ -0,0 +1,150 @@
+"""
+Общие фикстуры тестов
+
+Тесты работают с SQLite-базой разработки (local.db относительно текущего
+каталога), поэтому до импорта backend текущим каталогом становится временный:
+там создается схема миграциями alembic и настройки по умолчанию. Корутины
+выполняются в общем фоновом цикле событий, как обработчики Flask
+(start_background_loop / run_async).
+"""
+import itertools
+import os
+import pathlib
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+WORK_DIR = tempfile.mkdtemp(prefix='planner-tests-')
+os.chdir(WORK_DIR)
+# logging.ini пишет в logs/logs.log относительно текущего каталога
+os.makedirs('logs', exist_ok=True)
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import event, select, update  # noqa: E402
+
+from backend import database  # noqa: E402
+from backend.blueprints.wrapper import run_async, start_background_loop  # noqa: E402
+from backend.db.models import GlobalSettings, User  # noqa: E402
+from backend.scripts.load_test import make_token  # noqa: E402
+from backend.services.global_settings import global_settings_cache  # noqa: E402
+
+_telegram_ids = itertools.count(1000)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def db():
+    """Схема базы и настройки по умолчанию"""
+    alembic_cfg = Config(str(ROOT / 'alembic.ini'))
+    alembic_cfg.set_main_option('script_location', str(ROOT / 'alembic_migrations'))
+    command.upgrade(alembic_cfg, 'head')
+    start_background_loop()
+
+    async def seed():
+        async with database.get_session() as session:
+            await database.create_initial_default_settings(session)
+            await database.create_initial_global_settings(session)
+
+    run_async(seed())
+    yield
+    run_async(database.engine.dispose())
+
+
+@pytest.fixture
+def set_global_setting():
+    """Изменить глобальную настройку (с очисткой кэша настроек процесса)"""
+    async def update_setting(key: str, value: str):
+        async with database.get_session() as session:
+            await session.execute(update(GlobalSettings).where(GlobalSettings.key == key).values(value=value))
+            await session.commit()
+
+    changed = {}
+
+    def set_value(key: str, value) -> None:
+        if key not in changed:
+            changed[key] = run_async(_get_global_setting(key))
+        run_async(update_setting(key, str(value)))
+        global_settings_cache.clear()
+
+    yield set_value
+    for key, value in changed.items():
+        run_async(update_setting(key, value))
+    global_settings_cache.clear()
+
+
+async def _get_global_setting(key: str) -> str:
+    async with database.get_session() as session:
+        result = await session.execute(select(GlobalSettings.value).where(GlobalSettings.key == key))
+        return result.scalar_one()
+
+
+@pytest.fixture
+def user_id() -> str:
+    """Новый пользователь с настройками по умолчанию; telegram_id строкой, как в JWT"""
+    telegram_id = next(_telegram_ids)
+
+    async def create():
+        async with database.get_session() as session:
+            session.add(User(telegram_id=telegram_id, username=f'user{telegram_id}', timezone='Europe/Moscow'))
+            await session.commit()
+            await database.create_user_settings(telegram_id, session)
+
+    run_async(create())
+    return str(telegram_id)
+
+
+@pytest.fixture
+def setting_ids(user_id) -> Dict[str, List[int]]:
+    """id настроек пользователя user_id по полям задачи: {'status_id': [...], ...}"""
+    from backend.services.auth_service import AuthService
+    from backend.services.task_service import TaskService
+
+    async def load():
+        async with database.get_session() as session:
+            user = await AuthService(session).get_user_by_id(user_id)
+            settings = await TaskService(session).get_settings_by_field(user)
+            return {field: sorted(owned) for field, owned in settings.items()}
+
+    return run_async(load())
+
+
+@pytest.fixture(scope='session')
+def app(db):
+    from backend.run import create_app_wsgi
+    return create_app_wsgi()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(user_id):
+    """Заголовок Authorization с токеном пользователя user_id"""
+    return {'Authorization': f'Bearer {make_token(user_id)}'}
+
+
+@pytest.fixture
+def count_statements():
+    """Собирать SQL-запросы движка внутри блока with"""
+    @contextmanager
+    def counter():
+        statements: List[str] = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(database.engine.sync_engine, 'before_cursor_execute', capture)
+        try:
+            yield statements
+        finally:
+            event.remove(database.engine.sync_engine, 'before_cursor_execute', capture)
+
+    return counter
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from backend.scripts.load_test import make_token
+
+BOOTSTRAP_KEYS = {'language', 'timezone', 'settings', 'task_types', 'preferences', 'tasks', 'pagination'}
+
+
+def _create_tasks(client, auth_headers, setting_ids):
+    """Три открытые задачи с разными сроками и одна завершенная"""
+    low, high = setting_ids['priority_id'][:2]
+    start = datetime(2030, 2, 1, 10, 0)
+    ids = [
+        client.post('/api/tasks/', headers=auth_headers, json={
+            'title': f'Задача {i}', 'priority_id': priority, 'deadline': (start + timedelta(days=3 - i)).isoformat(),
+        }).get_json()['id']
+        for i, priority in enumerate([low, high, high])
+    ]
+    completed_at = datetime.now().replace(microsecond=0).isoformat()
+    client.put(f'/api/tasks/{ids[0]}', headers=auth_headers, json={'completed_at': completed_at})
+    client.post('/api/tasks/', headers=auth_headers, json={'title': 'Открытая', 'priority_id': low})
+    return low, high
+
+
+def test_bootstrap_matches_separate_requests(client, auth_headers, setting_ids):
+    """Части ответа совпадают с отдельными запросами, которые заменяет /api/bootstrap"""
+    _create_tasks(client, auth_headers, setting_ids)
+
+    response = client.get('/api/bootstrap?page_size=2', headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data) == BOOTSTRAP_KEYS
+
+    assert data['language'] == client.get('/api/user/language', headers=auth_headers).get_json()['language']
+    assert data['timezone'] == client.get('/api/user/timezone', headers=auth_headers).get_json()['timezone']
+    assert data['task_types'] == client.get('/api/settings/task-types/', headers=auth_headers).get_json()
+    assert set(data['settings']) == set(client.get('/api/settings/', headers=auth_headers).get_json())
+
+    # Без сохраненных предпочтений - открытые задачи по сроку, как у фронтенда
+    assert data['preferences'] == {'filters': {'is_completed': False}, 'sort_by': 'deadline', 'sort_order': 'asc'}
+    page = client.get(
+        '/api/tasks/paginated?page=1&page_size=2&sort_by=deadline&sort_order=asc&is_completed=false',
+        headers=auth_headers
+    ).get_json()
+    assert data['tasks'] == page['tasks']
+    assert data['pagination'] == page['pagination'] == {'page': 1, 'page_size': 2, 'total_tasks': 3, 'total_pages': 2}
+    # Срок задачи без deadline - по продолжительности по умолчанию, раньше 2030 года
+    assert [task['title'] for task in data['tasks']] == ['Открытая', 'Задача 2']
+
+
+def test_bootstrap_applies_saved_preferences(client, auth_headers, setting_ids):
+    """Первая страница строится по сохраненным фильтрам и сортировке; некорректные фильтры не применяются"""
+    low, _ = _create_tasks(client, auth_headers, setting_ids)
+
+    preferences = {'filters': {'priority_id': low}, 'sort_by': 'title', 'sort_order': 'desc'}
+    client.post('/api/user-preferences/', headers=auth_headers, json=preferences)
+    data = client.get('/api/bootstrap', headers=auth_headers).get_json()
+    assert data['preferences'] == preferences
+    assert [task['title'] for task in data['tasks']] == ['Открытая', 'Задача 0']
+    assert data['pagination']['total_tasks'] == 2
+
+    client.post('/api/user-preferences/', headers=auth_headers, json={'filters': {'priority_id': 'abc'}})
+    data = client.get('/api/bootstrap', headers=auth_headers).get_json()
+    assert data['pagination']['total_tasks'] == 4
+
+
+def test_bootstrap_unknown_user(client):
+    """Пользователь из токена не найден - 404"""
+    response = client.get('/api/bootstrap', headers={'Authorization': f'Bearer {make_token("999999999")}'})
+    assert response.status_code == 404
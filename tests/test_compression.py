@@ -0,0 +1,94 @@
+import gzip
+import json
+
+import pytest
+import pytz
+from flask import Response
+
+from backend.compression import brotli, compress_response, response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def test_encoding_negotiation(client, auth_headers):
+    """Кодировка выбирается по Accept-Encoding, тело после распаковки не меняется"""
+    plain = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'identity'})
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    timezones = json.loads(plain.data)
+
+    gzipped = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in gzipped.headers['Vary']
+    assert json.loads(gzip.decompress(gzipped.data)) == timezones
+
+    # При одинаковом q предпочитается brotli (если установлен)
+    if brotli is not None:
+        brotlied = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'gzip, br'})
+        assert brotlied.headers['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(brotlied.data)) == timezones
+
+    weighted = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'br;q=0.5, gzip'})
+    assert weighted.headers['Content-Encoding'] == 'gzip'
+
+    refused = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'br;q=0, gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+    assert json.loads(refused.data) == timezones
+
+
+def test_small_and_etag_responses(app):
+    """Маленькие тела не сжимаются, сильный ETag сжатого ответа становится слабым"""
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        small = compress_response(Response(b'{}', mimetype='application/json'))
+        assert 'Content-Encoding' not in small.headers
+        assert 'Accept-Encoding' in small.vary
+
+        large = Response(json.dumps(['x' * 100] * 50), mimetype='application/json')
+        large.set_etag('abc')
+        large = compress_response(large)
+        assert large.headers['Content-Encoding'] == 'gzip'
+        assert large.get_etag() == ('abc', True)
+
+        image = compress_response(Response(b'x' * 4096, mimetype='image/png'))
+        assert 'Content-Encoding' not in image.headers
+
+
+def test_streamed_export_is_compressed(client, auth_headers):
+    """Потоковая выгрузка сжимается по частям"""
+    for i in range(3):
+        client.post('/api/tasks/', headers=auth_headers, json={'title': f'Задача {i}'})
+
+    response = client.get('/api/tasks/export?format=ndjson', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert sorted(json.loads(line)['title'] for line in lines) == ['Задача 0', 'Задача 1', 'Задача 2']
+
+
+def test_cached_response_skips_view(client, auth_headers, monkeypatch):
+    """Повторный запрос берется из кэша без вызова обработчика, до смены версии"""
+    monkeypatch.setattr(pytz, 'all_timezones', ['Europe/Moscow'])
+    headers = {**auth_headers, 'Accept-Encoding': 'identity'}
+    first = client.get('/api/timezones', headers=headers)
+    assert [tz['value'] for tz in first.get_json()] == ['Europe/Moscow']
+
+    # Обработчик не вызывается: список из кэша, хотя pytz вернул бы другой
+    monkeypatch.setattr(pytz, 'all_timezones', ['Asia/Tokyo'])
+    cached = client.get('/api/timezones', headers=headers)
+    assert cached.data == first.data
+    assert cached.mimetype == 'application/json'
+
+    # Другая кодировка - отдельная запись кэша
+    gzipped = client.get('/api/timezones', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert [tz['value'] for tz in gzipped.get_json()] == ['Asia/Tokyo']
+
+    monkeypatch.setattr(pytz, 'OLSON_VERSION', pytz.OLSON_VERSION + '-test')
+    refreshed = client.get('/api/timezones', headers=headers)
+    assert [tz['value'] for tz in refreshed.get_json()] == ['Asia/Tokyo']
@@ -0,0 +1,80 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import update
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.db.models import DefaultSettings
+from backend.services.data_version import default_settings_version
+
+
+def test_not_modified_until_tasks_change(client, auth_headers, count_statements):
+    """Совпавший ETag - 304 одним запросом к базе; после изменения задач - новый ответ"""
+    url = '/api/tasks/paginated?page=1&page_size=10'
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    with count_statements() as statements:
+        cached = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert cached.data == b''
+    # Только версия пользователя: количество просроченных задач - из кэша процесса
+    assert len(statements) == 1
+
+    client.post('/api/tasks/', headers=auth_headers, json={'title': 'Новая'})
+    changed = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['tasks'][0]['title'] == 'Новая'
+
+
+def test_etag_changes_when_deadline_passes(client, auth_headers):
+    """Без изменения данных ETag списка меняется, когда задача становится просроченной"""
+    deadline = datetime.now(tz=pytz.timezone('Europe/Moscow')).replace(tzinfo=None) + timedelta(seconds=1)
+    client.post('/api/tasks/', headers=auth_headers, json={'title': 'Скоро', 'deadline': deadline.isoformat()})
+
+    first = client.get('/api/tasks/', headers=auth_headers)
+    assert first.get_json()['tasks'][0]['is_overdue'] is False
+    etag = first.headers['ETag']
+    assert client.get('/api/tasks/', headers={**auth_headers, 'If-None-Match': etag}).status_code == 304
+
+    time.sleep(1.2)
+    overdue = client.get('/api/tasks/', headers={**auth_headers, 'If-None-Match': etag})
+    assert overdue.status_code == 200
+    assert overdue.get_json()['tasks'][0]['is_overdue'] is True
+
+
+def test_default_settings_etag(client, auth_headers, count_statements):
+    """ETag /api/settings/ - по настройкам по умолчанию, а не по версии данных пользователя"""
+    default_settings_version.clear()
+    first = client.get('/api/settings/', headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    with count_statements() as statements:
+        assert client.get('/api/settings/', headers={**auth_headers, 'If-None-Match': etag}).status_code == 304
+    assert statements == []
+
+    async def set_value(value):
+        async with database.get_session() as session:
+            await session.execute(update(DefaultSettings).where(DefaultSettings.id == 1).values(value=value))
+            await session.commit()
+
+    original = first.get_json()['statuses']
+    run_async(set_value('{"name": "Изменен", "code": "changed", "color": "#000000"}'))
+    try:
+        # Версия настроек по умолчанию перечитывается после GLOBAL_SETTINGS_TTL
+        default_settings_version.clear()
+        changed = client.get('/api/settings/', headers={**auth_headers, 'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()['statuses'] != original
+    finally:
+        run_async(set_value(json.dumps(original[0], ensure_ascii=False)))
+        default_settings_version.clear()
@@ -0,0 +1,20 @@
+from backend.create_bot import superusers
+from backend.scripts.load_test import make_token
+
+
+def test_health_is_public(client):
+    assert client.get('/api/health').status_code == 200
+
+
+def test_metrics_require_token(client):
+    assert client.get('/api/metrics').status_code == 401
+
+
+def test_metrics_forbidden_for_regular_user(client, auth_headers):
+    assert client.get('/api/metrics', headers=auth_headers).status_code == 403
+
+
+def test_metrics_for_superuser(client):
+    response = client.get('/api/metrics', headers={'Authorization': f'Bearer {make_token(superusers[0])}'})
+    assert response.status_code == 200
+    assert isinstance(response.json, dict)
@@ -0,0 +1,68 @@
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from backend import json_provider
+from backend.models.duration import DurationType
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+PAYLOAD = {
+    'title': 'Задача «важная»',
+    'naive': datetime(2030, 2, 1, 10, 0, 0),
+    'aware': datetime(2030, 2, 1, 13, 0, 0, tzinfo=timezone(timedelta(hours=3))),
+    'day': date(2030, 2, 1),
+    'amount': Decimal('1.50'),
+    'uid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'duration': DurationType.DAYS,
+    'point': Point(1, 2),
+    'nested': {'b': [1, None, True], 'a': 1.5},
+}
+
+
+def _body(app, payload):
+    with app.app_context():
+        return app.json.response(payload).get_data()
+
+
+@pytest.mark.parametrize('with_orjson', [True, False])
+def test_output_matches_default_provider(app, monkeypatch, with_orjson):
+    """Значения ответа совпадают с провайдером Flask по умолчанию, даты - в формате http_date"""
+    if not with_orjson:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson не установлен')
+
+    body = _body(app, PAYLOAD)
+    expected = DefaultJSONProvider(app).response(PAYLOAD).get_data()
+    assert json.loads(body) == json.loads(expected)
+
+    data = json.loads(body)
+    assert data['naive'] == data['aware'] == 'Fri, 01 Feb 2030 10:00:00 GMT'
+    assert data['day'] == 'Fri, 01 Feb 2030 00:00:00 GMT'
+    assert data['duration'] == DurationType.DAYS.value
+    assert data['point'] == {'x': 1, 'y': 2}
+
+    # Компактный вывод с отсортированными ключами; orjson не экранирует кириллицу,
+    # модуль json - как провайдер Flask (ensure_ascii)
+    compact = json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=not with_orjson)
+    assert body == compact.encode() + b'\n'
+
+def test_task_dates_in_api_response(client, auth_headers):
+    """deadline задачи в ответе API - http_date, как до перехода на orjson"""
+    created = client.post('/api/tasks/', headers=auth_headers, json={
+        'title': 'Срок', 'deadline': '2030-02-01T10:00:00',
+    })
+    assert created.status_code == 201
+    assert created.get_json()['deadline'] == 'Fri, 01 Feb 2030 10:00:00 GMT'
+    assert created.headers['Content-Type'] == 'application/json'
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.db.models import Task, TaskArchive
+from backend.services.task_archive import TaskArchiveService
+from backend.services.task_service import TaskService
+
+
+def test_new_task_does_not_reuse_archived_id(user_id):
+    """После удаления задачи с наибольшим id новая задача не получает id задачи из архива"""
+    async def run():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            tasks = [await service.create_task(user_id, {'title': f'Отчет {i}'}) for i in range(3)]
+            old, last = tasks[-2]['id'], tasks[-1]['id']
+            long_ago = datetime.now(tz=timezone.utc) - timedelta(days=30)
+            await session.execute(update(Task).where(Task.id.in_([old, last])).values(
+                completed_at=long_ago, updated_at=long_ago
+            ))
+            await session.commit()
+
+            archived = await TaskArchiveService(session).archive_completed(older_than_days=7)
+            archived_ids = set((await session.execute(select(TaskArchive.id))).scalars())
+            await service.delete_task(user_id, last)
+            await TaskArchiveService(session).delete(int(user_id), [last])
+            await session.commit()
+
+            new_task = await service.create_task(user_id, {'title': 'Отчет новый'})
+            restored = await service.restore_task(user_id, old)
+            found = [task['id'] for task in await service.search_tasks(user_id, 'отчет', {'include_archived': True})]
+            return archived, archived_ids, old, new_task['id'], restored, found
+
+    archived, archived_ids, old, new_id, restored, found = run_async(run())
+    assert archived >= 2
+    assert old in archived_ids
+    assert new_id not in archived_ids
+    assert restored['id'] == old
+    assert len(found) == len(set(found))
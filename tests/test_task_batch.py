@@ -0,0 +1,66 @@
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.services.auth_service import AuthService
+from backend.services.task_service import TaskService
+
+
+def test_batch_uses_one_time_for_completed_at(user_id):
+    """Задачи пакета в финальном статусе получают одно время завершения"""
+    async def run():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            user = await AuthService(session).get_user_by_id(user_id)
+            settings = await service.get_settings_by_field(user)
+            final_status = next(status.id for status in settings['status_id'].values() if status.is_final)
+
+            existing = await service.create_task(user_id, {'title': 'Существующая'})
+            return await service.apply_batch(user_id, [
+                {'op': 'create', 'data': {'title': 'Первая', 'status_id': final_status}},
+                {'op': 'create', 'data': {'title': 'Вторая', 'status_id': final_status}},
+                {'op': 'update', 'id': existing['id'], 'data': {'status_id': final_status}},
+            ])
+
+    results = run_async(run())
+    assert all(item['ok'] for item in results)
+    completed_at = {item['task']['completed_at'] for item in results}
+    assert len(completed_at) == 1
+    assert None not in completed_at
+
+
+def test_batch_reports_creates_over_task_limit(user_id, set_global_setting):
+    """Создание сверх max_tasks_per_user - ошибка элемента, остальные операции выполняются"""
+    set_global_setting('max_tasks_per_user', 2)
+
+    async def run():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            existing = await service.create_task(user_id, {'title': 'Существующая'})
+            return await service.apply_batch(user_id, [
+                {'op': 'create', 'data': {'title': 'Вторая'}},
+                {'op': 'create', 'data': {'title': 'Третья'}},
+                {'op': 'delete', 'id': existing['id']},
+                {'op': 'create', 'data': {'title': 'Четвертая'}},
+            ])
+
+    results = run_async(run())
+    assert [item['ok'] for item in results] == [True, False, True, True]
+    assert results[1]['error'] == 'Task limit reached'
+
+
+def test_batch_checks_values_per_operation(client, auth_headers, setting_ids):
+    """id настроек строкой принимаются, некорректное значение - ошибка только своей операции"""
+    task_id = client.post('/api/tasks/', headers=auth_headers, json={'title': 'Задача'}).get_json()['id']
+    response = client.post('/api/tasks/batch', headers=auth_headers, json={'operations': [
+        {'op': 'create', 'data': {'title': 'Новая', 'priority_id': str(setting_ids['priority_id'][-1])}},
+        {'op': 'update', 'id': task_id, 'data': {'completed_at': 'вчера'}},
+        {'op': 'update', 'id': task_id, 'data': {'reminders': ['не дата']}},
+        {'op': 'update', 'id': task_id, 'data': {'status_id': 'abc'}},
+        {'op': 'update', 'id': task_id, 'data': {'title': 'Изменена', 'completed_at': '2030-01-02T03:04:05'}},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [item['ok'] for item in results] == [True, False, False, False, True]
+    assert results[0]['task']['priority']['id'] == setting_ids['priority_id'][-1]
+    assert [item['error'] for item in results[1:4]] == ['Invalid completed_at', 'Invalid reminders', 'Invalid status_id']
+    assert results[4]['task']['title'] == 'Изменена'
+    assert results[4]['task']['completed_at'].startswith('2030-01-02T03:04:05')
@@ -0,0 +1,29 @@
+def test_create_task_uses_own_settings(client, auth_headers, setting_ids):
+    """Настройки задачи - переданные (id строкой тоже) или по умолчанию"""
+    response = client.post('/api/tasks/', headers=auth_headers, json={
+        'title': 'Задача', 'status_id': str(setting_ids['status_id'][1]), 'deadline': '01.02.2030 10:00',
+    })
+    assert response.status_code == 201
+    task = response.get_json()
+    assert task['status']['id'] == setting_ids['status_id'][1]
+    assert task['priority'] and task['type'] and task['duration']
+    assert task['deadline'] == 'Fri, 01 Feb 2030 10:00:00 GMT'
+
+
+def test_create_task_rejects_invalid_input(client, auth_headers, setting_ids):
+    """Чужие и нечисловые id настроек, неразбираемые дедлайн и напоминания - 400 с полем ошибки"""
+    foreign_id = max(id_ for ids in setting_ids.values() for id_ in ids) + 1000
+    cases = [
+        ({'type_id': 'abc'}, 'Invalid type_id'),
+        ({'status_id': foreign_id}, 'Invalid status_id'),
+        ({'priority_id': str(foreign_id)}, 'Invalid priority_id'),
+        ({'duration_id': [1]}, 'Invalid duration_id'),
+        ({'deadline': 'завтра'}, 'Invalid deadline'),
+        ({'reminders': ['не дата']}, 'Invalid reminders'),
+    ]
+    for data, error in cases:
+        response = client.post('/api/tasks/', headers=auth_headers, json={'title': 'Задача', **data})
+        assert response.status_code == 400, data
+        assert response.get_json() == {'error': error}
+
+    assert client.get('/api/tasks/', headers=auth_headers).get_json()['tasks'] == []
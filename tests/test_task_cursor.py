@@ -0,0 +1,91 @@
+from typing import List, Optional
+
+import pytest
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.services.task_service import TaskService
+
+SORTS = [None, 'title', 'deadline', 'priority', 'status', 'overdue', 'created_at']
+
+
+def create_tasks(user_id: str, count: int, setting_ids) -> List[int]:
+    """count задач с повторяющимися значениями полей сортировки и пустыми дедлайнами"""
+    async def create():
+        async with database.get_session() as session:
+            results = await TaskService(session).apply_batch(user_id, [
+                {'op': 'create', 'data': {
+                    'title': f'Задача {i % 4}',
+                    'priority_id': setting_ids['priority_id'][i % 3],
+                    'status_id': setting_ids['status_id'][i % 2],
+                    'deadline': f'2020-01-{i % 5 + 1:02d}T10:00:00' if i % 3 else '',
+                    'duration_id': None,
+                }}
+                for i in range(count)
+            ])
+            return [item['id'] for item in results]
+    return run_async(create())
+
+
+def cursor_pages(user_id: str, sort_by: Optional[str], sort_order: str, limit: int, between_pages=None) -> List[int]:
+    """id задач всех страниц по курсору; between_pages(номер) вызывается после каждой страницы"""
+    async def load(cursor):
+        async with database.get_session() as session:
+            return await TaskService(session).get_tasks_by_cursor(user_id, cursor, limit, None, sort_by, sort_order)
+
+    ids, cursor, page = [], None, 0
+    while True:
+        tasks, cursor = run_async(load(cursor))
+        ids += [task['id'] for task in tasks]
+        page += 1
+        if not cursor:
+            return ids
+        if between_pages:
+            between_pages(page)
+
+
+def offset_pages(user_id: str, sort_by: Optional[str], sort_order: str, page_size: int) -> List[int]:
+    async def load():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            ids, page = [], 1
+            while True:
+                tasks, total = await service.get_tasks_paginated(user_id, page, page_size, {}, sort_by, sort_order)
+                ids += [task['id'] for task in tasks]
+                if page * page_size >= total:
+                    return ids
+                page += 1
+    return run_async(load())
+
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('sort_order', ['asc', 'desc'])
+def test_cursor_pages_match_offset_pages(user_id, setting_ids, sort_by, sort_order):
+    """Страницы по курсору дают те же задачи в том же порядке, что и OFFSET, без повторов"""
+    created = create_tasks(user_id, 23, setting_ids)
+    ids = cursor_pages(user_id, sort_by, sort_order, 5)
+    assert sorted(ids) == sorted(created)
+    assert ids == offset_pages(user_id, sort_by, sort_order, 5)
+
+
+def test_cursor_pages_are_stable_under_changes(user_id, setting_ids):
+    """Создание и удаление задач между страницами не сдвигает следующие страницы"""
+    created = create_tasks(user_id, 20, setting_ids)
+
+    async def change(page):
+        async with database.get_session() as session:
+            service = TaskService(session)
+            # Задача уже показанной страницы удаляется, новая попадает в начало списка
+            await service.delete_task(user_id, shown[0])
+            await service.create_task(user_id, {'title': 'Задача 0', 'deadline': '2019-01-01T10:00:00'})
+
+    shown = []
+
+    def between_pages(page):
+        shown[:] = ids_before[(page - 1) * 5:page * 5]
+        run_async(change(page))
+
+    ids_before = cursor_pages(user_id, 'deadline', 'asc', 5)
+    assert sorted(ids_before) == sorted(created)
+    ids = cursor_pages(user_id, 'deadline', 'asc', 5, between_pages)
+    assert ids == ids_before
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from backend.scripts.load_test import make_token
+
+
+def test_facets_exclude_own_filter(client, auth_headers, setting_ids):
+    """Счетчики поля считаются со всеми фильтрами, кроме фильтра по самому полю"""
+    first_status, second_status = setting_ids['status_id'][:2]
+    low, high = setting_ids['priority_id'][:2]
+    for status, priority in [(first_status, low), (first_status, high), (second_status, high), (second_status, high)]:
+        client.post('/api/tasks/', headers=auth_headers, json={
+            'title': 'Задача', 'status_id': status, 'priority_id': priority,
+        })
+    done = client.post('/api/tasks/', headers=auth_headers, json={
+        'title': 'Готово', 'status_id': second_status, 'priority_id': low,
+    }).get_json()['id']
+    completed_at = datetime.now().replace(microsecond=0).isoformat()
+    client.put(f'/api/tasks/{done}', headers=auth_headers, json={'completed_at': completed_at})
+
+    def facets(query=''):
+        response = client.get(f'/api/tasks/facets{query}', headers=auth_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        return {
+            key: {item['id']: item['count'] for item in value} if isinstance(value, list) else value
+            for key, value in data.items()
+        }
+
+    everything = facets()
+    assert everything['by_status'] == {first_status: 2, second_status: 3}
+    assert everything['by_priority'] == {low: 2, high: 3}
+    assert (everything['open'], everything['completed']) == (4, 1)
+    assert sum(everything['by_type'].values()) == sum(everything['by_duration'].values()) == 5
+
+    filtered = facets(f'?priority_id={high}')
+    # Фильтр по приоритету не сужает счетчики приоритетов
+    assert filtered['by_priority'] == {low: 2, high: 3}
+    assert filtered['by_status'] == {first_status: 1, second_status: 2}
+    assert (filtered['open'], filtered['completed']) == (3, 0)
+
+    both = facets(f'?priority_id={low}&status_id={second_status}')
+    assert both['by_priority'] == {low: 1, high: 2}
+    assert both['by_status'] == {first_status: 1, second_status: 1}
+    assert (both['open'], both['completed']) == (0, 1)
+
+
+def test_facets_unknown_user(client):
+    """Пользователь из токена не найден - 404"""
+    response = client.get('/api/tasks/facets', headers={'Authorization': f'Bearer {make_token("999999999")}'})
+    assert response.status_code == 404
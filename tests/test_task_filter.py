@@ -0,0 +1,39 @@
+import pytest
+
+from backend.models.task_filter import InvalidFilterError, TaskFilter
+
+ENDPOINTS = [
+    '/api/tasks/',
+    '/api/tasks/?limit=10',
+    '/api/tasks/paginated',
+    '/api/tasks/search?q=отчет',
+    '/api/tasks/count',
+    '/api/tasks/facets',
+    '/api/tasks/export',
+]
+
+
+def test_from_request_args():
+    task_filter = TaskFilter.from_request_args(
+        {'status_id': '2', 'type_id': '', 'is_completed': 'false', 'deadline_from': '2030-01-01T10:00:00Z', 'q': ' отчет '},
+        search_arg='q'
+    )
+    assert task_filter.status_id == 2
+    assert task_filter.type_id is None
+    assert task_filter.is_completed is False
+    assert str(task_filter.deadline_from) == '2030-01-01'
+    assert task_filter.search == 'отчет'
+
+
+def test_from_request_args_invalid():
+    with pytest.raises(InvalidFilterError, match='Invalid filter: deadline_to, type_id'):
+        TaskFilter.from_request_args({'type_id': 'abc', 'deadline_to': '31.31.2030'})
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_invalid_filter_is_bad_request(client, auth_headers, url):
+    """Неразбираемый параметр фильтра - 400 во всех списках задач, а не 500"""
+    separator = '&' if '?' in url else '?'
+    response = client.get(f'{url}{separator}type_id=abc', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid filter: type_id'}
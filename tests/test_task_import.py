@@ -0,0 +1,53 @@
+import io
+import json
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.services.global_settings import get_global_settings
+from backend.services.task_import import TaskImportService
+
+
+def ndjson(count: int) -> bytes:
+    return ''.join(json.dumps({'title': f'Задача {i}'}, ensure_ascii=False) + '\n' for i in range(count)).encode()
+
+
+def import_tasks(user_id: str, data: bytes, batch_size: int = 2):
+    async def run():
+        async with database.get_session() as session:
+            return await TaskImportService(session).import_tasks(user_id, io.BytesIO(data), 'ndjson', batch_size=batch_size)
+    return run_async(run())
+
+
+def test_default_task_limit_applies_to_import(user_id):
+    """Ограничение по умолчанию (100 задач) действует и на импорт"""
+    async def config():
+        async with database.get_session() as session:
+            return await get_global_settings(session)
+
+    assert run_async(config()).limit('max_tasks_per_user') == 100
+    report = import_tasks(user_id, ndjson(150), batch_size=50)
+    assert report['imported'] == 100
+    assert report['failed'] == 50
+    assert report['errors'][0] == {'row': 101, 'error': 'Task limit reached: 100'}
+
+
+def test_import_reports_rows_over_task_limit(user_id, set_global_setting):
+    """Строки сверх max_tasks_per_user не импортируются и попадают в отчет"""
+    set_global_setting('max_tasks_per_user', 5)
+    import_tasks(user_id, ndjson(2))
+
+    report = import_tasks(user_id, ndjson(6))
+    assert report['processed'] == 6
+    assert report['imported'] == 3
+    assert report['failed'] == 3
+    assert [error['row'] for error in report['errors']] == [4, 5, 6]
+    assert all(error['error'] == 'Task limit reached: 5' for error in report['errors'])
+
+
+def test_import_raw_request_body(client, auth_headers):
+    """NDJSON в теле запроса (без формы) импортируется целиком"""
+    for content_type in ('application/x-ndjson', None):
+        headers = {**auth_headers, 'Content-Type': content_type} if content_type else auth_headers
+        response = client.post('/api/tasks/import?format=ndjson', data=ndjson(3), headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['imported'] == 3
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.dialogs.task_list_dialog import get_tasks_data, page_size
+from backend.services.task_service import TaskService
+
+
+def create_tasks(user_id: str) -> None:
+    """Задачи, у которых порядок по релевантности поиска отличается от порядка по id"""
+    async def create():
+        async with database.get_session() as session:
+            await TaskService(session).apply_batch(user_id, [
+                {'op': 'create', 'data': {
+                    'title': 'отчет ' + 'отчет ' * (i % 3) + str(i),
+                    'description': 'квартальный отчет' if i % 4 == 0 else None,
+                }}
+                for i in range(17)
+            ])
+    run_async(create())
+
+
+def dialog_manager(user_id: str, dialog_data: Dict[str, Any]) -> SimpleNamespace:
+    """DialogManager бота без StubScroll: страница берется из dialog_data"""
+    return SimpleNamespace(
+        event=SimpleNamespace(from_user=SimpleNamespace(id=int(user_id))),
+        dialog_data=dialog_data,
+        start_data={},
+        find=lambda widget_id: None,
+    )
+
+
+def show_page(manager: SimpleNamespace, page: int) -> List[int]:
+    manager.dialog_data['page'] = page
+    data = run_async(get_tasks_data(manager))
+    assert 'error' not in data
+    return [task['id'] for task in data['tasks']]
+
+
+def test_pages_from_next_and_jumps_match(user_id):
+    """Листание подряд и переход на страницу NumberedPager дают одни и те же страницы"""
+    create_tasks(user_id)
+    for sort in ({}, {'sort_by': 'created_at', 'sort_order': 'desc'}, {'sort_by': 'title', 'sort_order': 'asc'}):
+        filters = {'filters': {'search': 'отчет'}, **sort}
+        pages = (17 + page_size - 1) // page_size
+
+        sequential = dialog_manager(user_id, dict(filters))
+        next_pages = [show_page(sequential, page) for page in range(1, pages + 1)]
+        jump_pages = [show_page(dialog_manager(user_id, dict(filters)), page) for page in range(1, pages + 1)]
+
+        assert next_pages == jump_pages, sort
+        ids = [task_id for page in next_pages for task_id in page]
+        assert len(ids) == len(set(ids)) == 17, sort
@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.services.auth_service import AuthService
+from backend.services.task_service import TaskService
+
+
+def create_tasks(user_id: str, count: int) -> Dict[str, List[int]]:
+    """Создать count задач с разными настройками пользователя; возвращает id настроек по полям"""
+    async def create():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            settings = await service.get_settings_by_field(await AuthService(session).get_user_by_id(user_id))
+            ids = {field: sorted(owned) for field, owned in settings.items()}
+            for i in range(count):
+                await service.create_task(user_id, {
+                    'title': f'Задача {i}',
+                    'status_id': ids['status_id'][i % 3],
+                    'priority_id': ids['priority_id'][i % 2],
+                    'duration_id': ids['duration_id'][i % 4],
+                })
+            return ids
+
+    return run_async(create())
+
+
+def get_tasks(user_id: str, **filters):
+    async def load():
+        async with database.get_session() as session:
+            return await TaskService(session).get_tasks(user_id, filters or None)
+
+    return run_async(load())
+
+
+def test_get_tasks_statement_count_does_not_depend_on_task_count(user_id, count_statements):
+    """Справочники задач загружаются вместе с задачами, а не запросом на каждую задачу (N+1)"""
+    create_tasks(user_id, 1)
+    get_tasks(user_id)  # прогрев кэша настроек пользователя
+    with count_statements() as statements:
+        tasks = get_tasks(user_id)
+    assert len(tasks) == 1
+    single = len(statements)
+
+    create_tasks(user_id, 49)
+    with count_statements() as statements:
+        tasks = get_tasks(user_id)
+    assert len(tasks) == 50
+    assert len(statements) == single
+    assert all(task['status'] and task['priority'] and task['duration'] for task in tasks)
+
+
+def test_get_tasks_with_filter_statement_count(user_id, count_statements):
+    ids = create_tasks(user_id, 30)
+    get_tasks(user_id)
+    with count_statements() as statements:
+        tasks = get_tasks(user_id, status_id=ids['status_id'][0])
+    assert len(tasks) == 10
+    filtered = len(statements)
+
+    with count_statements() as statements:
+        get_tasks(user_id)
+    assert filtered == len(statements)
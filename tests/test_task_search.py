@@ -0,0 +1,46 @@
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.services.task_service import TaskService
+
+
+def create_tasks(user_id: str, tasks) -> None:
+    async def create():
+        async with database.get_session() as session:
+            service = TaskService(session)
+            for task in tasks:
+                await service.create_task(user_id, task)
+
+    run_async(create())
+
+
+def call(method: str, *args):
+    async def run():
+        async with database.get_session() as session:
+            return await getattr(TaskService(session), method)(*args)
+
+    return run_async(run())
+
+
+def test_search_ranks_matches_and_finds_substrings(user_id):
+    create_tasks(user_id, [
+        {'title': 'Позвонить врачу'},
+        {'title': 'Купить молоко', 'description': 'и хлеб'},
+        {'title': 'Отчет', 'description': 'молоко в отчете'},
+        {'title': 'Шоколад'},
+    ])
+    found = [task['title'] for task in call('search_tasks', user_id, 'молоко')]
+    assert sorted(found) == ['Купить молоко', 'Отчет']
+    # Подстрока внутри слова находится без полнотекстового индекса
+    assert [task['title'] for task in call('search_tasks', user_id, 'око')] != []
+    assert call('search_tasks', user_id, 'жираф') == []
+
+    tasks, total = call('get_tasks_paginated', user_id, 1, 1, {}, None, 'asc', 'молоко')
+    assert total == 2 and len(tasks) == 1
+
+
+def test_facets_with_search_and_archive(user_id):
+    """Несколько поисков в одном запросе (UNION ALL счетчиков) вместе с архивом"""
+    create_tasks(user_id, [{'title': f'Отчет {i}'} for i in range(3)] + [{'title': 'Другое'}])
+    facets = call('get_facets', user_id, {'include_archived': True}, 'отчет')
+    assert facets['open'] + facets['completed'] == 3
+    assert sum(item['count'] for item in facets['by_status']) == 3
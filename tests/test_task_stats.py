@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from backend import database
+from backend.blueprints.wrapper import run_async
+from backend.db.models import Task
+from backend.services.task_archive import TaskArchiveService
+from backend.services.task_stats import TaskStatsService
+
+
+def _drift(user_id: str) -> int:
+    """Сколько счетчиков пользователя расходится с задачами (без исправления)"""
+    async def run():
+        async with database.get_session() as session:
+            drift = await TaskStatsService(session).reconcile_user(int(user_id))
+            await session.rollback()
+            return drift
+
+    return run_async(run())
+
+
+def _archive(task_ids) -> None:
+    """Сдвинуть время завершенных задач на месяц назад и перенести их в архив"""
+    async def run():
+        async with database.get_session() as session:
+            long_ago = datetime.now(tz=timezone.utc) - timedelta(days=30)
+            await session.execute(update(Task).where(Task.id.in_(task_ids)).values(
+                completed_at=long_ago, updated_at=long_ago
+            ))
+            await session.commit()
+            await TaskArchiveService(session).archive_completed(older_than_days=7)
+
+    run_async(run())
+
+
+def test_stats_follow_task_changes(client, auth_headers, user_id, setting_ids):
+    """Счетчики совпадают с задачами после создания, изменения, удаления, архивации и восстановления"""
+    low, high = setting_ids['priority_id'][:2]
+
+    def stats():
+        response = client.get('/api/tasks/stats', headers=auth_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        by_priority = {item['id']: item['count'] for item in data['by_priority']}
+        return data['total'], data['open'], data['completed'], data['archived'], by_priority
+
+    ids = [
+        client.post('/api/tasks/', headers=auth_headers, json={'title': f'Задача {i}', 'priority_id': priority}).get_json()['id']
+        for i, priority in enumerate([low, low, high, high])
+    ]
+    assert stats() == (4, 4, 0, 0, {low: 2, high: 2})
+    assert _drift(user_id) == 0
+
+    completed_at = datetime.now().replace(microsecond=0).isoformat()
+    client.put(f'/api/tasks/{ids[0]}', headers=auth_headers, json={'completed_at': completed_at, 'priority_id': high})
+    assert stats() == (4, 3, 1, 0, {low: 1, high: 3})
+
+    assert client.delete(f'/api/tasks/{ids[1]}', headers=auth_headers).status_code == 204
+    assert stats() == (3, 2, 1, 0, {high: 3})
+    assert _drift(user_id) == 0
+
+    client.put(f'/api/tasks/{ids[2]}', headers=auth_headers, json={'completed_at': completed_at})
+    assert stats() == (3, 1, 2, 0, {high: 3})
+
+    _archive([ids[0], ids[2]])
+    assert stats() == (1, 1, 0, 2, {high: 1})
+    assert _drift(user_id) == 0
+    count = client.get('/api/tasks/count?include_archived=true', headers=auth_headers).get_json()['count']
+    assert count == 3
+
+    restored = client.post(f'/api/tasks/{ids[2]}/restore', headers=auth_headers)
+    assert restored.status_code == 200
+    assert stats() == (2, 1, 1, 1, {high: 2})
+    assert _drift(user_id) == 0
@@ -0,0 +1,42 @@
+def create_task(client, auth_headers) -> int:
+    response = client.post('/api/tasks/', headers=auth_headers, json={'title': 'Задача'})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_update_task_rejects_invalid_input(client, auth_headers, setting_ids):
+    """Некорректные поля PUT - 400 с полем ошибки, задача не меняется"""
+    task_id = create_task(client, auth_headers)
+    foreign_id = max(id_ for ids in setting_ids.values() for id_ in ids) + 1000
+    cases = [
+        ({'status_id': 'abc'}, 'Invalid status_id'),
+        ({'type_id': foreign_id}, 'Invalid type_id'),
+        ({'completed_at': 'вчера'}, 'Invalid completed_at'),
+        ({'deadline': 12}, 'Invalid deadline'),
+        ({'reminders': 'не список'}, 'Invalid reminders'),
+    ]
+    for data, error in cases:
+        response = client.put(f'/api/tasks/{task_id}', headers=auth_headers, json={'title': 'Изменена', **data})
+        assert response.status_code == 400, data
+        assert response.get_json() == {'error': error}
+
+    task = client.get(f'/api/tasks/{task_id}', headers=auth_headers).get_json()
+    assert task['title'] == 'Задача'
+
+
+def test_update_task_parses_values(client, auth_headers, setting_ids):
+    """id настроек строкой и completed_at строкой сохраняются разобранными"""
+    task_id = create_task(client, auth_headers)
+    response = client.put(f'/api/tasks/{task_id}', headers=auth_headers, json={
+        'priority_id': str(setting_ids['priority_id'][-1]),
+        'completed_at': '2030-01-02T03:04:05+00:00',
+    })
+    assert response.status_code == 200
+    task = response.get_json()
+    assert task['priority']['id'] == setting_ids['priority_id'][-1]
+    assert task['completed_at'].startswith('2030-01-02T03:04:05')
+
+
+def test_update_missing_task(client, auth_headers):
+    response = client.put('/api/tasks/999999999', headers=auth_headers, json={'title': 'Нет'})
+    assert response.status_code == 404